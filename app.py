@@ -1,7 +1,11 @@
 import dash
 from dash import Dash, html, dcc, Input, Output, callback
 from mylibrary import *
-import yaml
+from auth_service import (
+    verify_otp_login,
+    trust_proxy_headers,
+    OTP_OK, OTP_LOCKED, OTP_LOCKED_NOW, OTP_NOT_FOUND, OTP_RATE_LIMITED,
+)
 import os
 import subprocess
 import functools
@@ -11,51 +15,155 @@ from markupsafe import escape
 from urllib.parse import urlparse
 from io import BytesIO
 import re
-try:
-    from PIL import Image, ImageDraw, ImageFont
-except Exception:
-    Image = None
-    ImageDraw = None
-    ImageFont = None
+# Pillow is only needed for /og-image.png and is imported on first use (_og_pil)
+Image = ImageDraw = ImageFont = None
 import hashlib
 import secrets
-import psutil
-import gc
-
-# Run idempotent DB migrations on startup
-try:
-    run_db_migrations()
-except Exception as _e:
-    # Avoid blocking startup; errors will be visible in logs
-    print(f"DB migration warning: {_e}")
-
-# Ensure initial downtimes exist on startup (DB upsert)
-try:
-    from cron import update_downtimes_file  # local import to avoid cycles
-    update_downtimes_file()
-except Exception as _e:
-    print(f"Downtimes init warning: {_e}")
-
-# Precompute incident heatmap data at startup to avoid empty initial graph
-try:
+import threading
+import queue
+import json
+from collections import OrderedDict
+
+# Startup warm-up (DB migrations, downtimes, incident heatmap).
+# gunicorn imports this module once per worker; a Postgres advisory lock elects one
+# process to do the work. Migrations always run (lock-free no-op when the schema is
+# current); a marker file keyed on boot id and schema version keeps later workers of
+# the same boot from repeating the heavy warm-up. Everything runs in a background
+# thread so workers serve immediately from the existing data.
+_STARTUP_LOCK_KEY = 0x5449_5354  # 'TIST'
+_STARTUP_MARKER_FILE = os.path.join(os.path.dirname(__file__), 'data', 'startup_warmup.json')
+_STARTUP_MARKER_TTL = int(os.getenv('TI_STARTUP_WARMUP_TTL', '600'))  # seconds
+_startup_state = {
+    'status': 'pending',  # pending | running | done | skipped | failed
+    'leader': False,
+    'pid': os.getpid(),
+    'started_at': None,
+    'finished_at': None,
+    'duration_seconds': None,
+    'tasks': {},
+    'error': None
+}
+
+def _startup_write_heatmap():
     from mylibrary import get_incident_heatmap_data
-    import json as _json
-    import time as _time
     _hm_df = get_incident_heatmap_data(30)
     data_dir = os.path.join(os.path.dirname(__file__), 'data')
     os.makedirs(data_dir, exist_ok=True)
     _hm_path = os.path.join(data_dir, 'incident_heatmap.json')
     _payload = {
-        'ts': _time.time(),
+        'ts': time.time(),
         'data': (
             _hm_df[['weekday','hour','count','ci_list']]
             .to_dict('records') if _hm_df is not None and hasattr(_hm_df, 'to_dict') else []
         )
     }
     with open(_hm_path, 'w', encoding='utf-8') as _f:
-        _json.dump(_payload, _f, ensure_ascii=False)
-except Exception as _e:
-    print(f"Heatmap init warning: {_e}")
+        json.dump(_payload, _f, ensure_ascii=False)
+
+def _startup_update_downtimes():
+    from cron import update_downtimes_file  # local import to avoid cycles
+    update_downtimes_file()
+
+# Heavy warm-up tasks, skipped for later workers of the same boot
+_STARTUP_TASKS = (
+    ('downtimes', _startup_update_downtimes),
+    ('incident_heatmap', _startup_write_heatmap),
+)
+
+def _startup_boot_id():
+    """Identifies this server boot: parent (gunicorn master) pid plus its start time."""
+    ppid = os.getppid()
+    try:
+        with open(f'/proc/{ppid}/stat', encoding='utf-8') as f:
+            started = f.read().rsplit(')', 1)[1].split()[19]  # field 22: starttime
+    except (OSError, IndexError):
+        started = ''
+    return f"{ppid}:{started}"
+
+def _startup_marker_fresh(boot_id, schema_version):
+    """True if the marker was written during this boot for the current schema version."""
+    try:
+        if time.time() - os.stat(_STARTUP_MARKER_FILE).st_mtime >= _STARTUP_MARKER_TTL:
+            return False
+        _header, payload = read_snapshot(_STARTUP_MARKER_FILE)
+    except Exception:
+        return False
+    return payload.get('boot_id') == boot_id and payload.get('schema_version') == schema_version
+
+def _run_startup_warmup():
+    """Runs the warm-up tasks in exactly one process per boot (advisory lock + marker)."""
+    _startup_state['started_at'] = time.time()
+    try:
+        with get_db_conn() as conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (_STARTUP_LOCK_KEY,))
+            if not cur.fetchone()[0]:
+                _startup_state['status'] = 'skipped'  # another process is warming up
+                return
+            try:
+                from migrations import LATEST_VERSION
+                boot_id = _startup_boot_id()
+                _startup_state['status'] = 'running'
+                # New code must never run against an old schema: always check (cheap no-op)
+                task_started = time.perf_counter()
+                try:
+                    run_db_migrations()
+                    _startup_state['tasks']['migrations'] = {'status': 'done'}
+                except Exception as _e:
+                    print(f"Startup warm-up: migrations failed: {_e}")
+                    _startup_state['tasks']['migrations'] = {'status': 'failed', 'error': str(_e)}
+                _startup_state['tasks']['migrations']['duration_seconds'] = round(time.perf_counter() - task_started, 3)
+
+                if _startup_marker_fresh(boot_id, LATEST_VERSION):
+                    # Warm-up already done during this boot
+                    failed = _startup_state['tasks']['migrations']['status'] == 'failed'
+                    _startup_state['status'] = 'failed' if failed else 'skipped'
+                    return
+                _startup_state['leader'] = True
+                for name, task in _STARTUP_TASKS:
+                    task_started = time.perf_counter()
+                    try:
+                        task()
+                        _startup_state['tasks'][name] = {'status': 'done'}
+                    except Exception as _e:
+                        # Avoid blocking startup; errors will be visible in logs
+                        print(f"Startup warm-up: {name} failed: {_e}")
+                        _startup_state['tasks'][name] = {'status': 'failed', 'error': str(_e)}
+                    _startup_state['tasks'][name]['duration_seconds'] = round(time.perf_counter() - task_started, 3)
+                if any(t['status'] == 'failed' for t in _startup_state['tasks'].values()):
+                    # No marker: the next worker (or boot) retries
+                    _startup_state['status'] = 'failed'
+                else:
+                    _startup_state['status'] = 'done'
+                    write_snapshot(_STARTUP_MARKER_FILE, {
+                        'pid': os.getpid(),
+                        'boot_id': boot_id,
+                        'schema_version': LATEST_VERSION,
+                        'tasks': _startup_state['tasks']
+                    }, 'startup')
+            finally:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (_STARTUP_LOCK_KEY,))
+    except Exception as _e:
+        _startup_state.update(status='failed', error=str(_e))
+        print(f"Startup warm-up warning: {_e}")
+    finally:
+        _startup_state['finished_at'] = time.time()
+        _startup_state['duration_seconds'] = round(_startup_state['finished_at'] - _startup_state['started_at'], 3)
+        if _startup_state['leader']:
+            print(f"Startup warm-up {_startup_state['status']} in {_startup_state['duration_seconds']}s (pid {os.getpid()})")
+
+_startup_thread = None
+
+def start_startup_warmup():
+    """Starts the warm-up thread once per process (server entry points only, not on import)."""
+    global _startup_thread
+    if _startup_thread is None:
+        _startup_thread = threading.Thread(target=_run_startup_warmup, name='startup-warmup', daemon=True)
+        _startup_thread.start()
+
+# Gunicorn imports app:server; the image sets TI_STARTUP_WARMUP=1 for the web server.
+# Tests and scripts import the module without writing to data/
+if os.getenv('TI_STARTUP_WARMUP', '0') == '1':
+    start_startup_warmup()
 
 app = Dash(
     __name__,
@@ -73,61 +181,18 @@ app = Dash(
     ]
 )
 server = app.server
+# Client-IP hinter nginx aus X-Forwarded-For (Rate-Limits je IP, siehe auth_service)
+trust_proxy_headers(server)
 
 # Add local CSS for Material Icons
 
-# Configuration cache with size limit
-_config_cache = {}
-_config_cache_timestamp = 0
-_config_cache_ttl = 300  # 5 seconds cache TTL
-_config_cache_max_size = 10  # Limit cache size
-
 # Layout cache with size limit
 _layout_cache = {}
 _layout_cache_timestamp = 0
-_layout_cache_ttl = 60  # 1 minute cache TTL
+_layout_cache_config = None  # ConfigSnapshot the layout was built from
+_layout_cache_ttl = 3600  # Header/Footer hängen nur an config.yaml; Neuaufbau bei Änderung
 _layout_cache_max_size = 5  # Limit cache size
 
-def load_config():
-    """Load configuration from YAML file with caching"""
-    global _config_cache, _config_cache_timestamp
-    
-    current_time = time.time()
-    if (not _config_cache or 
-        current_time - _config_cache_timestamp > _config_cache_ttl):
-        
-        config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                _config_cache = yaml.safe_load(f) or {}
-            _config_cache_timestamp = current_time
-            
-            # Limit cache size
-            if len(_config_cache) > _config_cache_max_size:
-                # Keep only the most recent entries
-                keys = list(_config_cache.keys())[:_config_cache_max_size]
-                _config_cache = {k: _config_cache[k] for k in keys}
-        except (FileNotFoundError, Exception):
-            _config_cache = {}
-            _config_cache_timestamp = current_time
-    
-    return _config_cache
-
-def load_footer_config():
-    """Load footer configuration from cached config"""
-    config = load_config()
-    return config.get('footer', {})
-
-def load_core_config():
-    """Load core configuration from cached config"""
-    config = load_config()
-    return config.get('core', {})
-
-def load_header_config():
-    """Load header configuration from cached config"""
-    core_config = load_core_config()
-    return core_config.get('header', {})
-
 def get_version_info() -> str:
     """Return a concise version string with Git tag and short commit id.
 
@@ -197,10 +262,11 @@ def build_footer_elements(footer_config):
 
 def serve_layout():
     # Check layout cache first
-    global _layout_cache, _layout_cache_timestamp
+    global _layout_cache, _layout_cache_timestamp, _layout_cache_config
     
     current_time = time.time()
-    if (not _layout_cache or 
+    config_snapshot = get_config()
+    if (not _layout_cache or config_snapshot is not _layout_cache_config or
         current_time - _layout_cache_timestamp > _layout_cache_ttl):
         
         # Load configurations (now cached)
@@ -331,10 +397,7 @@ def serve_layout():
         ])
         
         _layout_cache_timestamp = current_time
-        
-        # Force garbage collection periodically
-        if int(current_time) % 300 == 0:  # Every 5 minutes
-            gc.collect()
+        _layout_cache_config = config_snapshot
     
     return _layout_cache
 
@@ -489,10 +552,14 @@ Sitemap: {base}/sitemap.xml
     return Response(content, mimetype='text/plain')
 
 
-@server.route('/sitemap.xml')
-def sitemap_xml():
-    from datetime import datetime
-    base = request.url_root.rstrip('/')
+# Sitemap cache per base URL: rebuilt only when ci_metadata changes
+_sitemap_cache = {}
+_sitemap_cache_ttl = 300  # seconds between ci_metadata change checks
+_sitemap_cache_lock = threading.Lock()
+
+def _build_sitemap(base, lastmod_dt):
+    """Build sitemap XML from ci_metadata ids (no measurements access)."""
+    from xml.sax.saxutils import escape as xml_escape
     pages = [
         ("/", "weekly"),
         ("/stats", "daily"),
@@ -501,24 +568,59 @@ def sitemap_xml():
     ]
     # Include CI detail pages directly as final target URL /plot?ci=<ci>
     try:
-        df = get_timescaledb_ci_data()
-        if df is not None and hasattr(df, 'empty') and not df.empty and 'ci' in df.columns:
-            # Limit to avoid huge sitemaps
-            ci_values = df['ci'].dropna().astype(str).unique().tolist()[:1000]
-            for ci in ci_values:
-                # Vorsicht: sitemap ist XML – CI-Wert wird nicht als HTML dargestellt
-                pages.append((f"/plot?ci={ci}", "hourly"))
+        # Limit to avoid huge sitemaps
+        for ci in get_ci_ids(limit=1000):
+            pages.append((f"/plot?ci={ci}", "hourly"))
     except Exception:
         # Fail silently; base pages are still provided
         pass
-    lastmod = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+    lastmod = lastmod_dt.strftime('%Y-%m-%dT%H:%M:%SZ')
     urls = "".join([
-        f"<url><loc>{base}{path}</loc><changefreq>{freq}</changefreq><lastmod>{lastmod}</lastmod></url>"
+        f"<url><loc>{xml_escape(base + path)}</loc><changefreq>{freq}</changefreq><lastmod>{lastmod}</lastmod></url>"
         for path, freq in pages
     ])
-    xml = f"<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n" \
-          f"<urlset xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">{urls}</urlset>\n"
-    return Response(xml, mimetype='application/xml')
+    return f"<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n" \
+           f"<urlset xmlns=\"http://www.sitemaps.org/schemas/sitemap/0.9\">{urls}</urlset>\n"
+
+@server.route('/sitemap.xml')
+def sitemap_xml():
+    from datetime import datetime, timezone
+    base = request.url_root.rstrip('/')
+    now = time.time()
+    entry = _sitemap_cache.get(base)
+    if entry is None or now - entry['checked_at'] > _sitemap_cache_ttl:
+        try:
+            state = get_ci_metadata_state()
+        except Exception:
+            state = entry['state'] if entry else (None, 0)
+        if entry is None or state != entry['state']:
+            updated_at = state[0]
+            if updated_at is not None:
+                lastmod_dt = updated_at.astimezone(timezone.utc) if updated_at.tzinfo else updated_at.replace(tzinfo=timezone.utc)
+            else:
+                lastmod_dt = datetime.now(timezone.utc)
+            lastmod_dt = lastmod_dt.replace(microsecond=0)
+            xml = _build_sitemap(base, lastmod_dt)
+            entry = {
+                'state': state,
+                'xml': xml,
+                'lastmod': lastmod_dt,
+                'etag': hashlib.sha1(xml.encode('utf-8')).hexdigest(),
+                'checked_at': now,
+            }
+        else:
+            entry = dict(entry, checked_at=now)
+        with _sitemap_cache_lock:
+            _sitemap_cache[base] = entry
+            # Bound the number of cached hosts
+            while len(_sitemap_cache) > 8:
+                _sitemap_cache.pop(next(iter(_sitemap_cache)))
+
+    resp = Response(entry['xml'], mimetype='application/xml')
+    resp.headers['Cache-Control'] = 'public, max-age=3600'
+    resp.set_etag(entry['etag'])
+    resp.last_modified = entry['lastmod']
+    return resp.make_conditional(request)
 
 
 # ----------------------------------------------------------------------------
@@ -535,42 +637,53 @@ def ci_redirect(ci: str):
 
 # ----------------------------------------------------------------------------
 # SEO: Dynamic Open Graph Image (1200x630) – /og-image.png
-# ----------------------------------------------------------------------------
-@server.route('/og-image.png')
-def og_image():
-    """Generate a branded OG image.
-
-    Query params:
-    - title: main title text
-    - subtitle: secondary line
-    - ci: configuration item id (shown as badge)
-    """
-    try:
-        width, height = 1200, 630
-        title = request.args.get('title', 'TI-Stats')
-        subtitle = request.args.get('subtitle', 'Verfügbarkeit und Statistiken der TI-Komponenten')
-        ci = request.args.get('ci')
-        hours = int(request.args.get('hours', '24'))
-
-        if Image is None:
-            # Fallback static response when Pillow is unavailable
-            return Response(b'', mimetype='image/png', status=204)
-
-        # Background
-        img = Image.new('RGB', (width, height), '#0f172a')  # slate-900
-        draw = ImageDraw.Draw(img)
-
-        # Simple radial-like vignette
+_OG_WIDTH, _OG_HEIGHT = 1200, 630
+_og_base = None  # static canvas (background, vignette, logo) and fonts, built once per process
+_og_base_lock = threading.Lock()
+_og_render_cache = OrderedDict()  # (title, subtitle, ci, hours, generation) -> (etag, png bytes)
+_og_render_cache_max = 64
+_og_render_cache_lock = threading.Lock()
+
+def _og_pil():
+    """Import Pillow on first use; returns False when it is unavailable."""
+    global Image, ImageDraw, ImageFont
+    if Image is None:
         try:
-            # Overlay gradient rectangles for subtle depth
-            for i in range(0, height, 10):
-                opacity = int(120 * (1 - i / height))
+            from PIL import Image, ImageDraw, ImageFont
+        except Exception:
+            return False
+    return True
+
+def _og_prepare_base():
+    """Build the static background canvas and load fonts once per process."""
+    global _og_base
+    if _og_base is not None:
+        return _og_base
+    with _og_base_lock:
+        if _og_base is not None:
+            return _og_base
+        img = Image.new('RGB', (_OG_WIDTH, _OG_HEIGHT), '#0f172a')  # slate-900
+
+        # Simple radial-like vignette: overlay gradient strips for subtle depth
+        try:
+            for i in range(0, _OG_HEIGHT, 10):
+                opacity = int(120 * (1 - i / _OG_HEIGHT))
                 color = (30, 41, 59, max(0, opacity))  # slate-800 alpha
-                overlay = Image.new('RGBA', (width, 10), color)
+                overlay = Image.new('RGBA', (_OG_WIDTH, 10), color)
                 img.paste(overlay, (0, i), overlay)
         except Exception:
             pass
 
+        # Optional logo (favicon.png)
+        try:
+            assets_path = os.path.join(os.path.dirname(__file__), 'assets', 'favicon.png')
+            if os.path.exists(assets_path):
+                logo = Image.open(assets_path).convert('RGBA')
+                logo = logo.resize((128, 128))
+                img.paste(logo, (64, 64), logo)
+        except Exception:
+            pass
+
         # Load fonts (fallback to default)
         def load_font(preferred: str, size: int):
             try:
@@ -578,212 +691,332 @@ def og_image():
             except Exception:
                 return None
 
-        font_bold = (
-            load_font('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 120)
-            or ImageFont.load_default()
-        )
-        font_reg = (
-            load_font('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', 42)
-            or ImageFont.load_default()
-        )
-        font_badge = (
-            load_font('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 42)
-            or ImageFont.load_default()
-        )
+        _og_base = {
+            'canvas': img,
+            'font_bold': load_font('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 120) or ImageFont.load_default(),
+            'font_reg': load_font('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', 42) or ImageFont.load_default(),
+            'font_badge': load_font('/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf', 42) or ImageFont.load_default(),
+        }
+        return _og_base
 
-        # Measurement helper for accurate width/height
-        def measure(draw_obj, text, font):
-            try:
-                x0, y0, x1, y1 = draw_obj.textbbox((0, 0), text, font=font)
-                return (x1 - x0, y1 - y0)
-            except Exception:
-                return draw_obj.textsize(text, font=font)
+def _og_generation():
+    """Data generation for OG cache keys: statistics snapshot + availability cache-bus generation.
 
-        # Optional logo (favicon.png)
+    The generation moves with each ingest event; only while the bus is disconnected
+    the 5-minute ingest slot stands in for it.
+    """
+    snapshot = load_statistics_snapshot()
+    if cache_bus_connected():
+        availability = get_cache_generation('availability')
+    else:
+        availability = ('slot', int(time.time() // 300))
+    return (snapshot.generation if snapshot is not None else 0, availability)
+
+def _og_ci_metrics(ci, hours):
+    """CI metrics for the OG badge from precomputed data (pyramid + per-CI statistics)."""
+    availability = 0.0
+    incidents = 0
+    rollup = get_availability_rollup_of_ci(ci, 60, hours=hours)
+    if not rollup.empty:
+        samples = float(rollup['samples'].sum())
+        if samples > 0:
+            down = float((rollup['down_fraction'] * rollup['samples']).sum())
+            availability = (1.0 - down / samples) * 100.0
+        incidents = int(rollup['incidents'].sum())
+    mttr_min = 0.0
+    mtbf_hr = 0.0
+    snapshot = load_statistics_snapshot()
+    metrics = snapshot.ci(ci) if snapshot is not None else None
+    if metrics:
+        mttr_min = float(metrics.get('mttr_minutes') or 0)
+        mtbf_hr = float(metrics.get('mtbf_minutes') or 0) / 60.0
+    return availability, incidents, mttr_min, mtbf_hr
+
+def _og_render(title, subtitle, ci, hours):
+    """Render the OG image PNG on top of the prepared base canvas."""
+    base = _og_prepare_base()
+    img = base['canvas'].copy()
+    draw = ImageDraw.Draw(img)
+    font_bold, font_reg, font_badge = base['font_bold'], base['font_reg'], base['font_badge']
+
+    # Measurement helper for accurate width/height
+    def measure(draw_obj, text, font):
         try:
-            assets_path = os.path.join(os.path.dirname(__file__), 'assets', 'favicon.png')
-            if os.path.exists(assets_path):
-                logo = Image.open(assets_path).convert('RGBA')
-                logo = logo.resize((128, 128))
-                img.paste(logo, (64, 64), logo)
+            x0, y0, x1, y1 = draw_obj.textbbox((0, 0), text, font=font)
+            return (x1 - x0, y1 - y0)
+        except Exception:
+            return draw_obj.textsize(text, font=font)
+
+    # Title/subtitle positions
+    text_x = 220
+    text_y = 64
+    draw.text((text_x, text_y), title, font=font_bold, fill='#e2e8f0')  # slate-200
+    draw.text((text_x, text_y + 120), subtitle, font=font_reg, fill='#94a3b8')  # slate-400
+
+    # CI badge + metrics (keep original spacing roughly)
+    metrics_y = text_y + 200
+    if ci:
+        badge_text = f"CI: {ci}"
+        tw, th = measure(draw, badge_text, font_badge)
+        pad_x, pad_y = 22, 14
+        bx, by = text_x, metrics_y
+        bw, bh = tw + pad_x * 2, th + pad_y * 2
+        # Rounded rectangle background
+        try:
+            draw.rounded_rectangle([bx, by, bx + bw, by + bh], radius=14, fill='#1e293b')  # slate-800
+        except Exception:
+            draw.rectangle([bx, by, bx + bw, by + bh], fill='#1e293b')
+        draw.text((bx + pad_x, by + pad_y), badge_text, font=font_badge, fill='#93c5fd')  # blue-300
+
+        # Metrics from precomputed data (best-effort)
+        try:
+            availability, incidents, mttr_min, mtbf_hr = _og_ci_metrics(ci, hours)
+            metrics_lines = [
+                f"Verfügbarkeit {hours}h: {availability:.2f}%",
+                f"Incidents {hours}h: {incidents}",
+                f"MTTR (gesamt): {mttr_min:.1f} Min",
+                f"MTBF (gesamt): {mtbf_hr:.1f} Std",
+            ]
+            line_y = by + bh + 28
+            line_gap = 56
+            for line in metrics_lines:
+                draw.text((text_x, line_y), line, font=font_reg, fill='#cbd5e1')
+                line_y += line_gap
         except Exception:
+            # Non-fatal
             pass
 
-        # Title/subtitle positions
-        text_x = 220
-        text_y = 64
-        draw.text((text_x, text_y), title, font=font_bold, fill='#e2e8f0')  # slate-200
-        draw.text((text_x, text_y + 120), subtitle, font=font_reg, fill='#94a3b8')  # slate-400
-
-        # CI badge + metrics (keep original spacing roughly)
-        metrics_y = text_y + 200
-        if ci:
-            badge_text = f"CI: {ci}"
-            # Measure text size
-            tw, th = measure(draw, badge_text, font_badge)
-            pad_x, pad_y = 22, 14
-            bx, by = text_x, metrics_y
-            bw, bh = tw + pad_x * 2, th + pad_y * 2
-            # Rounded rectangle background
-            try:
-                from PIL import ImageDraw as _ID
-                draw.rounded_rectangle([bx, by, bx + bw, by + bh], radius=14, fill='#1e293b')  # slate-800
-            except Exception:
-                draw.rectangle([bx, by, bx + bw, by + bh], fill='#1e293b')
-            draw.text((bx + pad_x, by + pad_y), badge_text, font=font_badge, fill='#93c5fd')  # blue-300
+    # Footer brand
+    draw.text((64, _OG_HEIGHT - 64), 'ti-stats.net', font=font_reg, fill='#64748b')  # slate-500
 
-            # Fetch metrics from DB (best-effort)
-            try:
-                import pandas as _pd
-                from datetime import timedelta as _td
-                with get_db_conn() as conn:
-                    with conn.cursor() as cur:
-                        # Pull last N hours measurements for specific CI
-                        cur.execute("""
-                            SELECT ts, status
-                            FROM measurements
-                            WHERE ci = %s AND ts >= NOW() - INTERVAL %s
-                            ORDER BY ts ASC
-                        """, (ci, f"{int(max(1, hours))} hours",))
-                        rows = cur.fetchall()
-                df = _pd.DataFrame(rows, columns=['ts', 'status']) if rows else _pd.DataFrame(columns=['ts','status'])
-                availability = 0.0
-                incidents = 0
-                mttr_min = 0.0
-                mtbf_hr = 0.0
-                if not df.empty:
-                    df['ts'] = _pd.to_datetime(df['ts'])
-                    df['status'] = df['status'].astype(int)
-                    # Availability percent
-                    availability = float(df['status'].mean() * 100.0)
-                    # Incidents: 1->0 transitions
-                    df['prev'] = df['status'].shift(1)
-                    incidents = int(((df['prev'] == 1) & (df['status'] == 0)).sum())
-                    # MTTR/MTBF (rough estimation): compute durations of 0 and 1 segments
-                    df['grp'] = (df['status'] != df['status'].shift(1)).cumsum()
-                    seg = df.groupby('grp').agg(start=('ts','min'), end=('ts','max'), val=('status','first'))
-                    seg['dur_min'] = (seg['end'] - seg['start']).dt.total_seconds() / 60.0
-                    total_downtime = seg.loc[seg['val'] == 0, 'dur_min'].sum() if not seg.empty else 0.0
-                    total_uptime = seg.loc[seg['val'] == 1, 'dur_min'].sum() if not seg.empty else 0.0
-                    num_outages = max(1, len(seg.loc[seg['val'] == 0])) if not seg.empty else 1
-                    num_uptimes = max(1, len(seg.loc[seg['val'] == 1])) if not seg.empty else 1
-                    mttr_min = float(total_downtime / num_outages)
-                    mtbf_hr = float((total_uptime / num_uptimes) / 60.0)
-
-                # Render metrics block
-                metrics_lines = [
-                    f"Verfügbarkeit {hours}h: {availability:.2f}%",
-                    f"Incidents: {incidents}",
-                    f"MTTR: {mttr_min:.1f} Min",
-                    f"MTBF: {mtbf_hr:.1f} Std",
-                ]
-                line_y = by + bh + 28
-                line_gap = 56
-                for line in metrics_lines:
-                    draw.text((text_x, line_y), line, font=font_reg, fill='#cbd5e1')
-                    line_y += line_gap
-            except Exception:
-                # Non-fatal
-                pass
+    buf = BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
+
+@server.route('/og-image.png')
+def og_image():
+    """Generate a branded OG image.
+
+    Query params:
+    - title: main title text
+    - subtitle: secondary line
+    - ci: configuration item id (shown as badge)
+
+    Rendered PNGs are cached per (title, subtitle, ci, hours, data generation)
+    and served with an ETag of the image bytes (304 on If-None-Match).
+    """
+    try:
+        title = request.args.get('title', 'TI-Stats')[:120]
+        subtitle = request.args.get('subtitle', 'Verfügbarkeit und Statistiken der TI-Komponenten')[:200]
+        ci = (request.args.get('ci') or '')[:64] or None
+        hours = min(2160, max(1, int(request.args.get('hours', '24'))))
 
-        # Footer brand
-        draw.text((64, height - 64), 'ti-stats.net', font=font_reg, fill='#64748b')  # slate-500
+        if not _og_pil():
+            # Fallback static response when Pillow is unavailable
+            return Response(b'', mimetype='image/png', status=204)
 
-        # Output
-        buf = BytesIO()
-        img.save(buf, format='PNG')
-        buf.seek(0)
-        resp = Response(buf.getvalue(), mimetype='image/png')
+        key = (title, subtitle, ci, hours, _og_generation())
+        with _og_render_cache_lock:
+            cached = _og_render_cache.get(key)
+            if cached is not None:
+                _og_render_cache.move_to_end(key)
+        if cached is None:
+            png = _og_render(title, subtitle, ci, hours)
+            # Content-based: the same image gets the same ETag in every worker
+            etag = hashlib.sha1(png).hexdigest()
+            cached = (etag, png)
+            with _og_render_cache_lock:
+                _og_render_cache[key] = cached
+                while len(_og_render_cache) > _og_render_cache_max:
+                    _og_render_cache.popitem(last=False)
+
+        etag, png = cached
+        resp = Response(png, mimetype='image/png')
         resp.headers['Cache-Control'] = 'public, max-age=600'
-        return resp
+        resp.set_etag(etag)
+        return resp.make_conditional(request)
     except Exception:
         # Avoid reflecting query parameters in error text
         return Response("Error generating image", mimetype='text/plain', status=500)
 
-# Health check endpoint
-@server.route('/health')
-def health_check():
-    """Health check endpoint for monitoring the application status"""
-    try:
-        # Check configuration loading
-        config_status = "healthy"
-        config_error = None
+# Health endpoints
+#
+# /health/live  - Liveness: Prozess antwortet, keinerlei I/O.
+# /health/ready - Readiness: DB-, Config- und Cron-Prüfungen laufen in einem
+#                 Hintergrund-Sampler; der Endpoint liefert nur die gecachten
+#                 Ergebnisse samt Alter.
+# /health       - Bisheriges Format, ebenfalls aus dem Sampler bedient.
+_health_started_at = time.time()
+_health_sample_interval = int(os.getenv('TI_HEALTH_SAMPLE_INTERVAL', '15'))  # seconds between samples
+_health_cron_max_age = int(os.getenv('TI_HEALTH_CRON_MAX_AGE', '900'))  # cron.log older than this -> warning
+_health_results = {}  # component -> {'status', 'error', 'checked_at', 'duration_ms', ...}
+_health_lock = threading.Lock()
+_health_sampler = None
+
+def _health_check_database():
+    with get_db_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT 1")
+        _ = cur.fetchone()
+    return "healthy", None, {}
+
+def _health_check_configuration():
+    snapshot = get_config()
+    if not snapshot.raw:
+        return "warning", "Empty configuration", {}
+    return "healthy", None, {
+        "config_age": time.time() - snapshot.loaded_at,
+        "check_interval": CONFIG_CHECK_INTERVAL
+    }
+
+def _health_check_cron():
+    """Frische des Cron-Jobs anhand von cron.log (jede Iteration) und Statistik-Snapshot."""
+    now = time.time()
+    details = {}
+    for name, path in (('log_age', CRON_LOG_FILE),
+                       ('statistics_age', STATISTICS_SNAPSHOT_FILE),
+                       ('statistics_json_age', STATISTICS_FILE)):
         try:
-            config = load_config()
-            if not config:
-                config_status = "warning"
-                config_error = "Empty configuration"
-        except Exception as e:
-            config_status = "unhealthy"
-            config_error = str(e)
-        
-        # Check layout generation
-        layout_status = "healthy"
-        layout_error = None
+            details[name] = round(now - os.stat(path).st_mtime, 1)
+        except OSError:
+            details[name] = None
+    log_age = details['log_age']
+    if log_age is None:
+        return "warning", "cron.log not found", details
+    if log_age > _health_cron_max_age:
+        return "warning", f"cron.log not updated for {int(log_age)}s", details
+    return "healthy", None, details
+
+_HEALTH_CHECKS = (
+    ('database', _health_check_database),
+    ('configuration', _health_check_configuration),
+    ('cron', _health_check_cron),
+)
+
+def _health_sample_once():
+    for name, check in _HEALTH_CHECKS:
+        started = time.perf_counter()
         try:
-            layout = serve_layout()
-            if not layout:
-                layout_status = "warning"
-                layout_error = "Empty layout"
+            status, error, details = check()
         except Exception as e:
-            layout_status = "unhealthy"
-            layout_error = str(e)
-        
-        # System metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        
-        # Database health
-        db_status = "healthy"
-        db_error = None
+            status, error, details = "unhealthy", str(e), {}
+        result = {
+            "status": status,
+            "error": error,
+            "checked_at": time.time(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        result.update(details)
+        with _health_lock:
+            _health_results[name] = result
+
+def _health_sampler_loop():
+    while True:
         try:
-            with get_db_conn() as conn, conn.cursor() as cur:
-                cur.execute("SELECT 1")
-                _ = cur.fetchone()
+            _health_sample_once()
         except Exception as e:
-            db_status = "unhealthy"
-            db_error = str(e)
-        
-        # Overall health status
-        overall_status = "healthy"
-        if config_status == "unhealthy" or layout_status == "unhealthy":
-            overall_status = "unhealthy"
-        elif config_status == "warning" or layout_status == "warning":
-            overall_status = "warning"
-        
+            print(f"Health sampler error: {e}")
+        time.sleep(_health_sample_interval)
+
+def _ensure_health_sampler():
+    """Startet den Sampler lazily im Worker-Prozess (Threads überleben kein fork)."""
+    global _health_sampler
+    if _health_sampler is not None and _health_sampler.is_alive():
+        return
+    with _health_lock:
+        if _health_sampler is not None and _health_sampler.is_alive():
+            return
+        _health_sampler = threading.Thread(target=_health_sampler_loop, name='health-sampler', daemon=True)
+        _health_sampler.start()
+
+def _health_snapshot():
+    """Kopie der gecachten Ergebnisse mit Alter; veraltete Samples gelten als unhealthy."""
+    _ensure_health_sampler()
+    now = time.time()
+    with _health_lock:
+        results = {name: dict(result) for name, result in _health_results.items()}
+    for name, _check in _HEALTH_CHECKS:
+        result = results.setdefault(name, {"status": "unknown", "error": "not sampled yet", "checked_at": None})
+        checked_at = result.get("checked_at")
+        result["age_seconds"] = round(now - checked_at, 1) if checked_at else None
+        if checked_at and now - checked_at > 4 * _health_sample_interval + 30:
+            result["status"] = "unhealthy"
+            result["error"] = f"stale sample ({int(now - checked_at)}s old)"
+    return results
+
+def _health_overall(results):
+    statuses = [r["status"] for name, r in results.items() if name in ('database', 'configuration')]
+    if "unhealthy" in statuses:
+        return "unhealthy"
+    if "unknown" in statuses:
+        return "starting"
+    if "warning" in statuses or any(r["status"] != "healthy" for r in results.values()):
+        return "warning"
+    return "healthy"
+
+@server.route('/health/live')
+def health_live():
+    """Liveness probe: no I/O, answers as long as the worker is responsive."""
+    return jsonify({
+        "status": "alive",
+        "timestamp": time.time(),
+        "uptime": time.time() - _health_started_at,
+        "pid": os.getpid()
+    }), 200
+
+@server.route('/health/ready')
+def health_ready():
+    """Readiness probe served from the background sampler."""
+    results = _health_snapshot()
+    overall_status = _health_overall(results)
+    status_code = 503 if overall_status in ("unhealthy", "starting") else 200
+    return jsonify({
+        "status": overall_status,
+        "timestamp": time.time(),
+        "uptime": time.time() - _health_started_at,
+        "components": results,
+        "startup": dict(_startup_state)
+    }), status_code
+
+@server.route('/health')
+def health_check():
+    """Health check endpoint for monitoring the application status"""
+    try:
+        results = _health_snapshot()
+        overall_status = _health_overall(results)
+
+        import psutil  # only needed here
+
+        # Non-blocking: CPU-Auslastung seit dem letzten Aufruf (kein interval=1 Sleep)
+        cpu_percent = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory()
+
+        components = dict(results)
+        components["layout"] = {
+            "status": "healthy",
+            "error": None,
+            "cache_age": time.time() - _layout_cache_timestamp if _layout_cache_timestamp > 0 else None,
+            "cache_ttl": _layout_cache_ttl
+        }
+
         health_data = {
             "status": overall_status,
             "timestamp": time.time(),
-            "uptime": time.time() - _config_cache_timestamp if _config_cache_timestamp > 0 else 0,
-            "components": {
-                "configuration": {
-                    "status": config_status,
-                    "error": config_error,
-                    "cache_age": time.time() - _config_cache_timestamp if _config_cache_timestamp > 0 else None,
-                    "cache_ttl": _config_cache_ttl
-                },
-                "layout": {
-                    "status": layout_status,
-                    "error": layout_error,
-                    "cache_age": time.time() - _layout_cache_timestamp if _layout_cache_timestamp > 0 else None,
-                    "cache_ttl": _layout_cache_ttl
-                },
-                "database": {
-                    "status": db_status,
-                    "error": db_error
-                }
-            },
+            "uptime": time.time() - _health_started_at,
+            "components": components,
             "system": {
                 "cpu_percent": cpu_percent,
                 "memory_percent": memory.percent,
                 "memory_available": memory.available,
                 "memory_total": memory.total
-            }
+            },
+            "page_view_buffer": get_page_view_buffer_stats(),
+            "cache_bus": get_cache_bus_stats(),
+            "startup": dict(_startup_state)
         }
-        
-        status_code = 200 if overall_status == "healthy" else (503 if overall_status == "unhealthy" else 200)
+
+        status_code = 503 if overall_status == "unhealthy" else 200
         return jsonify(health_data), status_code
-        
+
     except Exception as e:
         error_data = {
             "status": "unhealthy",
@@ -962,39 +1195,24 @@ def validate_otp_api():
         if not email or not otp_code:
             return jsonify({'error': 'E-Mail und OTP-Code sind erforderlich'}), 400
         
-        # Get user by email
-        user = get_user_by_email(email)
-        if not user:
+        status, user_id = verify_otp_login(email, otp_code, request.remote_addr)
+        if status == OTP_RATE_LIMITED:
+            return jsonify({'error': 'Zu viele Versuche. Bitte warte einen Moment.'}), 429
+        if status == OTP_NOT_FOUND:
             return jsonify({'error': 'Benutzer nicht gefunden'}), 404
-        
-        user_id = user[0]
-        
-        # Check if account is locked
-        if is_account_locked(user_id):
+        if status == OTP_LOCKED:
             return jsonify({'error': 'Konto ist gesperrt. Bitte versuche es später erneut.'}), 423
-        
-        # Validate OTP
-        if validate_otp(user_id, otp_code):
-            # Authentication successful
-            return jsonify({
-                'message': 'Authentifizierung erfolgreich',
-                'user_id': user_id,
-                'email': email
-            }), 200
-        else:
-            # OTP validation failed
-            # Check if we should lock the account
-            with get_db_conn() as conn, conn.cursor() as cur:
-                cur.execute("""
-                    SELECT failed_login_attempts FROM users WHERE id = %s
-                """, (user_id,))
-                failed_attempts = cur.fetchone()[0] if cur.fetchone() else 0
-                
-                if failed_attempts >= 5:
-                    lock_user_account(user_id)
-                    return jsonify({'error': 'Zu viele fehlgeschlagene Versuche. Konto ist jetzt gesperrt.'}), 423
-            
+        if status == OTP_LOCKED_NOW:
+            return jsonify({'error': 'Zu viele fehlgeschlagene Versuche. Konto ist jetzt gesperrt.'}), 423
+        if status != OTP_OK:
             return jsonify({'error': 'Ungültiger OTP-Code'}), 401
+
+        # Authentication successful
+        return jsonify({
+            'message': 'Authentifizierung erfolgreich',
+            'user_id': user_id,
+            'email': email
+        }), 200
             
     except Exception as e:
         return jsonify({'error': f'Fehler bei der Verifizierung: {str(e)}'}), 500
@@ -1052,8 +1270,9 @@ def track_page_view():
         if user_agent:
             user_agent_hash = hashlib.sha256(user_agent.encode()).hexdigest()[:16]
         
-        # Log the page view
-        log_page_view(page, session_id, user_agent_hash, referrer)
+        # Queue the page view; a background flusher bulk-inserts batches
+        if not enqueue_page_view(page, session_id, user_agent_hash, referrer):
+            return jsonify({'session_id': session_id, 'status': 'dropped'}), 202
         
         return jsonify({'session_id': session_id, 'status': 'tracked'}), 200
         
@@ -1061,6 +1280,68 @@ def track_page_view():
         print(f"Error tracking page view: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+# Live log stream for the admin log page (Server-Sent Events).
+# One shared follower thread per worker reads cron.log; each client gets a bounded queue.
+_LOG_STREAM_MAX_SECONDS = int(os.getenv('TI_LOG_STREAM_MAX_SECONDS', '600'))  # client reconnects via Last-Event-ID
+_LOG_STREAM_KEEPALIVE_SECONDS = 15
+_LOG_STREAM_RESET_LINES = 100
+
+def _sse_event(event, data, event_id=None):
+    head = f"id: {event_id}\n" if event_id else ''
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@server.route('/api/admin/logs/stream')
+def admin_log_stream():
+    """Stream newly appended cron.log lines; resume via Last-Event-ID or ?offset=<inode>:<bytes>."""
+    if not verify_log_stream_token(request.args.get('token', '')):
+        abort(403)
+
+    resume = request.headers.get('Last-Event-ID') or request.args.get('offset') or ''
+    hub = get_log_stream_hub()
+    q, inode, offset = hub.subscribe()
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            if resume and inode is not None:
+                catch_up = None
+                try:
+                    resume_inode, resume_offset = (int(x) for x in resume.split(':', 1))
+                    catch_up = read_log_range(CRON_LOG_FILE, resume_inode, resume_offset, offset)
+                except ValueError:
+                    pass
+                if catch_up is None:
+                    # Offset passt nicht mehr (Rotation/zu große Lücke): mit aktuellem Tail neu aufsetzen
+                    tail = read_log_range(CRON_LOG_FILE, inode, max(0, offset - 64 * 1024), offset,
+                                          partial_start=True) or []
+                    yield _sse_event('reset', tail[-_LOG_STREAM_RESET_LINES:], f"{inode}:{offset}")
+                elif catch_up:
+                    yield _sse_event('lines', catch_up, f"{inode}:{offset}")
+
+            deadline = time.time() + _LOG_STREAM_MAX_SECONDS
+            while time.time() < deadline:
+                try:
+                    event = q.get(timeout=max(0.1, min(_LOG_STREAM_KEEPALIVE_SECONDS, deadline - time.time())))
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    # Queue lief voll: Verbindung beenden, Browser setzt per Last-Event-ID wieder auf
+                    yield _sse_event('lagging', [])
+                    return
+                event_inode, end_offset, lines = event
+                if lines is None:
+                    yield _sse_event('rotate', [], f"{event_inode}:0")
+                else:
+                    yield _sse_event('lines', lines, f"{event_inode}:{end_offset}")
+        finally:
+            hub.unsubscribe(q)
+
+    resp = Response(generate(), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'  # nginx: do not buffer the stream
+    return resp
+
 # Callback to show/hide admin link in hamburger menu
 @callback(
     Output('admin-menu-link', 'style'),
@@ -1081,4 +1362,5 @@ def toggle_admin_menu_link(auth_data):
 # Pages are automatically registered via dash.register_page in their respective files
 
 if __name__ == '__main__':
+    start_startup_warmup()
     app.run(debug=False)
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+OTP-Anmeldung und Kontosperre in einer Transaktion.
+
+``verify_otp_login()`` erledigt Benutzersuche (Blind Index), Sperrprüfung,
+OTP-Prüfung, Verbrauch des Codes und den Fehlversuchszähler über genau eine
+Verbindung: eine Abfrage liest Benutzer und aktuellen Code (``FOR UPDATE``),
+eine zweite Anweisung schreibt das Ergebnis. Parallele Rateversuche für dasselbe
+Konto werden so serialisiert und zählen korrekt.
+
+Vor der Datenbank stehen In-Memory-Token-Buckets je IP und je Konto, die
+Bursts abweisen. Die Buckets gelten pro Prozess (bei mehreren Gunicorn-Workern
+entsprechend mehrfach). Hinter nginx muss die Client-IP aus X-Forwarded-For
+kommen (``trust_proxy_headers()``), sonst teilen sich alle Clients einen Bucket.
+"""
+
+import os
+import time
+import hmac
+import hashlib
+import threading
+from collections import OrderedDict
+
+from mylibrary import (
+    get_db_conn,
+    get_user_by_email,
+    email_blind_index,
+    normalize_email,
+    hash_with_salt,
+)
+
+AUTH_MAX_FAILED_ATTEMPTS = int(os.getenv('TI_AUTH_MAX_FAILED_ATTEMPTS', '5'))
+AUTH_LOCK_MINUTES = int(os.getenv('TI_AUTH_LOCK_MINUTES', '30'))
+
+# Token-Buckets: Burst-Größe und Nachfüllrate pro Minute
+AUTH_IP_BURST = float(os.getenv('TI_AUTH_IP_BURST', '20'))
+AUTH_IP_PER_MINUTE = float(os.getenv('TI_AUTH_IP_PER_MINUTE', '10'))
+AUTH_ACCOUNT_BURST = float(os.getenv('TI_AUTH_ACCOUNT_BURST', '5'))
+AUTH_ACCOUNT_PER_MINUTE = float(os.getenv('TI_AUTH_ACCOUNT_PER_MINUTE', '2'))
+AUTH_BUCKET_MAX_KEYS = 10000
+# Anzahl vertrauenswürdiger Reverse-Proxies vor der App (nginx); 0 = remote_addr unverändert.
+# Standard 0, damit direkt erreichbare Instanzen X-Forwarded-For nicht ungeprüft übernehmen
+AUTH_TRUSTED_PROXIES = int(os.getenv('TI_TRUSTED_PROXIES', '0'))
+
+# Ergebnisse von verify_otp_login()
+OTP_OK = 'ok'
+OTP_INVALID = 'invalid'
+OTP_LOCKED = 'locked'
+OTP_LOCKED_NOW = 'locked_now'
+OTP_NOT_FOUND = 'not_found'
+OTP_RATE_LIMITED = 'rate_limited'
+
+
+class TokenBucketLimiter:
+    """Thread-safe token buckets per key with LRU-bounded key set."""
+
+    def __init__(self, burst, per_minute, max_keys=AUTH_BUCKET_MAX_KEYS, clock=time.monotonic):
+        self.burst = float(burst)
+        self.rate = float(per_minute) / 60.0
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = OrderedDict()  # key -> [tokens, last_refill]
+        self._lock = threading.Lock()
+
+    def acquire(self, key, cost=1.0):
+        """Take ``cost`` tokens; returns (allowed, retry_after_seconds)."""
+        if key is None or self.burst <= 0:
+            return True, 0.0
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                bucket = [self.burst, now]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return True, 0.0
+            if self.rate <= 0:
+                return False, float('inf')
+            return False, (cost - bucket[0]) / self.rate
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+_ip_limiter = TokenBucketLimiter(AUTH_IP_BURST, AUTH_IP_PER_MINUTE)
+_account_limiter = TokenBucketLimiter(AUTH_ACCOUNT_BURST, AUTH_ACCOUNT_PER_MINUTE)
+
+
+def trust_proxy_headers(flask_app, hops=AUTH_TRUSTED_PROXIES):
+    """Let request.remote_addr be the client IP forwarded by ``hops`` trusted proxies."""
+    if hops > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        flask_app.wsgi_app = ProxyFix(flask_app.wsgi_app, x_for=hops)
+    return flask_app
+
+
+def _account_key(email):
+    """Rate-limit key for an account without keeping the address in memory."""
+    normalized = normalize_email(email)
+    if not normalized:
+        return None
+    return email_blind_index(normalized) or hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def check_auth_rate_limit(email, ip_address=None):
+    """Apply the per-IP and per-account buckets; returns (allowed, retry_after_seconds)."""
+    allowed, retry_after = _ip_limiter.acquire(ip_address)
+    if not allowed:
+        return False, retry_after
+    return _account_limiter.acquire(_account_key(email))
+
+
+_LOGIN_STATE_SQL = """
+    SELECT u.id, u.email_hash, u.email_salt,
+           COALESCE(u.locked_until > NOW(), FALSE) AS locked,
+           o.id, o.otp_hash, o.salt
+    FROM users u
+    LEFT JOIN LATERAL (
+        SELECT id, otp_hash, salt FROM otp_codes
+        WHERE user_id = u.id AND used = FALSE AND expires_at > NOW()
+        ORDER BY created_at DESC LIMIT 1
+    ) o ON TRUE
+    WHERE {where}
+    FOR UPDATE OF u
+"""
+
+# Der Code wird nur verbraucht, wenn er noch unbenutzt ist: die OTP-Zeile ist im
+# Lesezugriff nicht gesperrt, ein paralleler Login mit demselben Code erhält 0 Zeilen
+_LOGIN_SUCCESS_SQL = """
+    WITH consumed AS (
+        UPDATE otp_codes SET used = TRUE
+        WHERE id = %s AND used = FALSE AND expires_at > NOW()
+        RETURNING id
+    )
+    UPDATE users SET last_login = NOW(), failed_login_attempts = 0, locked_until = NULL
+    WHERE id = %s AND EXISTS (SELECT 1 FROM consumed)
+    RETURNING id
+"""
+
+# Zähler erhöhen; beim Erreichen der Grenze sperren und Zähler für die Zeit danach zurücksetzen
+_LOGIN_FAILURE_SQL = """
+    UPDATE users SET
+        failed_login_attempts = CASE
+            WHEN COALESCE(failed_login_attempts, 0) + 1 >= %(max_attempts)s THEN 0
+            ELSE COALESCE(failed_login_attempts, 0) + 1 END,
+        locked_until = CASE
+            WHEN COALESCE(failed_login_attempts, 0) + 1 >= %(max_attempts)s
+            THEN NOW() + make_interval(mins => %(lock_minutes)s)
+            ELSE locked_until END
+    WHERE id = %(user_id)s
+    RETURNING COALESCE(locked_until > NOW(), FALSE)
+"""
+
+
+def _fetch_login_state(cur, email):
+    email = normalize_email(email)
+    email_bidx = email_blind_index(email)
+    if email_bidx:
+        cur.execute(_LOGIN_STATE_SQL.format(where='u.email_bidx = %s'), (email_bidx,))
+        row = cur.fetchone()
+        if row and hmac.compare_digest(row[1], hash_with_salt(email, row[2])):
+            return row
+    return None
+
+
+def verify_otp_login(email, otp, ip_address=None):
+    """Verify an OTP login attempt.
+
+    Returns (status, user_id) with status one of OTP_OK, OTP_INVALID, OTP_LOCKED,
+    OTP_LOCKED_NOW, OTP_NOT_FOUND or OTP_RATE_LIMITED (user_id is then None).
+    """
+    allowed, _retry_after = check_auth_rate_limit(email, ip_address)
+    if not allowed:
+        return OTP_RATE_LIMITED, None
+
+    email = str(email).strip()
+    otp = str(otp).strip()
+    with get_db_conn() as conn, conn.cursor() as cur:
+        row = _fetch_login_state(cur, email)
+        if row is None:
+            if email_blind_index(email):
+                return OTP_NOT_FOUND, None
+            # Ohne Schlüssel gibt es keinen Blind Index: get_user_by_email() vergleicht
+            # dann die salted Hashes
+            user = get_user_by_email(email)
+            if not user:
+                return OTP_NOT_FOUND, None
+            cur.execute(_LOGIN_STATE_SQL.format(where='u.id = %s'), (user[0],))
+            row = cur.fetchone()
+            if row is None:
+                return OTP_NOT_FOUND, None
+
+        user_id, _email_hash, _email_salt, locked, otp_id, otp_hash, otp_salt = row
+        if locked:
+            return OTP_LOCKED, user_id
+        if otp_id is None:
+            # Kein gültiger Code vorhanden - zählt nicht als Fehlversuch
+            return OTP_INVALID, user_id
+
+        if hmac.compare_digest(otp_hash, hash_with_salt(otp, otp_salt)):
+            cur.execute(_LOGIN_SUCCESS_SQL, (otp_id, user_id))
+            if cur.fetchone() is None:
+                # Code wurde inzwischen von einer parallelen Anfrage verbraucht
+                return OTP_INVALID, user_id
+            _account_limiter.reset(_account_key(email))
+            return OTP_OK, user_id
+
+        cur.execute(_LOGIN_FAILURE_SQL, {
+            'max_attempts': AUTH_MAX_FAILED_ATTEMPTS,
+            'lock_minutes': AUTH_LOCK_MINUTES,
+            'user_id': user_id,
+        })
+        locked_now = cur.fetchone()
+        return (OTP_LOCKED_NOW if locked_now and locked_now[0] else OTP_INVALID), user_id
@@ -1,6 +1,5 @@
 # Import packages
 from mylibrary import *
-import yaml
 import os
 import time
 import gc
@@ -9,7 +8,6 @@ import json
 import pandas as pd
 import numpy as np
 import pytz
-import apprise
 # h5py removed - using TimescaleDB only
 
 # Enhanced logging setup with file logging and daily rotation
@@ -91,19 +89,6 @@ def log(message, level='INFO'):
         timestamp = datetime.now(tz=pytz.timezone('Europe/Berlin')).strftime('%Y-%m-%d %H:%M:%S %Z')
         print(f"{timestamp} - {level} - {message}")
 
-def load_core_config():
-    """Load core configuration from config.yaml"""
-    try:
-        config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        return config.get('core', {})
-    except Exception as e:
-        log(f"ERROR loading core configuration: {e}")
-        return {}
-
-
-
 def calculate_recording_duration():
     """Calculate the total recording duration from TimescaleDB availability data"""
     try:
@@ -451,21 +436,28 @@ def update_statistics_file():
         recent_incidents = get_recent_incidents(limit=10)  # Get more for potential expansion
         stats['recent_incidents'] = recent_incidents
         log(f"Retrieved {len(recent_incidents)} recent incidents")
+
+        # Per-CI metrics (MTTR/MTBF/incidents) for O(1) lookups come from the same scan
+        log(f"Per-CI metrics for {len(stats.get('per_ci_metrics') or {})} CIs")
         
         # Add timestamp for when statistics were calculated (UTC)
-        stats['last_updated'] = datetime.now(timezone.utc).isoformat()
+        stats['last_updated'] = datetime.now(timezone.utc)
         
         # Force garbage collection after heavy computation
         import gc
         gc.collect()
         log("Memory cleanup completed after statistics calculation")
         
-        # Save to JSON file
-        statistics_file_path = os.path.join(os.path.dirname(__file__), 'data', 'statistics.json')
+        # Write versioned snapshots atomically (temp file + rename): msgpack for the
+        # web pages, compact JSON for scripts and as fallback without msgpack
         try:
-            with open(statistics_file_path, 'w', encoding='utf-8') as f:
-                json.dump(stats, f, indent=2, ensure_ascii=False, default=str)
-            log(f"Statistics saved to {statistics_file_path}")
+            generation = None
+            if msgpack is not None:
+                generation = write_snapshot(STATISTICS_SNAPSHOT_FILE, stats, 'statistics')
+                log(f"Statistics snapshot saved to {STATISTICS_SNAPSHOT_FILE} (generation {generation})")
+            generation = write_snapshot(STATISTICS_FILE, stats, 'statistics', generation=generation)
+            log(f"Statistics saved to {STATISTICS_FILE} (generation {generation})")
+            publish_cache_event('statistics', generation=generation)
             return True
         except Exception as e:
             log(f"ERROR saving statistics file: {e}")
@@ -567,6 +559,7 @@ def update_downtimes_file() -> bool:
                     """,
                     rows
                 )
+                publish_cache_event('downtimes', cur, rows=len(rows))
                 conn.commit()
                 log(f"Downtimes upserted for {len(rows)} CIs")
                 return True
@@ -642,6 +635,36 @@ def main():
                     log("update_file completed")
                 except Exception as e:
                     log(f"ERROR in update_file: {e}")
+
+                # Extend the level-of-detail pyramid (5min/1h/6h/1d) with the new measurements
+                rollup_since = None
+                try:
+                    rollup_since = get_availability_rollup_watermark()
+                    rows = refresh_availability_rollups(rollup_since)
+                    log(f"Availability rollups refreshed ({rows} rows)")
+                except Exception as e:
+                    log(f"ERROR in availability rollups: {e}")
+
+                # Fold the rewritten hours into the per-product/per-organization rollups
+                try:
+                    rows = refresh_group_rollups(rollup_since)
+                    log(f"Group rollups refreshed ({rows} rows)")
+                except Exception as e:
+                    log(f"ERROR in group rollups: {e}")
+
+                # Count new incidents into the weekday/hour heatmap grid
+                try:
+                    rows = refresh_incident_heatmap()
+                    log(f"Incident heatmap refreshed ({rows} hours)")
+                except Exception as e:
+                    log(f"ERROR in incident heatmap refresh: {e}")
+
+                # Fold new page views into the hourly/daily visitor rollups
+                try:
+                    rows = refresh_page_view_rollups()
+                    log(f"Page view rollups refreshed ({rows} rows)")
+                except Exception as e:
+                    log(f"ERROR in page view rollups: {e}")
                 
 
                 
@@ -662,6 +685,13 @@ def main():
                     log("Downtimes update completed")
                 except Exception as e:
                     log(f"ERROR in downtimes update: {e}")
+
+                # Prerender the data-heavy parts of the home page for the web workers
+                try:
+                    generation = write_home_artifact()
+                    log(f"Home artifact written (generation {generation})")
+                except Exception as e:
+                    log(f"ERROR writing home artifact: {e}")
                 
                 # Send notifications every 5 minutes
                 if now_epoch - last_notification_time > 300:  # Every 5 minutes
@@ -0,0 +1,552 @@
+"""
+Versionierte Schema-Migrationen für TimescaleDB.
+
+Jeder Schritt läuft genau einmal und wird in ``schema_migrations`` vermerkt.
+Ist das Schema aktuell, kostet ``apply_migrations()`` nur eine kurze Abfrage
+ohne Sperren. Ausstehende Schritte laufen unter einer Advisory-Lock, sodass
+parallel startende Prozesse (Web-Worker, Cron) sie nicht doppelt ausführen.
+
+Neue Migrationen werden ausschließlich am Ende von ``MIGRATIONS`` angehängt;
+bestehende Schritte werden nach dem Ausrollen nicht mehr verändert.
+"""
+
+import os
+import time
+
+from psycopg2.extras import execute_values
+
+from mylibrary import (
+    get_db_conn,
+    PAGE_VIEW_RETENTION_DAYS,
+    INCIDENT_HEATMAP_RETENTION_DAYS,
+    refresh_incident_heatmap_hours,
+    rebuild_page_view_daily_rollups,
+    decrypt_data,
+    email_blind_index,
+    hash_with_salt,
+    normalize_email,
+)
+
+MIGRATIONS_LOCK_KEY = 0x5449_4D47  # 'TIMG'
+
+
+def _m0001_users(cur):
+    # users table exists first - referenced by others
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            email TEXT UNIQUE NOT NULL,
+            email_hash TEXT NOT NULL,
+            email_salt TEXT NOT NULL,
+            email_encrypted TEXT,
+            email_enc_salt TEXT,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            last_login TIMESTAMPTZ,
+            failed_login_attempts INTEGER DEFAULT 0,
+            locked_until TIMESTAMPTZ
+        )
+    """)
+    # Add columns for encrypted email if missing
+    cur.execute("""
+        ALTER TABLE IF EXISTS users
+          ADD COLUMN IF NOT EXISTS email_encrypted TEXT,
+          ADD COLUMN IF NOT EXISTS email_enc_salt TEXT
+    """)
+
+
+def _m0002_otp_codes(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS otp_codes (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            otp_hash TEXT NOT NULL,
+            salt TEXT NOT NULL,
+            expires_at TIMESTAMPTZ NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            used BOOLEAN DEFAULT FALSE,
+            ip_address TEXT
+        )
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_otp_codes_user_id ON otp_codes(user_id)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_otp_codes_expires_at ON otp_codes(expires_at)
+    """)
+
+
+def _m0003_notification_profiles(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS notification_profiles (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL CHECK (type IN ('whitelist', 'blacklist')),
+            ci_list TEXT[] DEFAULT '{}',
+            apprise_urls TEXT[] DEFAULT '{}',
+            apprise_urls_hash TEXT[],
+            apprise_urls_salt TEXT[],
+            email_notifications BOOLEAN DEFAULT FALSE,
+            email_address TEXT,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            last_tested_at TIMESTAMPTZ,
+            test_result TEXT,
+            unsubscribe_token TEXT UNIQUE
+        )
+    """)
+    # Ensure new columns on notification_profiles
+    cur.execute("""
+        ALTER TABLE IF EXISTS notification_profiles
+          ADD COLUMN IF NOT EXISTS apprise_urls_hash TEXT[],
+          ADD COLUMN IF NOT EXISTS apprise_urls_salt TEXT[],
+          ADD COLUMN IF NOT EXISTS email_notifications BOOLEAN DEFAULT FALSE,
+          ADD COLUMN IF NOT EXISTS email_address TEXT,
+          ADD COLUMN IF NOT EXISTS unsubscribe_token TEXT UNIQUE
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notification_profiles_unsubscribe_token
+          ON notification_profiles(unsubscribe_token)
+    """)
+
+
+def _m0004_notification_logs(cur):
+    # notification_logs for extended statistics
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS notification_logs (
+            id SERIAL PRIMARY KEY,
+            profile_id INTEGER REFERENCES notification_profiles(id) ON DELETE CASCADE,
+            ci TEXT NOT NULL,
+            notification_type TEXT NOT NULL CHECK (notification_type IN ('incident', 'recovery')),
+            sent_at TIMESTAMPTZ DEFAULT NOW(),
+            delivery_status TEXT DEFAULT 'sent' CHECK (delivery_status IN ('sent', 'failed', 'pending')),
+            error_message TEXT,
+            recipient_type TEXT CHECK (recipient_type IN ('email', 'apprise')),
+            recipient_count INTEGER DEFAULT 1
+        )
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notification_logs_sent_at
+          ON notification_logs(sent_at)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notification_logs_profile_ci
+          ON notification_logs(profile_id, ci)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notification_logs_type_status
+          ON notification_logs(notification_type, delivery_status)
+    """)
+
+
+def _m0005_page_views(cur):
+    # page_views table for visitor statistics
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS page_views (
+            id SERIAL,
+            page TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            user_agent_hash TEXT,
+            referrer TEXT,
+            ts TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_page_views_ts
+          ON page_views(ts)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_page_views_page
+          ON page_views(page)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_page_views_session
+          ON page_views(session_id)
+    """)
+
+
+def _m0006_ci_downtimes(cur):
+    # per-CI downtimes 7d/30d
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS ci_downtimes (
+            ci TEXT PRIMARY KEY,
+            downtime_7d_min DOUBLE PRECISION DEFAULT 0,
+            downtime_30d_min DOUBLE PRECISION DEFAULT 0,
+            computed_at TIMESTAMPTZ DEFAULT NOW()
+        )
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ci_downtimes_computed_at ON ci_downtimes(computed_at)
+    """)
+
+
+def _m0007_availability_rollups(cur):
+    # Level-of-detail pyramid for long plot windows
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS availability_rollups (
+            ci TEXT NOT NULL,
+            bucket_minutes INTEGER NOT NULL,
+            bucket_start TIMESTAMPTZ NOT NULL,
+            samples INTEGER NOT NULL DEFAULT 0,
+            down_samples INTEGER NOT NULL DEFAULT 0,
+            down_fraction REAL NOT NULL DEFAULT 0,
+            incidents INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (ci, bucket_minutes, bucket_start)
+        )
+    """)
+    cur.execute("""
+        SELECT create_hypertable('availability_rollups', 'bucket_start',
+                                 chunk_time_interval => INTERVAL '30 days',
+                                 if_not_exists => TRUE)
+    """)
+
+
+def _m0008_page_view_rollups(cur):
+    # page_views als Hypertable mit Retention; Auswertung nur noch über Rollups.
+    # Hypertables erlauben keinen Primärschlüssel ohne Zeitspalte -> PK(id) entfernen.
+    cur.execute("ALTER TABLE page_views DROP CONSTRAINT IF EXISTS page_views_pkey")
+    cur.execute("DELETE FROM page_views WHERE ts IS NULL")
+    cur.execute("ALTER TABLE page_views ALTER COLUMN ts SET NOT NULL")
+    cur.execute("""
+        SELECT create_hypertable('page_views', 'ts',
+                                 chunk_time_interval => INTERVAL '1 day',
+                                 if_not_exists => TRUE,
+                                 migrate_data => TRUE)
+    """)
+    cur.execute(
+        f"SELECT add_retention_policy('page_views', INTERVAL '{int(PAGE_VIEW_RETENTION_DAYS)} days', if_not_exists => TRUE)"
+    )
+    for rollup_table in ('page_view_rollups_hourly', 'page_view_rollups_daily'):
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {rollup_table} (
+                bucket_start TIMESTAMPTZ NOT NULL,
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL DEFAULT '',
+                views BIGINT NOT NULL DEFAULT 0,
+                sessions_hll BYTEA,
+                PRIMARY KEY (dimension, key, bucket_start)
+            )
+        """)
+        cur.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{rollup_table}_dim_bucket
+              ON {rollup_table}(dimension, bucket_start)
+        """)
+
+
+def _m0009_sanitize_pii(cur):
+    # Sanitize existing PII: replace plain emails with hashes where detectable.
+    # Best-effort: a failure must not block the remaining migrations.
+    cur.execute("SAVEPOINT sanitize_pii")
+    try:
+        cur.execute(r"""
+            UPDATE users
+            SET email = email_hash
+            WHERE email ~ '^[^@]+@[^@]+\.[^@]+$'
+        """)
+        # Null out any stored profile email addresses
+        cur.execute("""
+            ALTER TABLE IF EXISTS notification_profiles
+              ALTER COLUMN email_address DROP NOT NULL
+        """)
+        cur.execute("""
+            UPDATE notification_profiles
+            SET email_address = NULL
+            WHERE email_address IS NOT NULL
+        """)
+        cur.execute("RELEASE SAVEPOINT sanitize_pii")
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT sanitize_pii")
+        print(f"Migration sanitize_pii skipped: {e}")
+
+
+def _m0010_users_email_bidx(cur):
+    # Keyed blind index for point lookups by email (see email_blind_index)
+    cur.execute("""
+        ALTER TABLE IF EXISTS users
+          ADD COLUMN IF NOT EXISTS email_bidx TEXT
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_bidx ON users(email_bidx)
+    """)
+    # Backfill from the encrypted address; rows that cannot be decrypted stay NULL.
+    # Without a key the backfill runs once one is configured (_check_email_index_key).
+    indexed = _index_user_emails(cur)
+    if indexed is None:
+        print("Migration users_email_bidx: no key configured, backfill deferred to login")
+        return
+    print(f"Migration users_email_bidx: {indexed} users indexed")
+
+
+def _index_user_emails(cur):
+    """Setzt email_bidx für alle Konten ohne Index aus der entschlüsselten Adresse.
+
+    Returns die Anzahl indizierter Konten, None ohne konfigurierten Schlüssel.
+    """
+    encryption_key = os.getenv('ENCRYPTION_KEY')
+    if not encryption_key or not email_blind_index('probe@example.org'):
+        return None
+    cur.execute("""
+        SELECT id, email_hash, email_salt, email_encrypted, email_enc_salt
+        FROM users
+        WHERE email_bidx IS NULL AND email_encrypted IS NOT NULL
+        ORDER BY id
+    """)
+    seen = set()
+    updates = []
+    for user_id, email_hash, email_salt, email_encrypted, email_enc_salt in cur.fetchall():
+        email = normalize_email(decrypt_data(email_encrypted, email_enc_salt, encryption_key.encode()))
+        if not email or hash_with_salt(email, email_salt) != email_hash:
+            continue
+        bidx = email_blind_index(email)
+        if bidx in seen:
+            continue  # duplicate account for the same address: oldest keeps the index
+        seen.add(bidx)
+        updates.append((user_id, bidx))
+    if updates:
+        execute_values(cur, """
+            UPDATE users AS u SET email_bidx = v.bidx
+            FROM (VALUES %s) AS v(id, bidx)
+            WHERE u.id = v.id
+        """, updates)
+    return len(updates)
+
+
+def _m0011_incident_heatmap(cur):
+    # Incident counts per UTC hour (mit lokalem Wochentag/Stunde) für die Heatmap;
+    # gepflegt inkrementell durch refresh_incident_heatmap(), Ablauf über Tages-Chunks
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS incident_heatmap_hourly (
+            bucket_start TIMESTAMPTZ NOT NULL PRIMARY KEY,
+            weekday SMALLINT NOT NULL,
+            hour SMALLINT NOT NULL,
+            incidents INTEGER NOT NULL DEFAULT 0,
+            ci_list TEXT[] NOT NULL DEFAULT '{}'
+        )
+    """)
+    cur.execute("""
+        SELECT create_hypertable('incident_heatmap_hourly', 'bucket_start',
+                                 chunk_time_interval => INTERVAL '1 day',
+                                 if_not_exists => TRUE)
+    """)
+    cur.execute(
+        "SELECT add_retention_policy('incident_heatmap_hourly', "
+        f"INTERVAL '{int(INCIDENT_HEATMAP_RETENTION_DAYS)} days', if_not_exists => TRUE)"
+    )
+    # Erstbefüllung des 30-Tage-Fensters; danach nur noch inkrementell per Cron
+    cur.execute("SELECT to_regclass('public.measurements')")
+    if cur.fetchone()[0] is not None:
+        refresh_incident_heatmap_hours(cur)
+
+
+def _m0012_group_rollups(cur):
+    # Stündliche Verfügbarkeit je Produkt/Organisation, gepflegt aus den 1h-Rollups
+    # (refresh_group_rollups); dimension = 'product' | 'organization';
+    # downtime_ci_minutes = Summe über alle CIs der Gruppe, keine Wanduhrzeit
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS availability_group_rollups_hourly (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL DEFAULT '',
+            bucket_start TIMESTAMPTZ NOT NULL,
+            cis INTEGER NOT NULL DEFAULT 0,
+            samples INTEGER NOT NULL DEFAULT 0,
+            down_samples INTEGER NOT NULL DEFAULT 0,
+            down_fraction REAL NOT NULL DEFAULT 0,
+            incidents INTEGER NOT NULL DEFAULT 0,
+            downtime_ci_minutes REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, key, bucket_start)
+        )
+    """)
+    cur.execute("""
+        SELECT create_hypertable('availability_group_rollups_hourly', 'bucket_start',
+                                 chunk_time_interval => INTERVAL '30 days',
+                                 if_not_exists => TRUE)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_availability_group_rollups_dim_bucket
+          ON availability_group_rollups_hourly(dimension, bucket_start)
+    """)
+
+
+def _m0013_app_settings(cur):
+    # Werte, die zwischen Starts gleich bleiben müssen (z. B. Fingerprint des
+    # Blind-Index-Schlüssels, siehe _check_email_index_key)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS app_settings (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+
+
+def _m0014_page_view_local_days(cur):
+    # Tages-Rollups der Seitenaufrufe laufen über Tage in Europe/Berlin statt UTC;
+    # neu aufgebaut werden die Tage, die noch in den Stunden-Rollups liegen
+    days = rebuild_page_view_daily_rollups(cur)
+    print(f"Migration page_view_local_days: {days} days rebuilt")
+
+
+# (version, name, step) - ascending, append only
+MIGRATIONS = (
+    (1, 'users', _m0001_users),
+    (2, 'otp_codes', _m0002_otp_codes),
+    (3, 'notification_profiles', _m0003_notification_profiles),
+    (4, 'notification_logs', _m0004_notification_logs),
+    (5, 'page_views', _m0005_page_views),
+    (6, 'ci_downtimes', _m0006_ci_downtimes),
+    (7, 'availability_rollups', _m0007_availability_rollups),
+    (8, 'page_view_rollups', _m0008_page_view_rollups),
+    (9, 'sanitize_pii', _m0009_sanitize_pii),
+    (10, 'users_email_bidx', _m0010_users_email_bidx),
+    (11, 'incident_heatmap', _m0011_incident_heatmap),
+    (12, 'group_rollups', _m0012_group_rollups),
+    (13, 'app_settings', _m0013_app_settings),
+    (14, 'page_view_local_days', _m0014_page_view_local_days),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def pending_migrations(applied_versions, migrations=MIGRATIONS):
+    """Noch nicht angewendete Schritte in Versionsreihenfolge."""
+    applied = set(applied_versions or ())
+    return [m for m in migrations if m[0] not in applied]
+
+
+def _applied_versions(cur):
+    cur.execute("SELECT to_regclass('public.schema_migrations')")
+    if cur.fetchone()[0] is None:
+        return None
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+EMAIL_INDEX_KEY_SETTING = 'email_index_key'
+
+
+def email_index_key_fingerprint():
+    """Blind Index einer festen Adresse: ändert sich genau dann, wenn der Schlüssel wechselt."""
+    return email_blind_index('fingerprint@ti-monitoring.invalid') or ''
+
+
+def _stored_email_index_key(cur):
+    cur.execute("SELECT to_regclass('public.app_settings')")
+    if cur.fetchone()[0] is None:
+        return None
+    cur.execute("SELECT value FROM app_settings WHERE name = %s", (EMAIL_INDEX_KEY_SETTING,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _check_email_index_key(cur):
+    """Indiziert alle Konten neu, wenn sich EMAIL_INDEX_KEY/ENCRYPTION_KEY geändert hat.
+
+    Mit altem Index fände get_user_by_email() niemanden mehr und legte beim nächsten
+    Login ein zweites Konto an. Greift auch, wenn erstmals ein Schlüssel gesetzt wird.
+    Nicht entschlüsselbare Konten bleiben ohne Index und sind per E-Mail nicht mehr
+    auffindbar (get_user_by_email() scannt nicht).
+    """
+    fingerprint = email_index_key_fingerprint()
+    if _stored_email_index_key(cur) == fingerprint:
+        return
+    cur.execute("UPDATE users SET email_bidx = NULL WHERE email_bidx IS NOT NULL")
+    indexed = _index_user_emails(cur)
+    cur.execute("""
+        INSERT INTO app_settings (name, value) VALUES (%s, %s)
+        ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value, updated_at = NOW()
+    """, (EMAIL_INDEX_KEY_SETTING, fingerprint))
+    print(f"Email blind index key changed: {indexed or 0} users re-indexed")
+
+
+def _page_view_retention_current(cur):
+    cur.execute("""
+        SELECT (config->>'drop_after')::interval = %s::interval
+        FROM timescaledb_information.jobs
+        WHERE proc_name = 'policy_retention' AND hypertable_name = 'page_views'
+    """, (f"{int(PAGE_VIEW_RETENTION_DAYS)} days",))
+    row = cur.fetchone()
+    return bool(row and row[0])
+
+
+def _sync_page_view_retention(cur):
+    """Ersetzt die Retention-Policy von page_views, wenn PAGE_VIEW_RETENTION_DAYS geändert wurde.
+
+    add_retention_policy(if_not_exists) lässt eine bestehende Policy unverändert.
+    """
+    if _page_view_retention_current(cur):
+        return
+    cur.execute("SELECT remove_retention_policy('page_views', if_exists => TRUE)")
+    cur.execute(
+        f"SELECT add_retention_policy('page_views', INTERVAL '{int(PAGE_VIEW_RETENTION_DAYS)} days')"
+    )
+    print(f"page_views retention policy set to {int(PAGE_VIEW_RETENTION_DAYS)} days")
+
+
+def _settings_current(cur):
+    """Schnellprüfung für den No-op-Pfad: Schlüssel-Fingerprint und Retention passen."""
+    return (_stored_email_index_key(cur) == email_index_key_fingerprint()
+            and _page_view_retention_current(cur))
+
+
+def apply_migrations():
+    """Wendet ausstehende Migrationen an; ohne ausstehende Schritte ein schneller No-op.
+
+    Danach wird der Blind-Index neu aufgebaut, falls der Schlüssel gewechselt hat, und
+    die Retention-Policy von page_views an PAGE_VIEW_RETENTION_DAYS angepasst.
+
+    Returns:
+        list: Versionen, die in diesem Aufruf angewendet wurden
+    """
+    with get_db_conn() as conn, conn.cursor() as cur:
+        applied = _applied_versions(cur)
+        up_to_date = applied is not None and not pending_migrations(applied) and _settings_current(cur)
+        conn.commit()
+        if up_to_date:
+            return []
+
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATIONS_LOCK_KEY,))
+        try:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    duration_ms INTEGER
+                )
+            """)
+            conn.commit()
+            # Nach dem Warten auf die Lock erneut lesen: ein anderer Prozess kann fertig sein
+            done = []
+            for version, name, step in pending_migrations(_applied_versions(cur)):
+                started = time.perf_counter()
+                try:
+                    step(cur)
+                    cur.execute(
+                        "INSERT INTO schema_migrations (version, name, duration_ms) VALUES (%s, %s, %s)",
+                        (version, name, int((time.perf_counter() - started) * 1000))
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    print(f"Migration {version:04d}_{name} failed")
+                    raise
+                print(f"Migration {version:04d}_{name} applied")
+                done.append(version)
+            try:
+                _check_email_index_key(cur)
+                _sync_page_view_retention(cur)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            return done
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATIONS_LOCK_KEY,))
+            conn.commit()
+
+
+def get_schema_version():
+    """Höchste angewendete Version (0, wenn schema_migrations fehlt)."""
+    with get_db_conn() as conn, conn.cursor() as cur:
+        applied = _applied_versions(cur)
+        return max(applied) if applied else 0
@@ -1,29 +1,137 @@
 import os
 import psycopg2
 from psycopg2.extras import execute_values
+import numpy as np
 import pandas as pd
 import yaml
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 import hashlib
+import importlib
+import sys
 import secrets
 import hmac
+import io
 import json
-import apprise
+import select
+import time
+import pytz
+import threading
+import queue
+import atexit
+import zlib
+from collections import OrderedDict, deque
+from types import MappingProxyType
+import re
+import html as htmllib
 from dotenv import load_dotenv
-from cryptography.fernet import Fernet
 
-def load_config():
-    """Load configuration from YAML file"""
+class _LazyModule:
+    """Stand-in that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+def lazy_import(name):
+    """Returns the module if already imported, otherwise a lazy stand-in."""
+    return sys.modules.get(name) or _LazyModule(name)
+
+# Heavy, subsystem-specific modules are loaded on first use:
+# apprise only for notifications, requests only for API polling (cron).
+apprise = lazy_import('apprise')
+requests = lazy_import('requests')
+
+# Zentrale Konfiguration (config.yaml): wird einmal geparst und nur neu geladen,
+# wenn sich mtime, inode oder Größe der Datei ändern. Die Datei wird höchstens
+# alle CONFIG_CHECK_INTERVAL Sekunden per stat() geprüft; dazwischen kostet ein
+# Zugriff nur das Lesen des aktuellen Snapshots.
+CONFIG_FILE = os.getenv('TI_CONFIG_FILE') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yaml')
+CONFIG_CHECK_INTERVAL = float(os.getenv('TI_CONFIG_CHECK_INTERVAL', '2'))
+
+def _config_section(parent, name):
+    section = parent.get(name) if isinstance(parent, dict) else None
+    return section if isinstance(section, dict) else {}
+
+class ConfigSnapshot:
+    """Parsed config.yaml; every section is guaranteed to be a dict.
+
+    Snapshots are shared between all callers and must be treated as read-only.
+    """
+    __slots__ = ('raw', 'core', 'footer', 'header', 'file_key', 'loaded_at')
+
+    def __init__(self, raw, file_key=None):
+        self.raw = raw if isinstance(raw, dict) else {}
+        self.core = _config_section(self.raw, 'core')
+        self.footer = _config_section(self.raw, 'footer')
+        self.header = _config_section(self.core, 'header')
+        self.file_key = file_key
+        self.loaded_at = time.time()
+
+    def section(self, name):
+        return _config_section(self.raw, name)
+
+_config_snapshot = None
+_config_file_key = None
+_config_checked_at = 0.0
+_config_lock = threading.Lock()
+
+def _config_file_stat_key(path):
     try:
-        config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')
-        if not os.path.exists(config_path):
-            return {}
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        print(f"Error loading config: {e}")
-        return {}
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def get_config():
+    """Return the current ConfigSnapshot, re-parsing config.yaml only after it changed."""
+    global _config_snapshot, _config_file_key, _config_checked_at
+    snapshot = _config_snapshot
+    if snapshot is not None and time.monotonic() - _config_checked_at < CONFIG_CHECK_INTERVAL:
+        return snapshot
+
+    with _config_lock:
+        now = time.monotonic()
+        if _config_snapshot is not None and now - _config_checked_at < CONFIG_CHECK_INTERVAL:
+            return _config_snapshot
+        file_key = _config_file_stat_key(CONFIG_FILE)
+        if _config_snapshot is None or file_key != _config_file_key:
+            if file_key is None:
+                _config_snapshot = ConfigSnapshot({})
+            else:
+                try:
+                    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                        _config_snapshot = ConfigSnapshot(yaml.safe_load(f) or {}, file_key)
+                except Exception as e:
+                    # Fehlerhafte Datei: letzten gültigen Stand behalten
+                    print(f"Error loading config: {e}")
+                    if _config_snapshot is None:
+                        _config_snapshot = ConfigSnapshot({})
+            _config_file_key = file_key
+        _config_checked_at = now
+        return _config_snapshot
+
+def load_config():
+    """Load configuration from YAML file (shared, cached; do not modify)"""
+    return get_config().raw
+
+def load_core_config():
+    """Load core configuration from cached config"""
+    return get_config().core
+
+def load_footer_config():
+    """Load footer configuration from cached config"""
+    return get_config().footer
+
+def load_header_config():
+    """Load header configuration from cached config"""
+    return get_config().header
 
 def get_db_conn():
     """Create a DB connection using environment variables only.
@@ -92,21 +200,25 @@ def init_timescaledb_schema():
 
 def write_measurements(rows):
     """rows: iterable of (ci, ts(datetime|str|epoch), status:int)"""
+    rows = list(rows)
     if not rows:
         return 0
     with get_db_conn() as conn, conn.cursor() as cur:
-        execute_values(cur,
-            "INSERT INTO measurements (ci, ts, status) VALUES %s ON CONFLICT DO NOTHING",
-            rows
-        )
-        return cur.rowcount
+        # RETURNING counts inserted rows over all pages (cur.rowcount covers only the last page)
+        written = len(execute_values(cur,
+            "INSERT INTO measurements (ci, ts, status) VALUES %s ON CONFLICT DO NOTHING RETURNING 1",
+            rows, fetch=True
+        ))
+        if written > 0:
+            publish_cache_event('availability', cur, rows=written)
+        return written
 
 def update_ci_metadata(ci_data):
     """Aktualisiert CI-Metadaten in TimescaleDB."""
     if not ci_data:
         return 0
     with get_db_conn() as conn, conn.cursor() as cur:
-        execute_values(cur,
+        changed_rows = execute_values(cur,
             """INSERT INTO ci_metadata (ci, name, organization, product, bu, tid, pdt, comment) 
                VALUES %s 
                ON CONFLICT (ci) DO UPDATE SET 
@@ -117,10 +229,38 @@ def update_ci_metadata(ci_data):
                  tid = EXCLUDED.tid,
                  pdt = EXCLUDED.pdt,
                  comment = EXCLUDED.comment,
-                 updated_at = NOW()""",
-            ci_data
+                 updated_at = NOW()
+               WHERE (ci_metadata.name, ci_metadata.organization, ci_metadata.product, ci_metadata.bu,
+                      ci_metadata.tid, ci_metadata.pdt, ci_metadata.comment)
+                     IS DISTINCT FROM
+                     (EXCLUDED.name, EXCLUDED.organization, EXCLUDED.product, EXCLUDED.bu,
+                      EXCLUDED.tid, EXCLUDED.pdt, EXCLUDED.comment)
+               RETURNING 1""",
+            ci_data, fetch=True
         )
-        return cur.rowcount
+        # Only new or changed CIs are counted (updated_at reflects real changes)
+        changed = len(changed_rows)
+        if changed > 0:
+            publish_cache_event('ci_metadata', cur, rows=changed)
+        return changed
+
+def get_ci_metadata_state():
+    """
+    Cheap change marker for ci_metadata (no hypertable access).
+
+    Returns:
+        tuple: (max(updated_at) or None, number of CIs)
+    """
+    with get_db_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT MAX(updated_at), COUNT(*) FROM ci_metadata")
+        row = cur.fetchone()
+        return (row[0], int(row[1] or 0)) if row else (None, 0)
+
+def get_ci_ids(limit: int = 1000) -> list:
+    """Returns CI ids from ci_metadata (sorted, limited)."""
+    with get_db_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT ci FROM ci_metadata ORDER BY ci LIMIT %s", (int(limit),))
+        return [row[0] for row in cur.fetchall() if row[0]]
 
 def ingest_hdf5_to_timescaledb(hdf5_path: str, max_rows: Optional[int] = None) -> int:
     """Streamt availability aus HDF5 und schreibt idempotent nach TimescaleDB.
@@ -198,177 +338,13 @@ def init_otp_database_schema():
         """)
 
 def run_db_migrations():
-    """Run idempotent DB migrations for production upgrades.
+    """Apply pending versioned schema migrations (see migrations.py).
 
-    - Ensure columns and indexes on notification_profiles
-    - Ensure users/otp_codes tables and indexes exist
+    Fast no-op when schema_migrations already contains every step; otherwise the
+    missing steps run once under an advisory lock. Returns the applied versions.
     """
-    with get_db_conn() as conn, conn.cursor() as cur:
-        # 1) Ensure users table exists (first - referenced by others)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                email TEXT UNIQUE NOT NULL,
-                email_hash TEXT NOT NULL,
-                email_salt TEXT NOT NULL,
-                email_encrypted TEXT,
-                email_enc_salt TEXT,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                last_login TIMESTAMPTZ,
-                failed_login_attempts INTEGER DEFAULT 0,
-                locked_until TIMESTAMPTZ
-            )
-        """)
-        # Add columns for encrypted email if missing
-        cur.execute("""
-            ALTER TABLE IF EXISTS users
-              ADD COLUMN IF NOT EXISTS email_encrypted TEXT,
-              ADD COLUMN IF NOT EXISTS email_enc_salt TEXT
-        """)
-
-        # 2) Ensure otp_codes table and indexes
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS otp_codes (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-                otp_hash TEXT NOT NULL,
-                salt TEXT NOT NULL,
-                expires_at TIMESTAMPTZ NOT NULL,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                used BOOLEAN DEFAULT FALSE,
-                ip_address TEXT
-            )
-        """)
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_otp_codes_user_id ON otp_codes(user_id)
-        """)
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_otp_codes_expires_at ON otp_codes(expires_at)
-        """)
-
-        # 3) Ensure notification_profiles table exists (latest schema)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS notification_profiles (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL CHECK (type IN ('whitelist', 'blacklist')),
-                ci_list TEXT[] DEFAULT '{}',
-                apprise_urls TEXT[] DEFAULT '{}',
-                apprise_urls_hash TEXT[],
-                apprise_urls_salt TEXT[],
-                email_notifications BOOLEAN DEFAULT FALSE,
-                email_address TEXT,
-                created_at TIMESTAMPTZ DEFAULT NOW(),
-                updated_at TIMESTAMPTZ DEFAULT NOW(),
-                last_tested_at TIMESTAMPTZ,
-                test_result TEXT,
-                unsubscribe_token TEXT UNIQUE
-            )
-        """)
-        # Ensure new columns on notification_profiles
-        cur.execute("""
-            ALTER TABLE IF EXISTS notification_profiles
-              ADD COLUMN IF NOT EXISTS apprise_urls_hash TEXT[],
-              ADD COLUMN IF NOT EXISTS apprise_urls_salt TEXT[],
-              ADD COLUMN IF NOT EXISTS email_notifications BOOLEAN DEFAULT FALSE,
-              ADD COLUMN IF NOT EXISTS email_address TEXT,
-              ADD COLUMN IF NOT EXISTS unsubscribe_token TEXT UNIQUE
-        """)
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_notification_profiles_unsubscribe_token
-              ON notification_profiles(unsubscribe_token)
-        """)
-
-        # 5) Ensure notification_logs table for extended statistics
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS notification_logs (
-                id SERIAL PRIMARY KEY,
-                profile_id INTEGER REFERENCES notification_profiles(id) ON DELETE CASCADE,
-                ci TEXT NOT NULL,
-                notification_type TEXT NOT NULL CHECK (notification_type IN ('incident', 'recovery')),
-                sent_at TIMESTAMPTZ DEFAULT NOW(),
-                delivery_status TEXT DEFAULT 'sent' CHECK (delivery_status IN ('sent', 'failed', 'pending')),
-                error_message TEXT,
-                recipient_type TEXT CHECK (recipient_type IN ('email', 'apprise')),
-                recipient_count INTEGER DEFAULT 1
-            )
-        """)
-        
-        # Indexes for performance
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_notification_logs_sent_at 
-              ON notification_logs(sent_at)
-        """)
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_notification_logs_profile_ci 
-              ON notification_logs(profile_id, ci)
-        """)
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_notification_logs_type_status 
-              ON notification_logs(notification_type, delivery_status)
-        """)
-
-        # 6) Ensure page_views table for visitor statistics
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS page_views (
-                id SERIAL PRIMARY KEY,
-                page TEXT NOT NULL,
-                session_id TEXT NOT NULL,
-                user_agent_hash TEXT,
-                referrer TEXT,
-                ts TIMESTAMPTZ DEFAULT NOW()
-            )
-        """)
-
-        # 7) Ensure ci_downtimes table (per-CI downtimes 7d/30d)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS ci_downtimes (
-                ci TEXT PRIMARY KEY,
-                downtime_7d_min DOUBLE PRECISION DEFAULT 0,
-                downtime_30d_min DOUBLE PRECISION DEFAULT 0,
-                computed_at TIMESTAMPTZ DEFAULT NOW()
-            )
-        """)
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_ci_downtimes_computed_at ON ci_downtimes(computed_at)
-        """)
-        
-        # Indexes for page_views performance
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_page_views_ts 
-              ON page_views(ts)
-        """)
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_page_views_page 
-              ON page_views(page)
-        """)
-        cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_page_views_session 
-              ON page_views(session_id)
-        """)
-
-        # Sanitize existing PII: replace plain emails with hashes where detectable
-        try:
-            cur.execute("""
-                UPDATE users
-                SET email = email_hash
-                WHERE email ~ '^[^@]+@[^@]+\.[^@]+$'
-            """)
-            # Null out any stored profile email addresses
-            cur.execute("""
-                ALTER TABLE IF EXISTS notification_profiles
-                  ALTER COLUMN email_address DROP NOT NULL
-            """)
-            cur.execute("""
-                UPDATE notification_profiles
-                SET email_address = NULL
-                WHERE email_address IS NOT NULL
-            """)
-        except Exception as _e:
-            # best-effort; continue
-            pass
-        conn.commit()
+    from migrations import apply_migrations  # local import: migrations imports mylibrary
+    return apply_migrations()
 
 def get_timescaledb_ci_data() -> pd.DataFrame:
     """Lädt CI-Daten aus TimescaleDB für Statistiken."""
@@ -586,7 +562,7 @@ def get_timescaledb_statistics_data() -> dict:
             # Still allow stats to be returned even if size query fails
             database_size_mb = 0.0
         
-        # CI-spezifische Metriken mit korrekter Zeitberechnung
+        # CI-spezifische Metriken für alle CIs (Top-10 und per_ci_metrics aus demselben Scan)
         ci_metrics_query = """
         WITH         ci_time_stats AS (
             SELECT 
@@ -630,7 +606,6 @@ def get_timescaledb_statistics_data() -> dict:
         FROM ci_time_stats cts
         LEFT JOIN incident_metrics im ON cts.ci = im.ci
         ORDER BY COALESCE(im.incidents, 0) DESC, availability_percentage ASC
-        LIMIT 10
         """
         
         with conn.cursor() as cur:
@@ -652,7 +627,8 @@ def get_timescaledb_statistics_data() -> dict:
         overall_availability = (overall_uptime / total_time * 100) if total_time > 0 else 100.0
         
         # Convert DataFrame to dict and clean up
-        top_unstable_cis = ci_metrics.to_dict('records')
+        top_unstable_cis = ci_metrics.head(10).to_dict('records')
+        per_ci_metrics = build_per_ci_metrics(ci_metrics)
         del ci_metrics
         gc.collect()
         
@@ -671,28 +647,26 @@ def get_timescaledb_statistics_data() -> dict:
             'mttr_minutes_mean': float(stats_result['mttr_minutes_mean']),
             'database_size_mb': float(database_size_mb),
             'top_unstable_cis': top_unstable_cis,
+            'per_ci_metrics': per_ci_metrics,
             'calculated_at': time.time()
         }
-# Import packages
-import numpy as np
-import pandas as pd
-
-import requests, json, time, pytz, os
-from datetime import datetime
-from tzlocal import get_localzone
-import smtplib
-from email.message import EmailMessage
-from email.mime.text import MIMEText
-import apprise
-import threading
-from collections import OrderedDict
-import re
-import html as htmllib
-
-# Add dotenv import
-from dotenv import load_dotenv
-import hmac
 
+def build_per_ci_metrics(ci_metrics: pd.DataFrame) -> dict:
+    """CI -> uptime/downtime/availability/incidents/MTTR/MTBF (minutes) for the statistics snapshot."""
+    if ci_metrics is None or ci_metrics.empty:
+        return {}
+    df = pd.DataFrame({
+        'uptime_minutes': pd.to_numeric(ci_metrics['uptime_minutes'], errors='coerce').fillna(0.0).astype(float),
+        'downtime_minutes': pd.to_numeric(ci_metrics['downtime_minutes'], errors='coerce').fillna(0.0).astype(float),
+        'availability_percentage': pd.to_numeric(ci_metrics['availability_percentage'], errors='coerce').fillna(0.0).astype(float),
+        'incidents': pd.to_numeric(ci_metrics['incidents'], errors='coerce').fillna(0).astype(int),
+    })
+    incidents = df['incidents'].to_numpy()
+    # Wie compute_incident_and_availability_metrics(): MTTR ab 1, MTBF ab 2 Incidents
+    df['mttr_minutes'] = np.where(incidents > 0, df['downtime_minutes'] / np.maximum(incidents, 1), 0.0)
+    df['mtbf_minutes'] = np.where(incidents > 1, df['uptime_minutes'] / np.maximum(incidents, 1), 0.0)
+    df.index = ci_metrics['ci'].astype(str).to_numpy()
+    return df.to_dict('index')
 # Note: HDF5 cache removed - now using TimescaleDB only
 
 def generate_salt():
@@ -715,6 +689,30 @@ def hash_with_salt(data, salt):
             raise ValueError("Data cannot be empty")
     return hashlib.sha256((str(data) + str(salt)).encode()).hexdigest()
 
+def normalize_email(email):
+    """Canonical form of an email address for hashing, encryption and the blind index."""
+    return str(email or '').strip().lower()
+
+def email_blind_index(email):
+    """Deterministic keyed index of a normalized email (HMAC-SHA256).
+
+    Allows an indexed point lookup without storing the address; the per-user
+    salted hash stays the verifier. The key is EMAIL_INDEX_KEY or derived from
+    ENCRYPTION_KEY. Returns None when no key is configured.
+    """
+    email = normalize_email(email)
+    if not email:
+        return None
+    key = os.getenv('EMAIL_INDEX_KEY')
+    if key:
+        key = key.encode('utf-8')
+    else:
+        encryption_key = os.getenv('ENCRYPTION_KEY')
+        if not encryption_key:
+            return None
+        key = hmac.new(encryption_key.encode('utf-8'), b'ti-monitoring email blind index', hashlib.sha256).digest()
+    return hmac.new(key, email.encode('utf-8'), hashlib.sha256).hexdigest()
+
 def generate_otp():
     """Generate a 6-digit numeric OTP"""
     import random
@@ -722,12 +720,14 @@ def generate_otp():
 
 def generate_encryption_key():
     """Generate a encryption key for sensitive data"""
+    from cryptography.fernet import Fernet
     return Fernet.generate_key()
 
 def encrypt_data(data, key):
     """Encrypt data using Fernet encryption"""
     if not data:
         return None, None
+    from cryptography.fernet import Fernet
     f = Fernet(key)
     salt = generate_salt()
     encrypted_data = f.encrypt((data + salt).encode())
@@ -738,6 +738,7 @@ def decrypt_data(encrypted_data, salt, key):
     if not encrypted_data or not salt or not key:
         return None
     try:
+        from cryptography.fernet import Fernet
         f = Fernet(key)
         decrypted_data = f.decrypt(encrypted_data.encode())
         # Remove the salt from the end
@@ -751,50 +752,62 @@ def create_user(email):
     salt = generate_salt()
     if not salt:
         raise Exception("Failed to generate salt for user")
-    email_hash = hash_with_salt(email.lower(), salt)
+    email = normalize_email(email)
+    email_hash = hash_with_salt(email, salt)
+    email_bidx = email_blind_index(email)
     # Encrypt email for reversible use in notifications
     encryption_key = os.getenv('ENCRYPTION_KEY')
     if encryption_key:
         encryption_key = encryption_key.encode()
     else:
         encryption_key = generate_encryption_key()
-    email_encrypted, email_enc_salt = encrypt_data(email.lower(), encryption_key)
+    email_encrypted, email_enc_salt = encrypt_data(email, encryption_key)
     
     with get_db_conn() as conn, conn.cursor() as cur:
         try:
             cur.execute("""
-                INSERT INTO users (email, email_hash, email_salt, email_encrypted, email_enc_salt)
-                VALUES (%s, %s, %s, %s, %s)
+                INSERT INTO users (email, email_hash, email_salt, email_encrypted, email_enc_salt, email_bidx)
+                VALUES (%s, %s, %s, %s, %s, %s)
                 RETURNING id
-            """, (email_hash, email_hash, salt, email_encrypted, email_enc_salt))
+            """, (email_hash, email_hash, salt, email_encrypted, email_enc_salt, email_bidx))
             user_id = cur.fetchone()[0]
             return user_id
         except psycopg2.IntegrityError:
-            # User already exists, get the existing user
+            # User already exists (unique blind index), get the existing user
+            conn.rollback()
+            if not email_bidx:
+                return None
             cur.execute("""
-                SELECT id FROM users WHERE email_hash = %s AND email_salt = %s
-            """, (email_hash, salt))
+                SELECT id FROM users WHERE email_bidx = %s
+            """, (email_bidx,))
             result = cur.fetchone()
             return result[0] if result else None
 
+_USER_COLUMNS = "id, email, email_hash, email_salt, failed_login_attempts, locked_until, email_encrypted, email_enc_salt"
+
+def _match_user_email(user, email_lower):
+    """Verify the provided email against the user's salted hash."""
+    provided_email_hash = hash_with_salt(email_lower, user[3])
+    return hmac.compare_digest(user[2], provided_email_hash)
+
 def get_user_by_email(email):
-    """Get user by email"""
+    """Get user by email (indexed blind-index lookup, salted hash as verifier)"""
+    email_lower = normalize_email(email)
+    email_bidx = email_blind_index(email_lower)
     with get_db_conn() as conn, conn.cursor() as cur:
-        # We need to check all users to find a match
-        cur.execute("""
-            SELECT id, email, email_hash, email_salt, failed_login_attempts, locked_until, email_encrypted, email_enc_salt
-            FROM users
-        """)
-        users = cur.fetchall()
-        
-        email_lower = email.lower()
-        for user in users:
-            user_id, user_email, email_hash, email_salt, failed_attempts, locked_until, email_encrypted, email_enc_salt = user
-            # Hash the provided email with the user's salt
-            provided_email_hash = hash_with_salt(email_lower, email_salt)
-            if hmac.compare_digest(email_hash, provided_email_hash):
+        if email_bidx:
+            # Migration 10 and the key check in apply_migrations() keep the index
+            # complete, so a miss means "unknown address" - no scan per request
+            cur.execute(f"SELECT {_USER_COLUMNS} FROM users WHERE email_bidx = %s", (email_bidx,))
+            user = cur.fetchone()
+            return user if user and _match_user_email(user, email_lower) else None
+
+        # Without a key there is no blind index: compare against the salted hashes
+        cur.execute(f"SELECT {_USER_COLUMNS} FROM users")
+        for user in cur.fetchall():
+            if _match_user_email(user, email_lower):
                 return user
-                
+
         return None
 
 def generate_otp_for_user(user_id, ip_address=None):
@@ -1035,6 +1048,607 @@ def get_availability_data_of_ci(file_name, ci, start_ts=None, end_ts=None, hours
         print(f"Error reading availability data for CI {ci} from TimescaleDB: {e}")
         return pd.DataFrame()
 
+# Level-of-detail pyramid: bucket sizes in minutes (finest first)
+AVAILABILITY_ROLLUP_LEVELS = (5, 60, 360, 1440)
+# Approximate number of points a plot window should be rendered with
+PLOT_TARGET_POINTS = 500
+
+def choose_rollup_level(window_hours, target_points=PLOT_TARGET_POINTS, levels=AVAILABILITY_ROLLUP_LEVELS):
+    """
+    Chooses the pyramid level (out of `levels`) whose bucket count is closest to
+    target_points for the given window.
+
+    Returns None if raw measurements (5-minute cadence) already stay within
+    target_points, otherwise the bucket size in minutes.
+    """
+    try:
+        window_minutes = float(window_hours) * 60.0
+        target = float(target_points)
+    except (TypeError, ValueError):
+        return None
+    if window_minutes <= 0 or target <= 0:
+        return None
+    if window_minutes / AVAILABILITY_ROLLUP_LEVELS[0] <= target:
+        return None
+    # Closest in log space -> row count stays within a constant factor of target
+    return min(
+        levels,
+        key=lambda level: abs(np.log((window_minutes / level) / target))
+    )
+
+def get_availability_rollup_watermark():
+    """Latest bucket of the 5-minute rollup level (UTC), or None if not built yet.
+
+    refresh_availability_rollups() recomputes every level from this bucket on, so
+    callers can pass it on to rollups derived from the pyramid.
+    """
+    with get_db_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT MAX(bucket_start) FROM availability_rollups WHERE bucket_minutes = %s",
+                    (AVAILABILITY_ROLLUP_LEVELS[0],))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+def refresh_availability_rollups(since=None) -> int:
+    """
+    Incrementally (re)builds the availability_rollups pyramid.
+
+    The 5-minute level is aggregated from measurements, coarser levels are
+    derived from the 5-minute level. All buckets from `since` (UTC) onwards are
+    recomputed; without `since` the build continues at the current watermark
+    (or performs a full backfill on an empty table).
+
+    Returns:
+        int: Number of upserted rollup rows
+    """
+    base_level = AVAILABILITY_ROLLUP_LEVELS[0]
+    upsert = """
+        ON CONFLICT (ci, bucket_minutes, bucket_start) DO UPDATE SET
+          samples = EXCLUDED.samples,
+          down_samples = EXCLUDED.down_samples,
+          down_fraction = EXCLUDED.down_fraction,
+          incidents = EXCLUDED.incidents
+    """
+    total = 0
+    with get_db_conn() as conn, conn.cursor() as cur:
+        if since is None:
+            cur.execute("SELECT MAX(bucket_start) FROM availability_rollups WHERE bucket_minutes = %s", (base_level,))
+            row = cur.fetchone()
+            since = row[0] if row and row[0] is not None else None
+        if since is None:
+            cur.execute("SELECT MIN(ts) FROM measurements")
+            row = cur.fetchone()
+            since = row[0] if row and row[0] is not None else None
+        if since is None:
+            return 0
+
+        # Base level from raw measurements; one hour lookback so LAG sees the previous status
+        cur.execute(f"""
+            INSERT INTO availability_rollups
+              (ci, bucket_minutes, bucket_start, samples, down_samples, down_fraction, incidents)
+            SELECT ci,
+                   %(level)s,
+                   time_bucket(%(interval)s::interval, ts) AS bucket,
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE status = 0),
+                   AVG(CASE WHEN status = 0 THEN 1.0 ELSE 0.0 END),
+                   COUNT(*) FILTER (WHERE status = 0 AND prev_status = 1)
+            FROM (
+                SELECT ci, ts, status,
+                       LAG(status) OVER (PARTITION BY ci ORDER BY ts) AS prev_status
+                FROM measurements
+                WHERE ts >= time_bucket(%(interval)s::interval, %(since)s::timestamptz) - INTERVAL '1 hour'
+            ) m
+            WHERE ts >= time_bucket(%(interval)s::interval, %(since)s::timestamptz)
+            GROUP BY ci, bucket
+            {upsert}
+        """, {'level': base_level, 'interval': f"{base_level} minutes", 'since': since})
+        total += max(0, cur.rowcount)
+
+        # Coarser levels from the base level (whole buckets are recomputed)
+        for level in AVAILABILITY_ROLLUP_LEVELS[1:]:
+            cur.execute(f"""
+                INSERT INTO availability_rollups
+                  (ci, bucket_minutes, bucket_start, samples, down_samples, down_fraction, incidents)
+                SELECT ci,
+                       %(level)s,
+                       time_bucket(%(interval)s::interval, bucket_start) AS bucket,
+                       SUM(samples),
+                       SUM(down_samples),
+                       SUM(down_samples)::real / NULLIF(SUM(samples), 0),
+                       SUM(incidents)
+                FROM availability_rollups
+                WHERE bucket_minutes = %(base)s
+                  AND bucket_start >= time_bucket(%(interval)s::interval, %(since)s::timestamptz)
+                GROUP BY ci, bucket
+                HAVING SUM(samples) > 0
+                {upsert}
+            """, {'level': level, 'interval': f"{level} minutes", 'base': base_level, 'since': since})
+            total += max(0, cur.rowcount)
+        conn.commit()
+    return total
+
+def get_availability_rollup_of_ci(ci, bucket_minutes, start_ts=None, end_ts=None, hours=None):
+    """
+    Gets one level of the availability pyramid for a configuration item
+
+    Args:
+        ci (str): ID of the desired configuration item
+        bucket_minutes (int): Pyramid level (see AVAILABILITY_ROLLUP_LEVELS)
+        start_ts (datetime|None): Optional UTC start timestamp
+        end_ts (datetime|None): Optional UTC end timestamp
+        hours (int|None): Optional trailing hours window if explicit range not provided
+
+    Returns:
+        DataFrame: times, values (0 if the bucket contains downtime), down_fraction,
+                   samples and incidents per bucket; empty if the level is not built
+    """
+    try:
+        interval = f"{int(bucket_minutes)} minutes"
+        if start_ts is not None and end_ts is not None:
+            where = "bucket_start >= time_bucket(%s::interval, %s::timestamptz) AND bucket_start <= %s"
+            params = [interval, start_ts, end_ts]
+        elif hours is not None:
+            where = "bucket_start >= time_bucket(%s::interval, NOW() - %s::interval)"
+            params = [interval, f"{int(max(1, hours))} hours"]
+        else:
+            where = "TRUE"
+            params = []
+        with get_db_conn() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT bucket_start AS times,
+                       CASE WHEN down_samples > 0 THEN 0 ELSE 1 END AS values,
+                       down_fraction,
+                       samples,
+                       incidents
+                FROM availability_rollups
+                WHERE ci = %s AND bucket_minutes = %s AND {where}
+                ORDER BY bucket_start
+            """, [ci, int(bucket_minutes)] + params)
+            rows = cur.fetchall()
+        df = pd.DataFrame(rows, columns=['times', 'values', 'down_fraction', 'samples', 'incidents'])
+        if not df.empty:
+            df['times'] = pd.to_datetime(df['times']).dt.tz_convert('Europe/Berlin')
+        return df
+    except Exception as e:
+        print(f"Error reading availability rollups for CI {ci}: {e}")
+        return pd.DataFrame()
+
+# Per-product / per-organization hourly rollups (column of ci_metadata -> dimension)
+GROUP_ROLLUP_DIMENSIONS = ('product', 'organization')
+GROUP_ROLLUP_LEVEL = 60
+# Nominal measurement cadence used to convert down samples into minutes
+MEASUREMENT_CADENCE_MINUTES = AVAILABILITY_ROLLUP_LEVELS[0]
+
+def refresh_group_rollups(since=None) -> int:
+    """
+    Incrementally maintains availability_group_rollups_hourly from the 1-hour
+    level of availability_rollups, grouped by the CIs' product and organization.
+
+    All hours from `since` (pass the `since` of the preceding
+    refresh_availability_rollups() run, see get_availability_rollup_watermark())
+    or from the last stored hour, whichever is earlier, are rebuilt with the
+    current ci_metadata assignment; older hours keep the grouping they were
+    aggregated with. With an empty table this is the full backfill.
+
+    downtime_ci_minutes adds up the downtime of all CIs of a group (two CIs down
+    for the same 5 minutes count 10), it is not wall-clock time.
+
+    Returns:
+        int: Number of written group rows
+    """
+    total = 0
+    with get_db_conn() as conn, conn.cursor() as cur:
+        cur.execute("SELECT MAX(bucket_start) FROM availability_group_rollups_hourly")
+        row = cur.fetchone()
+        watermark = row[0] if row else None
+        if watermark is None:
+            since = None  # leere Tabelle: vollständig auffüllen
+        elif since is None or watermark < since:
+            since = watermark
+        if since is None:
+            cur.execute("SELECT MIN(bucket_start) FROM availability_rollups WHERE bucket_minutes = %s", (GROUP_ROLLUP_LEVEL,))
+            row = cur.fetchone()
+            since = row[0] if row and row[0] is not None else None
+        if since is None:
+            return 0
+
+        # Recomputed hours are replaced, so CIs that moved to another group do not linger
+        cur.execute(
+            "DELETE FROM availability_group_rollups_hourly WHERE bucket_start >= time_bucket('1 hour', %s::timestamptz)",
+            (since,)
+        )
+        for dimension in GROUP_ROLLUP_DIMENSIONS:
+            cur.execute(f"""
+                INSERT INTO availability_group_rollups_hourly
+                  (dimension, key, bucket_start, cis, samples, down_samples, down_fraction, incidents, downtime_ci_minutes)
+                SELECT %(dimension)s,
+                       COALESCE(m.{dimension}, '') AS key,
+                       r.bucket_start,
+                       COUNT(*),
+                       SUM(r.samples),
+                       SUM(r.down_samples),
+                       COALESCE(SUM(r.down_samples)::real / NULLIF(SUM(r.samples), 0), 0),
+                       SUM(r.incidents),
+                       SUM(r.down_samples) * %(cadence)s
+                FROM availability_rollups r
+                LEFT JOIN ci_metadata m ON m.ci = r.ci
+                WHERE r.bucket_minutes = %(level)s
+                  AND r.bucket_start >= time_bucket('1 hour', %(since)s::timestamptz)
+                GROUP BY key, r.bucket_start
+            """, {'dimension': dimension, 'cadence': MEASUREMENT_CADENCE_MINUTES,
+                  'level': GROUP_ROLLUP_LEVEL, 'since': since})
+            total += max(0, cur.rowcount)
+        conn.commit()
+    return total
+
+def get_group_availability(dimension='product', hours=720) -> pd.DataFrame:
+    """
+    Availability, incidents and downtime per product or organization over a
+    trailing window, read from availability_group_rollups_hourly
+
+    Returns:
+        DataFrame: key, cis, availability_percentage, incidents, downtime_ci_minutes
+                   (summed over the group's CIs; lowest availability first); empty on
+                   errors or unknown dimension
+    """
+    columns = ['key', 'cis', 'availability_percentage', 'incidents', 'downtime_ci_minutes']
+    if dimension not in GROUP_ROLLUP_DIMENSIONS:
+        return pd.DataFrame(columns=columns)
+    try:
+        with get_db_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT key,
+                       MAX(cis),
+                       100.0 * (1 - SUM(down_samples)::float / NULLIF(SUM(samples), 0)),
+                       SUM(incidents),
+                       SUM(downtime_ci_minutes)
+                FROM availability_group_rollups_hourly
+                WHERE dimension = %s AND bucket_start >= NOW() - %s::interval
+                GROUP BY key
+                ORDER BY 3 ASC NULLS LAST, key
+            """, (dimension, f"{int(max(1, hours))} hours"))
+            rows = cur.fetchall()
+        df = pd.DataFrame(rows, columns=columns)
+        if not df.empty:
+            df['availability_percentage'] = pd.to_numeric(df['availability_percentage'], errors='coerce')
+            df['downtime_ci_minutes'] = pd.to_numeric(df['downtime_ci_minutes'], errors='coerce').fillna(0.0)
+        return df
+    except Exception as e:
+        print(f"Error reading group availability ({dimension}) from TimescaleDB: {e}")
+        return pd.DataFrame(columns=columns)
+
+# Upper bound for CIs in one comparison (rows in the stacked timeline)
+COMPARE_MAX_CIS = 20
+
+def align_series_on_grid(row_index, bucket_ns, values, n_rows, start_ns, step_ns, n_buckets):
+    """
+    Scatters (row, bucket, value) triples onto a dense n_rows x n_buckets grid.
+
+    Buckets outside [start_ns, start_ns + n_buckets * step_ns) are dropped, several
+    values in one cell collapse to their minimum (any downtime wins), cells without
+    data stay NaN.
+
+    Returns:
+        ndarray: float matrix of shape (n_rows, n_buckets)
+    """
+    matrix = np.full((int(n_rows), int(n_buckets)), np.nan)
+    row_index = np.asarray(row_index, dtype=np.int64)
+    bucket_ns = np.asarray(bucket_ns, dtype=np.int64)
+    values = np.asarray(values, dtype=float)
+    if row_index.size == 0 or matrix.size == 0:
+        return matrix
+    cols = (bucket_ns - int(start_ns)) // int(step_ns)
+    valid = (cols >= 0) & (cols < n_buckets) & (row_index >= 0) & (row_index < n_rows)
+    # fmin ignores the NaN initialisation, so the first value of a cell is kept as is
+    np.fmin.at(matrix, (row_index[valid], cols[valid]), values[valid])
+    return matrix
+
+def availability_by_row(row_index, samples, down_samples, n_rows):
+    """
+    Time-weighted availability in percent per row from sample counts, so one short
+    outage in a coarse bucket only costs its own samples. NaN for rows without samples.
+    """
+    row_index = np.asarray(row_index, dtype=np.int64)
+    valid = (row_index >= 0) & (row_index < n_rows)
+    total = np.bincount(row_index[valid], weights=np.asarray(samples, dtype=float)[valid], minlength=n_rows)
+    down = np.bincount(row_index[valid], weights=np.asarray(down_samples, dtype=float)[valid], minlength=n_rows)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, (1.0 - down / total) * 100.0, np.nan)
+
+def get_availability_matrix(cis, hours, bucket_minutes=None):
+    """
+    Gets the availability of several configuration items on a shared bucket grid
+
+    All series are fetched with one query (``ci = ANY(...)``): from the rollup
+    pyramid if choose_rollup_level() picks a level for the window, otherwise from
+    the raw measurements bucketed to the finest level.
+
+    Args:
+        cis (list[str]): IDs of the configuration items (order is kept, max COMPARE_MAX_CIS)
+        hours (int): Trailing window in hours
+        bucket_minutes (int|None): Force a bucket size (must be a pyramid level for rollups)
+
+    Returns:
+        dict: times (Europe/Berlin DatetimeIndex of the bucket starts), cis,
+              status (matrix: 1 up, 0 bucket contains downtime, NaN no data; for
+              colouring), up_fraction (matrix: share of up samples per bucket) and
+              availability (percent per CI from samples/down samples)
+    """
+    cis = list(dict.fromkeys(str(c) for c in cis if c))[:COMPARE_MAX_CIS]
+    hours = int(max(1, hours or 1))
+    level = bucket_minutes or choose_rollup_level(hours)
+    use_rollups = level in AVAILABILITY_ROLLUP_LEVELS
+    step_minutes = int(level or AVAILABILITY_ROLLUP_LEVELS[0])
+    step_ns = step_minutes * 60 * 1_000_000_000
+
+    end_ns = (pd.Timestamp.now(tz='UTC').value // step_ns + 1) * step_ns
+    n_buckets = int(np.ceil(hours * 60 / step_minutes))
+    start_ns = end_ns - n_buckets * step_ns
+    times = pd.DatetimeIndex(pd.to_datetime(start_ns + np.arange(n_buckets, dtype=np.int64) * step_ns, utc=True)).tz_convert('Europe/Berlin')
+    empty = np.full((len(cis), n_buckets), np.nan)
+    result = {'times': times, 'cis': cis, 'status': empty, 'up_fraction': empty.copy(),
+              'availability': np.full(len(cis), np.nan)}
+    if not cis:
+        return result
+
+    start_ts = pd.Timestamp(start_ns, tz='UTC').to_pydatetime()
+    if use_rollups:
+        query = """
+            SELECT ci, bucket_start,
+                   CASE WHEN down_samples > 0 THEN 0 ELSE 1 END,
+                   1 - down_fraction,
+                   samples,
+                   down_samples
+            FROM availability_rollups
+            WHERE ci = ANY(%s) AND bucket_minutes = %s AND bucket_start >= %s
+        """
+        params = (cis, step_minutes, start_ts)
+    else:
+        query = """
+            SELECT ci, time_bucket(%s::interval, ts) AS bucket,
+                   MIN(status),
+                   AVG(status),
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE status = 0)
+            FROM measurements
+            WHERE ci = ANY(%s) AND ts >= %s
+            GROUP BY ci, bucket
+        """
+        params = (f"{step_minutes} minutes", cis, start_ts)
+    try:
+        with get_db_conn() as conn, conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+    except Exception as e:
+        print(f"Error reading availability matrix for {len(cis)} CIs from TimescaleDB: {e}")
+        rows = []
+
+    if not rows:
+        return result
+    row_of = {ci: i for i, ci in enumerate(cis)}
+    ci_col, ts_col, status_col, up_col, samples_col, down_col = zip(*rows)
+    row_index = np.fromiter((row_of.get(c, -1) for c in ci_col), dtype=np.int64, count=len(rows))
+    # Explizit in Nanosekunden: .asi8 folgt der Auflösung des Index (pandas 3: Mikrosekunden)
+    bucket_ns = np.asarray(pd.to_datetime(list(ts_col), utc=True).tz_convert(None), dtype='datetime64[ns]').astype(np.int64)
+    # Only buckets on the grid count towards the availability
+    cols = (bucket_ns - start_ns) // step_ns
+    row_index = np.where((cols >= 0) & (cols < n_buckets), row_index, -1)
+    up_values = np.array([np.nan if v is None else float(v) for v in up_col])
+    result.update(
+        status=align_series_on_grid(row_index, bucket_ns, status_col, len(cis), start_ns, step_ns, n_buckets),
+        up_fraction=align_series_on_grid(row_index, bucket_ns, up_values, len(cis), start_ns, step_ns, n_buckets),
+        availability=availability_by_row(row_index, samples_col, down_col, len(cis)),
+    )
+    return result
+
+# Fleet matrix (all CIs x time buckets): window, bucket count the level is chosen for,
+# cell value for "no data" (cells otherwise hold the downtime share in percent, 0-100)
+FLEET_MATRIX_DAYS = 30
+FLEET_MATRIX_TARGET_BUCKETS = 720
+FLEET_MATRIX_NO_DATA = 255
+FLEET_MATRIX_GROUPS = ('product', 'organization')
+# Die Flottenmatrix hat tausende Zeilen; 5-Minuten-Buckets wären pro Zeile zu breit
+FLEET_MATRIX_LEVELS = tuple(level for level in AVAILABILITY_ROLLUP_LEVELS if level >= 60)
+
+def encode_downtime_percent(percent):
+    """
+    Encodes downtime shares in percent as uint8 (clipped to 0..100), missing
+    values become FLEET_MATRIX_NO_DATA.
+    """
+    percent = np.asarray(percent, dtype=float)
+    return np.where(np.isnan(percent), FLEET_MATRIX_NO_DATA, np.clip(percent, 0, 100)).astype(np.uint8)
+
+def fill_fleet_matrix(row_codes, cols, cells, n_rows, n_buckets):
+    """
+    Dense uint8 matrix (n_rows x n_buckets) from one cell per (row, bucket);
+    cells without a value and out-of-range coordinates stay FLEET_MATRIX_NO_DATA.
+    """
+    matrix = np.full((int(n_rows), int(n_buckets)), FLEET_MATRIX_NO_DATA, dtype=np.uint8)
+    row_codes = np.asarray(row_codes, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    valid = (row_codes >= 0) & (row_codes < n_rows) & (cols >= 0) & (cols < n_buckets)
+    matrix[row_codes[valid], cols[valid]] = np.asarray(cells, dtype=np.uint8)[valid]
+    return matrix
+
+def get_fleet_availability_matrix(days=FLEET_MATRIX_DAYS, group_by='product', bucket_minutes=None):
+    """
+    Builds the CI x time-bucket downtime matrix of the whole fleet in one pass
+
+    Reads one level of availability_rollups via COPY (the bucket column index and
+    the downtime percent, rounded up so any downtime stays visible, are computed
+    in the database) and scatters it into a
+    uint8 matrix. Rows are sorted by group (product or organization), then CI.
+
+    Args:
+        days (int): Trailing window in days
+        group_by (str): 'product' or 'organization'
+        bucket_minutes (int|None): Pyramid level; chosen from FLEET_MATRIX_LEVELS for
+            ~FLEET_MATRIX_TARGET_BUCKETS if None
+
+    Returns:
+        dict: start (UTC Timestamp of the first bucket), bucket_minutes, cis, names,
+              groups (per row) and matrix (uint8, see FLEET_MATRIX_NO_DATA)
+    """
+    if group_by not in FLEET_MATRIX_GROUPS:
+        group_by = FLEET_MATRIX_GROUPS[0]
+    days = int(max(1, days or 1))
+    window_hours = days * 24
+    level = (bucket_minutes
+             or choose_rollup_level(window_hours, FLEET_MATRIX_TARGET_BUCKETS, FLEET_MATRIX_LEVELS)
+             or FLEET_MATRIX_LEVELS[0])
+    step_ns = int(level) * 60 * 1_000_000_000
+    end_ns = (pd.Timestamp.now(tz='UTC').value // step_ns + 1) * step_ns
+    n_buckets = int(np.ceil(window_hours * 60 / int(level)))
+    start = pd.Timestamp(end_ns - n_buckets * step_ns, tz='UTC')
+
+    result = {'start': start, 'bucket_minutes': int(level), 'cis': [], 'names': [], 'groups': [],
+              'matrix': np.full((0, n_buckets), FLEET_MATRIX_NO_DATA, dtype=np.uint8)}
+    try:
+        with get_db_conn() as conn, conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT ci, COALESCE(name, ''), COALESCE({group_by}, '')
+                FROM ci_metadata
+            """)
+            meta = cur.fetchall()
+            select_sql = cur.mogrify("""
+                SELECT ci,
+                       FLOOR(EXTRACT(EPOCH FROM bucket_start - %(start)s::timestamptz) / %(step)s)::int,
+                       CEIL(down_fraction * 100)::smallint
+                FROM availability_rollups
+                WHERE bucket_minutes = %(level)s AND bucket_start >= %(start)s
+            """, {'start': start.to_pydatetime(), 'step': int(level) * 60, 'level': int(level)}).decode('utf-8')
+            buf = io.StringIO()
+            cur.copy_expert(f"COPY ({select_sql}) TO STDOUT WITH (FORMAT csv)", buf)
+        buf.seek(0)
+        cells = pd.read_csv(buf, header=None, names=['ci', 'col', 'percent'],
+                            dtype={'ci': str, 'col': np.int64, 'percent': np.float64})
+    except Exception as e:
+        print(f"Error building fleet availability matrix: {e}")
+        return result
+
+    rows = pd.DataFrame(meta, columns=['ci', 'name', 'group'])
+    unknown = np.setdiff1d(cells['ci'].unique(), rows['ci'].to_numpy(dtype=str))
+    if unknown.size:
+        rows = pd.concat([rows, pd.DataFrame({'ci': unknown, 'name': '', 'group': ''})], ignore_index=True)
+    # Leere Gruppen ans Ende
+    rows = rows.assign(_empty=rows['group'] == '').sort_values(['_empty', 'group', 'ci'], kind='stable')
+
+    row_codes = pd.Categorical(cells['ci'], categories=rows['ci'].to_numpy()).codes
+    result.update(
+        cis=rows['ci'].tolist(),
+        names=rows['name'].tolist(),
+        groups=rows['group'].tolist(),
+        matrix=fill_fleet_matrix(row_codes, cells['col'].to_numpy(), encode_downtime_percent(cells['percent'].to_numpy()),
+                                 len(rows), n_buckets),
+    )
+    return result
+
+def run_length_encode(values):
+    """
+    Run-length encodes a 1-D array.
+
+    Returns:
+        tuple: (starts, lengths, run_values) as NumPy arrays
+    """
+    values = np.asarray(values)
+    if values.size == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), values[:0]
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    lengths = np.diff(np.append(starts, values.size))
+    return starts, lengths, values[starts]
+
+def summarize_availability_runs(times_ns, values, down_fraction=None, max_gap_factor=2.0,
+                                samples=None, incidents=None):
+    """
+    Computes availability, run and MTTR/MTBF figures of a sorted status series
+    in one vectorized pass.
+
+    Each row lasts until the next timestamp (capped at max_gap_factor times the
+    median spacing so collection gaps do not count as up- or downtime); the last
+    row lasts one median spacing. With down_fraction (pyramid rows) downtime is
+    weighted by the fraction of the bucket that was down, also within runs, so a
+    5-minute outage in a 1-day bucket stays 5 minutes; runs are still formed per
+    bucket (bucket_resolution=True), i.e. outages in adjacent buckets merge.
+
+    Args:
+        times_ns (array): UTC timestamps in nanoseconds, ascending
+        values (array): Status per row (1 = available, 0 = unavailable)
+        down_fraction (array|None): Optional downtime fraction per row
+        samples (array|None): Measurements per row (pyramid rows); points count samples
+        incidents (array|None): 1->0 transitions per row (pyramid rows); used as
+            down_runs instead of the bucket runs
+
+    Returns:
+        dict: points, step_seconds, total/down/up seconds and points, longest
+              down/up run (seconds and points), down_runs, mttr_seconds,
+              mtbf_seconds (0 if there is no downtime) and bucket_resolution
+    """
+    t = np.asarray(times_ns, dtype=np.int64)
+    v = np.asarray(values, dtype=float)
+    n = int(t.size)
+    result = {
+        'points': n, 'step_seconds': 0.0,
+        'total_seconds': 0.0, 'down_seconds': 0.0, 'up_seconds': 0.0,
+        'down_points': 0, 'up_points': 0,
+        'longest_down_seconds': 0.0, 'longest_up_seconds': 0.0,
+        'longest_down_points': 0, 'longest_up_points': 0,
+        'down_runs': 0, 'mttr_seconds': 0.0, 'mtbf_seconds': 0.0,
+        'bucket_resolution': down_fraction is not None
+    }
+    if n == 0:
+        return result
+
+    if n > 1:
+        diffs = np.diff(t).astype(float) / 1e9
+        step = float(np.median(diffs))
+        durations = np.append(np.clip(diffs, 0.0, step * max_gap_factor), step)
+    else:
+        step = 300.0
+        durations = np.array([step])
+
+    if down_fraction is not None:
+        weight = np.clip(np.nan_to_num(np.asarray(down_fraction, dtype=float)), 0.0, 1.0)
+        down = weight > 0
+    else:
+        down = v == 0
+        weight = down.astype(float)
+    counts = np.nan_to_num(np.asarray(samples, dtype=float)) if samples is not None else np.ones(n)
+    down_counts = counts * weight
+    total_s = float(durations.sum())
+    down_s = float((durations * weight).sum())
+    down_points = int(round(float(down_counts.sum())))
+
+    # Down runs zählen nur ihre Ausfallanteile, Up-Runs die ganze Dauer
+    starts, lengths, run_down = run_length_encode(down)
+    run_seconds = np.add.reduceat(np.where(down, durations * weight, durations), starts)
+    run_points = np.add.reduceat(np.where(down, down_counts, counts), starts)
+    if incidents is not None:
+        down_runs = int(np.nansum(np.asarray(incidents, dtype=float)))
+        if down_runs == 0 and down_s > 0:
+            down_runs = 1  # Ausfall begann vor dem Fenster
+    else:
+        down_runs = int(run_down.sum())
+    longest_down = run_down.nonzero()[0]
+    longest_up = (~run_down).nonzero()[0]
+
+    result.update({
+        'points': int(round(float(counts.sum()))),
+        'step_seconds': step,
+        'total_seconds': total_s,
+        'down_seconds': down_s,
+        'up_seconds': total_s - down_s,
+        'down_points': down_points,
+        'up_points': int(round(float(counts.sum()))) - down_points,
+        'longest_down_seconds': float(run_seconds[longest_down].max()) if longest_down.size else 0.0,
+        'longest_up_seconds': float(run_seconds[longest_up].max()) if longest_up.size else 0.0,
+        'longest_down_points': int(round(float(run_points[longest_down].max()))) if longest_down.size else 0,
+        'longest_up_points': int(round(float(run_points[longest_up].max()))) if longest_up.size else 0,
+        'down_runs': down_runs,
+        'mttr_seconds': down_s / down_runs if down_runs else 0.0,
+        'mtbf_seconds': (total_s - down_s) / down_runs if down_runs else 0.0
+    })
+    return result
+
 def get_data_of_all_cis(file_name):
     """
     Gets general data for all configuration items from TimescaleDB
@@ -1149,52 +1763,137 @@ def get_all_cis_with_downtimes() -> pd.DataFrame:
             'downtime_7d_min', 'downtime_30d_min'
         ])
 
-def get_incident_heatmap_data(last_days: int = 30) -> pd.DataFrame:
+INCIDENT_HEATMAP_DAYS = 30
+INCIDENT_HEATMAP_RETENTION_DAYS = INCIDENT_HEATMAP_DAYS + 2  # Tages-Chunks werden danach verworfen
+INCIDENT_HEATMAP_MAX_CIS = 15  # CI-Liste je Zelle
+
+INCIDENT_HEATMAP_RECOMPUTE_HOURS = 6  # nachlaufende Stunden, die jeder Lauf neu zählt (späte Messwerte)
+
+def refresh_incident_heatmap(since=None) -> int:
+    """
+    Incrementally maintains incident_heatmap_hourly from new 1->0 transitions.
+
+    Every UTC hour from `since` (default: the last stored hour minus
+    INCIDENT_HEATMAP_RECOMPUTE_HOURS, so late measurements are still counted)
+    up to now gets one row, including hours without incidents, so the latest
+    row doubles as watermark. With an empty table this is the full rebuild of
+    the heatmap window.
+
+    Returns:
+        int: Number of upserted hour rows
+    """
+    with get_db_conn() as conn, conn.cursor() as cur:
+        if since is None:
+            cur.execute(
+                "SELECT MAX(bucket_start) - %s::interval FROM incident_heatmap_hourly",
+                (f"{INCIDENT_HEATMAP_RECOMPUTE_HOURS} hours",)
+            )
+            row = cur.fetchone()
+            since = row[0] if row else None
+        rows = refresh_incident_heatmap_hours(cur, since)
+        conn.commit()
+    return rows
+
+def refresh_incident_heatmap_hours(cur, since=None) -> int:
+    """
+    Recomputes the heatmap hours from `since` on an open cursor (also used by the
+    schema migration for the initial fill).
+
+    The measurements scan starts at `since` and never reaches further back than
+    the heatmap window; the status before the first hour comes from one seed row
+    per CI (its last measurement before the start, via the (ci, ts) primary key),
+    so a 1->0 transition is counted however old the previous sample is.
+    """
+    # Start als Konstante, damit der Planer die measurements-Chunks ausschließen kann
+    cur.execute("""
+        SELECT time_bucket('1 hour', GREATEST(COALESCE(%s::timestamptz, '-infinity'::timestamptz),
+                                              NOW() - %s::interval))
+    """, (since, f"{INCIDENT_HEATMAP_DAYS} days"))
+    start = cur.fetchone()[0]
+    cur.execute("""
+        WITH recent AS (
+            SELECT ci, ts, status
+            FROM measurements
+            WHERE ts >= %(start)s::timestamptz
+        ), seed AS (
+            SELECT w.ci, p.ts, p.status
+            FROM (SELECT DISTINCT ci FROM recent) w
+            CROSS JOIN LATERAL (
+                SELECT ts, status
+                FROM measurements
+                WHERE ci = w.ci AND ts < %(start)s::timestamptz
+                ORDER BY ts DESC
+                LIMIT 1
+            ) p
+        ), incidents AS (
+            SELECT ci, time_bucket('1 hour', ts) AS bucket
+            FROM (
+                SELECT ci, ts, status,
+                       LAG(status) OVER (PARTITION BY ci ORDER BY ts) AS prev_status
+                FROM (SELECT * FROM seed UNION ALL SELECT * FROM recent) s
+            ) m
+            WHERE ts >= %(start)s::timestamptz AND prev_status = 1 AND status = 0
+        )
+        INSERT INTO incident_heatmap_hourly (bucket_start, weekday, hour, incidents, ci_list)
+        SELECT b.bucket,
+               EXTRACT(ISODOW FROM b.bucket AT TIME ZONE 'Europe/Berlin')::smallint,
+               EXTRACT(HOUR FROM b.bucket AT TIME ZONE 'Europe/Berlin')::smallint,
+               COUNT(i.ci)::int,
+               COALESCE((ARRAY_AGG(DISTINCT i.ci) FILTER (WHERE i.ci IS NOT NULL))[1:%(max_cis)s], '{}')
+        FROM generate_series(%(start)s::timestamptz, time_bucket('1 hour', NOW()), INTERVAL '1 hour') AS b(bucket)
+        LEFT JOIN incidents i ON i.bucket = b.bucket
+        GROUP BY b.bucket
+        ON CONFLICT (bucket_start) DO UPDATE SET
+          weekday = EXCLUDED.weekday,
+          hour = EXCLUDED.hour,
+          incidents = EXCLUDED.incidents,
+          ci_list = EXCLUDED.ci_list
+    """, {'start': start, 'max_cis': INCIDENT_HEATMAP_MAX_CIS})
+    return max(0, cur.rowcount)
+
+def get_incident_heatmap_data(last_days: int = INCIDENT_HEATMAP_DAYS) -> pd.DataFrame:
     """
     Returns incident counts grouped by local weekday (Mon=1..Sun=7) and hour (0-23)
     over the last N days, including affected CI lists per bucket.
 
+    Reads the hourly grid maintained by refresh_incident_heatmap() (cron, initial
+    fill by the schema migration); measurements are never scanned here.
+
     Columns: weekday (int 1..7), hour (int 0..23), count (int), ci_list (list[str])
     """
+    columns = ['weekday', 'hour', 'count', 'ci_list']
     try:
         days = max(1, int(last_days))
         with get_db_conn() as conn, conn.cursor() as cur:
             cur.execute(
                 """
-                WITH trans AS (
-                    SELECT ci,
-                           ts,
-                           ts AT TIME ZONE 'Europe/Berlin' AS lts,
-                           status,
-                           LAG(status) OVER (PARTITION BY ci ORDER BY ts) AS prev_status
-                    FROM measurements
-                ), inc AS (
-                    SELECT ci,
-                           lts,
-                           EXTRACT(DOW FROM lts)::int AS dow0,  -- 0=Sun..6=Sat
-                           EXTRACT(HOUR FROM lts)::int AS hour
-                    FROM trans
-                    WHERE ts >= NOW() - INTERVAL %s AND prev_status = 1 AND status = 0
+                WITH cells AS (
+                    SELECT weekday, hour, incidents, ci_list
+                    FROM incident_heatmap_hourly
+                    WHERE bucket_start >= NOW() - %(window)s::interval AND incidents > 0
+                ), counts AS (
+                    SELECT weekday, hour, SUM(incidents)::int AS count
+                    FROM cells
+                    GROUP BY 1, 2
+                ), cis AS (
+                    SELECT weekday, hour, (ARRAY_AGG(DISTINCT c))[1:%(max_cis)s] AS ci_list
+                    FROM cells, unnest(ci_list) AS c
+                    GROUP BY 1, 2
                 )
-                SELECT 
-                    -- Map to ISO weekday 1=Mon..7=Sun
-                    CASE WHEN dow0 = 0 THEN 7 ELSE dow0 END AS weekday,
-                    hour,
-                    COUNT(*)::int AS count,
-                    (ARRAY_AGG(DISTINCT ci))[1:15] AS ci_list
-                FROM inc
-                GROUP BY 1, 2
+                SELECT counts.weekday, counts.hour, counts.count, COALESCE(cis.ci_list, '{}')
+                FROM counts
+                LEFT JOIN cis USING (weekday, hour)
                 ORDER BY 1, 2
                 """,
-                (f"{days} days",)
+                {'window': f"{days} days", 'max_cis': INCIDENT_HEATMAP_MAX_CIS}
             )
             rows = cur.fetchall()
             if not rows:
-                return pd.DataFrame(columns=['weekday','hour','count','ci_list'])
-            return pd.DataFrame(rows, columns=['weekday','hour','count','ci_list'])
+                return pd.DataFrame(columns=columns)
+            return pd.DataFrame(rows, columns=columns)
     except Exception as e:
         print(f"Error computing incident heatmap data: {e}")
-        return pd.DataFrame(columns=['weekday','hour','count','ci_list'])
+        return pd.DataFrame(columns=columns)
 
 def get_data_of_ci(file_name, ci):
     """
@@ -1308,6 +2007,8 @@ def send_mail(smtp_settings, recipients, subject, html_message):
     Returns:
         None
     """
+    import smtplib
+    from email.message import EmailMessage
     msg = EmailMessage()
     msg.add_alternative(html_message, subtype='html')
     msg['Subject'] = subject
@@ -1513,8 +2214,7 @@ def get_user_notification_profiles(user_id):
 def is_admin_user(email):
     """Check if user has admin privileges based on config.yaml"""
     try:
-        config = load_config()
-        admin_email = config.get('core', {}).get('admin_email', '')
+        admin_email = load_core_config().get('admin_email', '')
         return email == admin_email
     except Exception:
         return False
@@ -1653,109 +2353,448 @@ def log_page_view(page, session_id, user_agent_hash=None, referrer=None):
     except Exception as e:
         print(f"Error logging page view: {e}")
 
-def get_visitor_statistics():
-    """Get visitor statistics from page_views table"""
+# Page-View-Puffer: /api/track schreibt nicht mehr synchron pro Aufruf, sondern
+# reiht ein; ein Hintergrund-Thread schreibt gesammelt (alle N Sekunden oder M Zeilen).
+PAGE_VIEW_FLUSH_INTERVAL = float(os.getenv('TI_PAGE_VIEW_FLUSH_INTERVAL', '5'))  # seconds
+PAGE_VIEW_FLUSH_ROWS = int(os.getenv('TI_PAGE_VIEW_FLUSH_ROWS', '500'))
+PAGE_VIEW_QUEUE_MAX = int(os.getenv('TI_PAGE_VIEW_QUEUE_MAX', '10000'))
+
+_page_view_queue = queue.Queue(maxsize=PAGE_VIEW_QUEUE_MAX)
+_page_view_wakeup = threading.Event()
+_page_view_flush_lock = threading.Lock()
+_page_view_flusher = None
+_page_view_flusher_pid = None
+_page_view_counters = {'enqueued': 0, 'dropped': 0, 'written': 0, 'failed': 0, 'flushes': 0}
+# Eigenes Lock für die Zähler: _page_view_flush_lock wird während des INSERT gehalten,
+# enqueue_page_view() soll darauf nicht warten
+_page_view_counters_lock = threading.Lock()
+
+def _count_page_views(**deltas):
+    with _page_view_counters_lock:
+        for name, delta in deltas.items():
+            _page_view_counters[name] += delta
+
+def _ensure_page_view_flusher():
+    """Startet den Flusher lazily pro Prozess (gunicorn forkt nach dem Import)."""
+    global _page_view_flusher, _page_view_flusher_pid
+    if _page_view_flusher is not None and _page_view_flusher_pid == os.getpid() and _page_view_flusher.is_alive():
+        return
+    with _page_view_flush_lock:
+        if _page_view_flusher is not None and _page_view_flusher_pid == os.getpid() and _page_view_flusher.is_alive():
+            return
+        _page_view_flusher = threading.Thread(target=_page_view_flush_loop, name='page-view-flusher', daemon=True)
+        _page_view_flusher_pid = os.getpid()
+        _page_view_flusher.start()
+
+def enqueue_page_view(page, session_id, user_agent_hash=None, referrer=None):
+    """Reiht einen Page View zum gebündelten Schreiben ein.
+
+    Blockiert nie: ist die Queue voll, wird der Eintrag verworfen und gezählt.
+    Returns True wenn eingereiht.
+    """
+    _ensure_page_view_flusher()
     try:
-        with get_db_conn() as conn:
-            # Basic visitor stats
-            stats_query = """
-            WITH daily_stats AS (
-                SELECT 
-                    DATE(ts) as date,
-                    COUNT(DISTINCT session_id) as unique_visitors,
-                    COUNT(*) as page_views
-                FROM page_views
-                WHERE ts >= NOW() - INTERVAL '30 days'
-                GROUP BY DATE(ts)
-                ORDER BY date DESC
-            ),
-            page_stats AS (
-                SELECT 
-                    page,
-                    COUNT(*) as views,
-                    COUNT(DISTINCT session_id) as unique_visitors
-                FROM page_views
-                WHERE ts >= NOW() - INTERVAL '30 days'
-                GROUP BY page
-                ORDER BY views DESC
-            ),
-            browser_stats AS (
-                SELECT 
-                    user_agent_hash,
-                    COUNT(*) as views,
-                    COUNT(DISTINCT session_id) as unique_visitors
-                FROM page_views
-                WHERE ts >= NOW() - INTERVAL '30 days'
-                  AND user_agent_hash IS NOT NULL
-                GROUP BY user_agent_hash
-                ORDER BY views DESC
-                LIMIT 10
-            )
-            SELECT 
-                (SELECT COUNT(DISTINCT session_id) FROM page_views WHERE ts >= NOW() - INTERVAL '30 days') as total_unique_visitors_30d,
-                (SELECT COUNT(*) FROM page_views WHERE ts >= NOW() - INTERVAL '30 days') as total_page_views_30d,
-                (SELECT COUNT(DISTINCT session_id) FROM page_views WHERE ts >= CURRENT_DATE) as unique_visitors_today,
-                (SELECT COUNT(*) FROM page_views WHERE ts >= CURRENT_DATE) as page_views_today
-            """
-            
+        _page_view_queue.put_nowait((page, session_id, user_agent_hash, referrer, datetime.now(timezone.utc)))
+    except queue.Full:
+        _count_page_views(dropped=1)
+        return False
+    _count_page_views(enqueued=1)
+    if _page_view_queue.qsize() >= PAGE_VIEW_FLUSH_ROWS:
+        _page_view_wakeup.set()
+    return True
+
+def flush_page_views(max_rows=None):
+    """Schreibt alle (bzw. max_rows) gepufferten Page Views in einem INSERT. Returns Anzahl."""
+    with _page_view_flush_lock:
+        rows = []
+        limit = max_rows or PAGE_VIEW_QUEUE_MAX
+        while len(rows) < limit:
+            try:
+                rows.append(_page_view_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not rows:
+            return 0
+        try:
+            with get_db_conn() as conn, conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO page_views (page, session_id, user_agent_hash, referrer, ts)
+                    VALUES %s
+                """, rows, page_size=1000)
+                conn.commit()
+            _count_page_views(written=len(rows), flushes=1)
+            return len(rows)
+        except Exception as e:
+            # Kein Re-Queue: bei DB-Ausfall soll der Puffer nicht dauerhaft voll laufen
+            _count_page_views(failed=len(rows))
+            print(f"Error flushing page views ({len(rows)} rows): {e}")
+            return 0
+
+def _page_view_flush_loop():
+    while True:
+        _page_view_wakeup.wait(PAGE_VIEW_FLUSH_INTERVAL)
+        _page_view_wakeup.clear()
+        try:
+            while flush_page_views(PAGE_VIEW_FLUSH_ROWS) >= PAGE_VIEW_FLUSH_ROWS:
+                pass
+        except Exception as e:
+            print(f"Page view flusher error: {e}")
+
+def get_page_view_buffer_stats():
+    """Zähler des Page-View-Puffers (für Health/Admin)."""
+    with _page_view_counters_lock:
+        stats = dict(_page_view_counters)
+    stats['queued'] = _page_view_queue.qsize()
+    stats['queue_max'] = PAGE_VIEW_QUEUE_MAX
+    return stats
+
+# Beim Beenden des Workers (gunicorn graceful shutdown -> sys.exit) Rest schreiben
+atexit.register(flush_page_views)
+
+# ------------------------------
+# Cache-Bus (Postgres LISTEN/NOTIFY zwischen Cron und Web-Workern)
+# ------------------------------
+# Cron veröffentlicht nach Ingest/Statistik ein Ereignis je Thema; jeder Worker
+# hört in einem Thread mit und erhöht pro Thema eine Generation. Caches merken
+# sich die Generation, mit der sie gebaut wurden, und verwerfen ihren Eintrag,
+# sobald sie sich ändert. Die TTLs bleiben nur als Sicherheitsnetz.
+
+CACHE_CHANNEL = 'ti_cache'
+CACHE_TOPICS = ('availability', 'ci_metadata', 'statistics', 'downtimes')
+CACHE_LISTEN_RECONNECT_SECONDS = 10
+
+_cache_generations = {topic: 0 for topic in CACHE_TOPICS}
+_cache_listener = None
+_cache_listener_pid = None
+_cache_listener_lock = threading.Lock()
+_cache_bus_state = {'connected': False, 'events': 0, 'reconnects': 0, 'last_event': None, 'last_error': None}
+
+def publish_cache_event(topic, cur=None, **details):
+    """Meldet eine Datenänderung an alle Worker (NOTIFY ti_cache).
+
+    Mit ``cur`` wird das Ereignis Teil der laufenden Transaktion und erst beim
+    Commit zugestellt. Best-effort: Fehler werden nur ausgegeben.
+    """
+    payload = json.dumps(dict(details, topic=topic), default=str)
+    try:
+        if cur is not None:
+            cur.execute("SELECT pg_notify(%s, %s)", (CACHE_CHANNEL, payload))
+        else:
+            with get_db_conn() as conn, conn.cursor() as own_cur:
+                own_cur.execute("SELECT pg_notify(%s, %s)", (CACHE_CHANNEL, payload))
+    except Exception as e:
+        print(f"Cache event '{topic}' not published: {e}")
+
+def _apply_cache_event(payload):
+    """Erhöht die Generation des im Payload genannten Themas (unbekannt: alle)."""
+    try:
+        topic = json.loads(payload).get('topic')
+    except (ValueError, AttributeError):
+        topic = None
+    topics = (topic,) if topic in _cache_generations else CACHE_TOPICS
+    for name in topics:
+        _cache_generations[name] += 1
+    _cache_bus_state['events'] += 1
+    _cache_bus_state['last_event'] = time.time()
+    return topics
+
+def _cache_listen_loop():
+    while True:
+        conn = None
+        try:
+            conn = get_db_conn()
+            conn.autocommit = True
             with conn.cursor() as cur:
-                cur.execute(stats_query)
-                basic_stats = cur.fetchone()
-                
-                # Get daily breakdown
-                cur.execute("""
-                    SELECT 
-                        DATE(ts) as date,
-                        COUNT(DISTINCT session_id) as unique_visitors,
-                        COUNT(*) as page_views
-                    FROM page_views
-                    WHERE ts >= NOW() - INTERVAL '30 days'
-                    GROUP BY DATE(ts)
-                    ORDER BY date DESC
-                    LIMIT 30
-                """)
-                daily_data = cur.fetchall()
-                
-                # Get page popularity
-                cur.execute("""
-                    SELECT 
-                        page,
-                        COUNT(*) as views,
-                        COUNT(DISTINCT session_id) as unique_visitors
-                    FROM page_views
-                    WHERE ts >= NOW() - INTERVAL '30 days'
-                    GROUP BY page
-                    ORDER BY views DESC
-                    LIMIT 10
-                """)
-                page_data = cur.fetchall()
-                
-                # Get browser stats
-                cur.execute("""
-                    SELECT 
-                        user_agent_hash,
-                        COUNT(*) as views,
-                        COUNT(DISTINCT session_id) as unique_visitors
-                    FROM page_views
-                    WHERE ts >= NOW() - INTERVAL '30 days'
-                      AND user_agent_hash IS NOT NULL
-                    GROUP BY user_agent_hash
-                    ORDER BY views DESC
-                    LIMIT 10
-                """)
-                browser_data = cur.fetchall()
-                
-                return {
-                    'total_unique_visitors_30d': basic_stats[0] or 0,
-                    'total_page_views_30d': basic_stats[1] or 0,
-                    'unique_visitors_today': basic_stats[2] or 0,
-                    'page_views_today': basic_stats[3] or 0,
-                    'daily_breakdown': [{'date': str(row[0]), 'unique_visitors': row[1], 'page_views': row[2]} for row in daily_data],
-                    'popular_pages': [{'page': row[0], 'views': row[1], 'unique_visitors': row[2]} for row in page_data],
-                    'browser_stats': [{'user_agent_hash': row[0], 'views': row[1], 'unique_visitors': row[2]} for row in browser_data],
-                    'calculated_at': time.time()
-                }
-                
+                cur.execute(f"LISTEN {CACHE_CHANNEL}")
+            # Während der Verbindungslücke verpasste Ereignisse: alles einmal verwerfen
+            if _cache_bus_state['reconnects'] or _cache_bus_state['last_error']:
+                for name in CACHE_TOPICS:
+                    _cache_generations[name] += 1
+            _cache_bus_state['connected'] = True
+            _cache_bus_state['last_error'] = None
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    _apply_cache_event(conn.notifies.pop(0).payload)
+        except Exception as e:
+            _cache_bus_state['last_error'] = str(e)
+        finally:
+            _cache_bus_state['connected'] = False
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        _cache_bus_state['reconnects'] += 1
+        time.sleep(CACHE_LISTEN_RECONNECT_SECONDS)
+
+def _ensure_cache_listener():
+    """Startet den Listener lazily pro Prozess (gunicorn forkt nach dem Import)."""
+    global _cache_listener, _cache_listener_pid
+    if _cache_listener is not None and _cache_listener_pid == os.getpid():
+        return
+    with _cache_listener_lock:
+        if _cache_listener is not None and _cache_listener_pid == os.getpid():
+            return
+        _cache_listener = threading.Thread(target=_cache_listen_loop, name='cache-listener', daemon=True)
+        _cache_listener_pid = os.getpid()
+        _cache_listener.start()
+
+def get_cache_generation(topic):
+    """Aktuelle Generation eines Themas; ändert sich bei jedem empfangenen Ereignis."""
+    _ensure_cache_listener()
+    return _cache_generations[topic]
+
+def get_cache_key(*topics):
+    """Tupel der Generationen mehrerer Themen - Vergleichswert für zusammengesetzte Caches."""
+    _ensure_cache_listener()
+    return tuple(_cache_generations[topic] for topic in topics)
+
+def cache_bus_connected():
+    """True, solange der Listener verbunden ist."""
+    _ensure_cache_listener()
+    return _cache_bus_state['connected']
+
+def cache_ttl(ttl, fallback_ttl):
+    """Lange TTL bei verbundenem Cache-Bus, sonst die kurze Fallback-TTL."""
+    return ttl if cache_bus_connected() else fallback_ttl
+
+def get_cache_bus_stats():
+    """Zustand des Cache-Busses (für Health/Admin)."""
+    stats = dict(_cache_bus_state)
+    stats['generations'] = dict(_cache_generations)
+    return stats
+
+# ------------------------------
+# Visitor rollups (page_view_rollups_hourly/_daily, gepflegt durch cron.py)
+# ------------------------------
+
+PAGE_VIEW_RETENTION_DAYS = int(os.getenv('TI_PAGE_VIEW_RETENTION_DAYS', '90'))  # Rohdaten in page_views
+PAGE_VIEW_HOURLY_RETENTION_DAYS = 35  # Stunden-Rollups; Tages-Rollups bleiben erhalten
+PAGE_VIEW_TIMEZONE = pytz.timezone('Europe/Berlin')  # Tages-Rollups laufen über lokale Tage
+HLL_PRECISION = 12  # 4096 Register, Standardfehler ~1,6 %
+
+def hll_registers(values, p=HLL_PRECISION):
+    """HyperLogLog-Register (uint8-Array der Länge 2**p) für eine Menge von Werten."""
+    registers = np.zeros(1 << p, dtype=np.uint8)
+    width = 64 - p
+    mask = (1 << width) - 1
+    for value in values:
+        x = int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+        j = x >> width
+        rho = width - (x & mask).bit_length() + 1
+        if rho > registers[j]:
+            registers[j] = rho
+    return registers
+
+def hll_merge(*sketches):
+    """Vereinigung mehrerer Sketches (registerweises Maximum)."""
+    sketches = [s for s in sketches if s is not None]
+    if not sketches:
+        return None
+    return np.maximum.reduce(sketches)
+
+def hll_count(registers):
+    """Geschätzte Anzahl unterschiedlicher Werte (mit Linear Counting für kleine Mengen)."""
+    if registers is None:
+        return 0
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / float(np.sum(np.exp2(-registers.astype(np.float64))))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+def hll_encode(registers):
+    """Kompakte Speicherform für BYTEA: 1 Byte Präzision + zlib-komprimierte Register."""
+    p = int(len(registers)).bit_length() - 1
+    return bytes([p]) + zlib.compress(registers.tobytes())
+
+def hll_decode(blob):
+    if not blob:
+        return None
+    blob = bytes(blob)
+    registers = np.frombuffer(zlib.decompress(blob[1:]), dtype=np.uint8)
+    if len(registers) != (1 << blob[0]):
+        raise ValueError('HLL sketch length does not match precision')
+    return registers
+
+def aggregate_page_view_rows(rows):
+    """Verdichtet (bucket, page, user_agent_hash, session_id, views)-Zeilen.
+
+    Returns {(bucket, dimension, key): (views, registers)} für die Dimensionen
+    'total' (key ''), 'page' und 'browser' (nur mit user_agent_hash).
+    """
+    groups = {}
+    for bucket, page, user_agent_hash, session_id, views in rows:
+        keys = [('total', ''), ('page', page or '')]
+        if user_agent_hash:
+            keys.append(('browser', user_agent_hash))
+        for dimension, key in keys:
+            entry = groups.setdefault((bucket, dimension, key), [0, set()])
+            entry[0] += int(views)
+            entry[1].add(session_id)
+    return {k: (views, hll_registers(sessions)) for k, (views, sessions) in groups.items()}
+
+def _upsert_page_view_rollups(cur, table, aggregated):
+    execute_values(cur, f"""
+        INSERT INTO {table} (bucket_start, dimension, key, views, sessions_hll)
+        VALUES %s
+        ON CONFLICT (dimension, key, bucket_start) DO UPDATE
+        SET views = EXCLUDED.views, sessions_hll = EXCLUDED.sessions_hll
+    """, [(b, d, k, v, psycopg2.Binary(hll_encode(r))) for (b, d, k), (v, r) in aggregated.items()], page_size=1000)
+
+def page_view_day_bounds(ts):
+    """UTC-Beginn und -Ende des lokalen Tages (PAGE_VIEW_TIMEZONE), in dem ts liegt.
+
+    Entspricht time_bucket('1 day', ts, 'Europe/Berlin'); an DST-Tagen 23 bzw. 25 Stunden.
+    """
+    local_date = ts.astimezone(PAGE_VIEW_TIMEZONE).date()
+    start, end = (
+        PAGE_VIEW_TIMEZONE.localize(datetime.combine(day, datetime.min.time())).astimezone(timezone.utc)
+        for day in (local_date, local_date + timedelta(days=1))
+    )
+    return start, end
+
+def _refresh_page_view_day(cur, day_start, day_end):
+    """Tages-Rollup eines lokalen Tages aus dessen Stunden-Rollups neu zusammenführen."""
+    cur.execute("""
+        SELECT dimension, key, views, sessions_hll
+        FROM page_view_rollups_hourly
+        WHERE bucket_start >= %s AND bucket_start < %s
+    """, (day_start, day_end))
+    merged = {}
+    for dimension, key, views, blob in cur.fetchall():
+        entry = merged.get((day_start, dimension, key))
+        sketch = hll_decode(blob)
+        if entry is None:
+            merged[(day_start, dimension, key)] = (int(views), sketch)
+        else:
+            merged[(day_start, dimension, key)] = (entry[0] + int(views), hll_merge(entry[1], sketch))
+    if merged:
+        _upsert_page_view_rollups(cur, 'page_view_rollups_daily', merged)
+    return len(merged)
+
+def rebuild_page_view_daily_rollups(cur):
+    """Baut die Tages-Rollups aller vollständig in den Stunden-Rollups enthaltenen Tage neu auf.
+
+    Für die Umstellung auf lokale Tage: ältere Tageszeilen bleiben, wie sie sind.
+    Returns Anzahl neu aufgebauter Tage.
+    """
+    cur.execute("SELECT MIN(bucket_start) FROM page_view_rollups_hourly")
+    first_hour = cur.fetchone()[0]
+    if first_hour is None:
+        return 0
+    day_start, day_end = page_view_day_bounds(first_hour)
+    if day_start < first_hour:
+        day_start, day_end = page_view_day_bounds(day_end)
+    cur.execute("DELETE FROM page_view_rollups_daily WHERE bucket_start >= %s", (day_start,))
+    days = 0
+    now = datetime.now(timezone.utc)
+    while day_start <= now:
+        _refresh_page_view_day(cur, day_start, day_end)
+        days += 1
+        day_start, day_end = page_view_day_bounds(day_end)
+    return days
+
+def refresh_page_view_rollups(since=None):
+    """Aktualisiert Stunden- und Tages-Rollups der Seitenaufrufe inkrementell.
+
+    Ab der letzten (evtl. noch offenen) Stunde minus eine Stunde Puffer für verspätet
+    geschriebene Page Views; bei leerer Rollup-Tabelle vollständiger Backfill, tageweise.
+    Tages-Rollups beginnen um Mitternacht Europe/Berlin (bucket_start in UTC).
+    Returns Anzahl geschriebener Stunden-Rollup-Zeilen.
+    """
+    written = 0
+    with get_db_conn() as conn, conn.cursor() as cur:
+        if since is None:
+            cur.execute("SELECT MAX(bucket_start) FROM page_view_rollups_hourly")
+            since = cur.fetchone()[0]
+            if since is not None:
+                since = since - timedelta(hours=1)
+            else:
+                cur.execute("SELECT MIN(ts) FROM page_views")
+                since = cur.fetchone()[0]
+                if since is None:
+                    return 0
+        window_start = since.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        now = datetime.now(timezone.utc)
+        while window_start <= now:
+            day_start, window_end = page_view_day_bounds(window_start)
+            cur.execute("""
+                SELECT time_bucket('1 hour', ts) AS bucket, page, user_agent_hash, session_id, COUNT(*)
+                FROM page_views
+                WHERE ts >= %s AND ts < %s
+                GROUP BY 1, 2, 3, 4
+            """, (window_start, window_end))
+            aggregated = aggregate_page_view_rows(cur.fetchall())
+            if aggregated:
+                _upsert_page_view_rollups(cur, 'page_view_rollups_hourly', aggregated)
+                _refresh_page_view_day(cur, day_start, window_end)
+                written += len(aggregated)
+            conn.commit()
+            window_start = window_end
+        cur.execute(
+            "DELETE FROM page_view_rollups_hourly WHERE bucket_start < NOW() - %s * INTERVAL '1 day'",
+            (PAGE_VIEW_HOURLY_RETENTION_DAYS,)
+        )
+        conn.commit()
+    return written
+
+def _top_page_view_keys(cur, dimension, since, limit=10):
+    """Top-Schlüssel einer Dimension nach Aufrufen inkl. zusammengeführter Sketches."""
+    cur.execute("""
+        SELECT key, SUM(views) AS views
+        FROM page_view_rollups_daily
+        WHERE dimension = %s AND bucket_start >= %s
+        GROUP BY key
+        ORDER BY views DESC
+        LIMIT %s
+    """, (dimension, since, limit))
+    top = cur.fetchall()
+    if not top:
+        return []
+    cur.execute("""
+        SELECT key, sessions_hll
+        FROM page_view_rollups_daily
+        WHERE dimension = %s AND bucket_start >= %s AND key = ANY(%s)
+    """, (dimension, since, [key for key, _ in top]))
+    sketches = {}
+    for key, blob in cur.fetchall():
+        sketches[key] = hll_merge(sketches.get(key), hll_decode(blob))
+    return [(key, int(views), hll_count(sketches.get(key))) for key, views in top]
+
+def get_visitor_statistics():
+    """Get visitor statistics from the page view rollups (no raw page_views scans)"""
+    try:
+        today = page_view_day_bounds(datetime.now(timezone.utc))[0]
+        since = page_view_day_bounds(today + timedelta(hours=12) - timedelta(days=29))[0]
+        with get_db_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT bucket_start, views, sessions_hll
+                FROM page_view_rollups_daily
+                WHERE dimension = 'total' AND key = '' AND bucket_start >= %s
+                ORDER BY bucket_start DESC
+            """, (since,))
+            daily_rows = [(bucket, int(views), hll_decode(blob)) for bucket, views, blob in cur.fetchall()]
+            page_data = _top_page_view_keys(cur, 'page', since)
+            browser_data = _top_page_view_keys(cur, 'browser', since)
+
+        today_row = next((row for row in daily_rows if row[0] == today), None)
+        return {
+            'total_unique_visitors_30d': hll_count(hll_merge(*[row[2] for row in daily_rows])),
+            'total_page_views_30d': sum(row[1] for row in daily_rows),
+            'unique_visitors_today': hll_count(today_row[2]) if today_row else 0,
+            'page_views_today': today_row[1] if today_row else 0,
+            'daily_breakdown': [{'date': row[0].astimezone(PAGE_VIEW_TIMEZONE).date().isoformat(), 'unique_visitors': hll_count(row[2]), 'page_views': row[1]} for row in daily_rows],
+            'popular_pages': [{'page': row[0], 'views': row[1], 'unique_visitors': row[2]} for row in page_data],
+            'browser_stats': [{'user_agent_hash': row[0], 'views': row[1], 'unique_visitors': row[2]} for row in browser_data],
+            'calculated_at': time.time()
+        }
+
     except Exception as e:
         print(f"Error getting visitor statistics: {e}")
         return {
@@ -1769,6 +2808,572 @@ def get_visitor_statistics():
             'calculated_at': time.time()
         }
 
+# ------------------------------
+# Statistics snapshot (data/statistics.json, written hourly by cron.py)
+# ------------------------------
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None
+
+STATISTICS_FILE = os.path.join(os.path.dirname(__file__), 'data', 'statistics.json')
+STATISTICS_SNAPSHOT_FILE = os.path.join(os.path.dirname(__file__), 'data', 'statistics.msgpack')
+
+# Snapshot files carry a header under this key: magic, version, kind, generation, created_at
+SNAPSHOT_HEADER_KEY = '_snapshot'
+SNAPSHOT_MAGIC = 'ti-monitoring-snapshot'
+SNAPSHOT_FORMAT_VERSION = 1
+
+def _snapshot_value(value):
+    """Normalizes a payload for snapshot files (aware UTC datetimes, plain numbers)."""
+    if isinstance(value, dict):
+        return {str(k): _snapshot_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_snapshot_value(v) for v in value]
+    if value is pd.NaT:  # NaT ist eine datetime-Unterklasse, msgpack kann es nicht schreiben
+        return None
+    if isinstance(value, pd.Timestamp):
+        value = None if pd.isna(value) else value.to_pydatetime()
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is not None and type(value).__name__ == 'Decimal':
+        return float(value)
+    return value
+
+def write_snapshot(path, payload, kind, generation=None):
+    """
+    Writes a versioned snapshot atomically (temp file + fsync + rename).
+
+    Readers either see the previous or the new file, never a partial one.
+    Files ending in .json are written as compact JSON (timestamps as strings),
+    everything else as msgpack with typed timestamps.
+
+    Returns:
+        int: Generation of the written snapshot
+    """
+    if generation is None:
+        generation = int(time.time() * 1000)
+    document = _snapshot_value(payload)
+    document[SNAPSHOT_HEADER_KEY] = {
+        'magic': SNAPSHOT_MAGIC,
+        'version': SNAPSHOT_FORMAT_VERSION,
+        'kind': kind,
+        'generation': int(generation),
+        'created_at': datetime.now(timezone.utc)
+    }
+    if path.endswith('.json'):
+        body = json.dumps(document, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    else:
+        if msgpack is None:
+            raise RuntimeError('msgpack is not installed')
+        body = msgpack.packb(document, use_bin_type=True, datetime=True)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return int(generation)
+
+def read_snapshot(path):
+    """
+    Reads a snapshot file written by write_snapshot() (or a legacy JSON file).
+
+    Returns:
+        tuple: (header dict, payload dict); legacy files get an empty header
+    """
+    with open(path, 'rb') as f:
+        body = f.read()
+    if path.endswith('.json'):
+        document = json.loads(body.decode('utf-8'))
+    else:
+        if msgpack is None:
+            raise RuntimeError('msgpack is not installed')
+        document = msgpack.unpackb(body, raw=False, timestamp=3, strict_map_key=False)
+    if not isinstance(document, dict):
+        raise ValueError(f"Unexpected snapshot content in {path}")
+    header = document.pop(SNAPSHOT_HEADER_KEY, None) or {}
+    if header and header.get('magic') != SNAPSHOT_MAGIC:
+        raise ValueError(f"Unknown snapshot format in {path}")
+    if int(header.get('version', 0) or 0) > SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Snapshot version {header.get('version')} in {path} is newer than supported")
+    return header, document
+
+_statistics_snapshot = None
+_statistics_snapshot_key = None
+_statistics_snapshot_lock = threading.Lock()
+
+def _freeze(value):
+    """Recursively converts dicts/lists into read-only MappingProxyType/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def thaw(value):
+    """Returns a plain (mutable, JSON-serializable) copy of a frozen snapshot value."""
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+class StatisticsSnapshot:
+    """Immutable, parsed view of one statistics file version.
+
+    `data` is the frozen top-level mapping, `per_ci` an index CI -> frozen
+    metrics for O(1) lookups. `generation` changes with every new file.
+    """
+
+    __slots__ = ('data', 'per_ci', 'generation', 'loaded_at')
+
+    def __init__(self, data, generation):
+        per_ci = {}
+        for row in data.get('top_unstable_cis') or []:
+            if isinstance(row, dict) and row.get('ci'):
+                per_ci[row['ci']] = row
+        for ci, metrics in (data.get('per_ci_metrics') or {}).items():
+            per_ci[ci] = {**per_ci.get(ci, {}), **(metrics or {})}
+        object.__setattr__(self, 'data', _freeze(data))
+        object.__setattr__(self, 'per_ci', _freeze(per_ci))
+        object.__setattr__(self, 'generation', generation)
+        object.__setattr__(self, 'loaded_at', time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError('StatisticsSnapshot is immutable')
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def ci(self, ci):
+        """Per-CI metrics (mapping) or None."""
+        return self.per_ci.get(ci)
+
+def load_statistics_snapshot(path=None):
+    """
+    Returns the current StatisticsSnapshot, parsing the file only when it changed
+    (mtime, size or inode). Prefers the msgpack snapshot and falls back to
+    statistics.json. If the file is missing or unreadable, the previously loaded
+    snapshot keeps being served (None if there never was one).
+    """
+    global _statistics_snapshot, _statistics_snapshot_key
+    if path is None:
+        path = STATISTICS_SNAPSHOT_FILE
+        if msgpack is None or not os.path.exists(path):
+            path = STATISTICS_FILE
+    try:
+        st = os.stat(path)
+    except OSError:
+        return _statistics_snapshot
+    key = (path, st.st_mtime_ns, st.st_size, st.st_ino)
+    if key == _statistics_snapshot_key and _statistics_snapshot is not None:
+        return _statistics_snapshot
+    with _statistics_snapshot_lock:
+        if key == _statistics_snapshot_key and _statistics_snapshot is not None:
+            return _statistics_snapshot
+        try:
+            header, data = read_snapshot(path)
+            generation = header.get('generation') or st.st_mtime_ns
+            _statistics_snapshot = StatisticsSnapshot(data, generation=generation)
+            _statistics_snapshot_key = key
+        except Exception as e:
+            print(f"Error loading statistics snapshot {path}: {e}")
+    return _statistics_snapshot
+
+# ------------------------------
+# Home artifact (data/home.msgpack, nach jedem Ingest von cron.py gerendert)
+# ------------------------------
+# Enthält die datenlastigen Teile der Startseite: CI-Zustände je Produkt,
+# CI-Tabelle inkl. Downtimes, letzte Incidents und die fertige Heatmap-Figur.
+# Web-Worker setzen die Seite daraus ohne DB-Abfrage zusammen und fallen nur bei
+# fehlendem oder veraltetem Artefakt auf Live-Abfragen zurück.
+
+HOME_ARTIFACT_FILE = os.path.join(os.path.dirname(__file__), 'data', 'home.msgpack')
+HOME_ARTIFACT_JSON_FILE = os.path.join(os.path.dirname(__file__), 'data', 'home.json')
+HOME_ARTIFACT_MAX_AGE = int(os.getenv('TI_HOME_ARTIFACT_MAX_AGE', '900'))  # 3 Cron-Zyklen
+HOME_ARTIFACT_CI_COLUMNS = ['ci', 'name', 'organization', 'product', 'current_availability', 'time']
+
+_home_artifact = None  # (header, payload)
+_home_artifact_key = None
+_home_artifact_lock = threading.Lock()
+
+def build_incident_heatmap_figure(df):
+    """Heatmap (Wochentag x Stunde) als Plotly-Figure-Dict, ohne plotly zu importieren.
+
+    df: Spalten weekday (1=Mo..7=So), hour (0..23), count, ci_list
+    """
+    hours = list(range(24))
+    x_labels = [f"{h:02d}:00" for h in hours]
+    wdays = ['Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa', 'So']
+    z = [[0 for _ in hours] for _ in wdays]
+    text = [["" for _ in hours] for _ in wdays]
+    records = df.to_dict('records') if df is not None and not df.empty else []
+    for row in records:
+        try:
+            weekday = int(row.get('weekday') or 0)
+            hour = int(row.get('hour'))
+            count = int(row.get('count') or 0)
+        except (TypeError, ValueError):
+            continue
+        if not (1 <= weekday <= 7 and 0 <= hour <= 23):
+            continue
+        cis = list(row.get('ci_list') or [])
+        preview = ', '.join(str(c) for c in cis[:8])
+        extra = '' if len(cis) <= 8 else f" …(+{len(cis) - 8})"
+        z[weekday - 1][hour] += count
+        if not text[weekday - 1][hour]:
+            text[weekday - 1][hour] = f"{wdays[weekday - 1]} {hour:02d}:00\nIncidents: {count}\nCIs: {preview}{extra}"
+    max_count = max(max(row) for row in z)
+    return {
+        'data': [{
+            'type': 'heatmap',
+            'z': z,
+            'x': x_labels,
+            'y': wdays,
+            'colorscale': 'YlOrRd',
+            'hoverinfo': 'text',
+            'text': text,
+            'colorbar': {'title': {'text': 'Incidents'}},
+            'zmin': 0,
+            'zmax': max_count if max_count > 0 else 1,
+        }],
+        'layout': {
+            'height': 360,
+            'margin': {'l': 40, 'r': 20, 't': 30, 'b': 40},
+            'xaxis': {'title': {'text': 'Stunde'}, 'type': 'category', 'categoryorder': 'array', 'categoryarray': x_labels},
+            'yaxis': {'title': {'text': 'Wochentag'}, 'type': 'category', 'categoryorder': 'array', 'categoryarray': wdays},
+            # Transparente Hintergründe: Kontrast für Light/Dark Mode kommt aus dem CSS
+            'paper_bgcolor': 'rgba(0,0,0,0)',
+            'plot_bgcolor': 'rgba(0,0,0,0)',
+        },
+    }
+
+def build_home_artifact():
+    """Sammelt alle DB-Daten der Startseite (für cron.py)."""
+    cis = get_data_of_all_cis(None)
+    ci_table = get_all_cis_with_downtimes()
+    heatmap = get_incident_heatmap_data(INCIDENT_HEATMAP_DAYS)
+    if cis is None or cis.empty:
+        raise RuntimeError('no CI data available')
+    heatmap_records = heatmap[['weekday', 'hour', 'count', 'ci_list']].to_dict('records') if not heatmap.empty else []
+    return {
+        'cis': cis[[c for c in HOME_ARTIFACT_CI_COLUMNS if c in cis.columns]].to_dict('records'),
+        'ci_table': ci_table.to_dict('records') if ci_table is not None and not ci_table.empty else [],
+        'recent_incidents': get_recent_incidents(limit=10),
+        'heatmap': {'data': heatmap_records, 'figure': build_incident_heatmap_figure(heatmap)},
+    }
+
+def _home_artifact_path():
+    return HOME_ARTIFACT_FILE if msgpack is not None else HOME_ARTIFACT_JSON_FILE
+
+def write_home_artifact():
+    """Rendert das Startseiten-Artefakt und schreibt es atomar. Returns Generation."""
+    return write_snapshot(_home_artifact_path(), build_home_artifact(), 'home')
+
+def load_home_artifact(max_age=None):
+    """
+    Returns (generation, payload) of the current home artifact, or None if it is
+    missing, unreadable or older than ``max_age`` seconds (HOME_ARTIFACT_MAX_AGE).
+    The file is parsed only when it changed; payload must be treated as read-only.
+    """
+    global _home_artifact, _home_artifact_key
+    path = _home_artifact_path()
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size, st.st_ino)
+    if key != _home_artifact_key:
+        with _home_artifact_lock:
+            if key != _home_artifact_key:
+                try:
+                    _home_artifact = read_snapshot(path)
+                except Exception as e:
+                    print(f"Error loading home artifact {path}: {e}")
+                    _home_artifact = None
+                _home_artifact_key = key
+    artifact = _home_artifact
+    if artifact is None:
+        return None
+    header, payload = artifact
+    created_at = header.get('created_at')
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            created_at = None
+    if not isinstance(created_at, datetime):
+        return None
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    limit = HOME_ARTIFACT_MAX_AGE if max_age is None else max_age
+    if (datetime.now(timezone.utc) - created_at).total_seconds() > limit:
+        return None
+    return header.get('generation'), payload
+
+# ------------------------------
+# Log tail (data/cron.log, für die Log-Seiten)
+# ------------------------------
+
+CRON_LOG_FILE = os.path.join(os.path.dirname(__file__), 'data', 'cron.log')
+LOG_TAIL_BLOCK_SIZE = 64 * 1024
+LOG_TAIL_MAX_LINES = 1000  # im Speicher gehaltene letzte Zeilen je Datei
+
+_log_tail_cache = {}  # path -> state (inode, offset, lines, pending, size, mtime)
+_log_tail_lock = threading.Lock()
+
+def read_last_lines(path, n, block_size=LOG_TAIL_BLOCK_SIZE):
+    """Liest die letzten n vollständigen Zeilen, blockweise rückwärts ab Dateiende.
+
+    Returns (lines, pending, end_offset): lines als Bytes ohne Zeilenumbruch (älteste
+    zuerst), pending = unvollständige letzte Zeile, end_offset = gelesene Dateigröße.
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        pos = end
+        data = b''
+        while pos > 0 and data.count(b'\n') <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    parts = data.split(b'\n')
+    pending = parts.pop()
+    if pos > 0 and parts:
+        parts = parts[1:]  # erste Zeile ist evtl. abgeschnitten
+    return (parts[-n:] if n > 0 else []), pending, end
+
+def _refresh_log_tail_state(path):
+    """Aktualisiert den Tail-Zustand: liest nur seit dem gemerkten Offset angehängte Bytes.
+
+    Bei Rotation (neue Inode) oder Kürzung wird per Rückwärtsleser neu aufgesetzt.
+    """
+    st = os.stat(path)
+    state = _log_tail_cache.get(path)
+    if state is None or state['inode'] != st.st_ino or st.st_size < state['offset']:
+        lines, pending, end = read_last_lines(path, LOG_TAIL_MAX_LINES)
+        state = {
+            'inode': st.st_ino,
+            'offset': end,
+            'lines': deque(lines, maxlen=LOG_TAIL_MAX_LINES),
+            'pending': pending,
+        }
+        _log_tail_cache[path] = state
+    elif st.st_size > state['offset']:
+        with open(path, 'rb') as f:
+            f.seek(state['offset'])
+            chunk = f.read(st.st_size - state['offset'])
+        parts = (state['pending'] + chunk).split(b'\n')
+        state['pending'] = parts.pop()
+        state['lines'].extend(parts)
+        state['offset'] += len(chunk)
+    state['size'] = st.st_size
+    state['mtime'] = st.st_mtime
+    return state
+
+def get_log_tail(n=100, path=None):
+    """Letzte n Zeilen (älteste zuerst) plus Dateiinfos, ohne die ganze Datei zu lesen.
+
+    n=0 liefert die gesamte Datei (explizite Benutzeraktion). Returns dict mit
+    exists, lines, size, mtime, offset, inode und line_offset (Ende der letzten
+    vollständigen Zeile, Startpunkt für den Live-Stream). Eine Gesamtzeilenzahl gibt
+    es bewusst nicht: sie müsste nach jedem Start und jeder Rotation die ganze Datei lesen.
+    """
+    path = path or CRON_LOG_FILE
+    if not os.path.exists(path):
+        return {'exists': False, 'lines': [], 'size': 0, 'mtime': None, 'offset': 0, 'inode': None, 'line_offset': 0}
+    with _log_tail_lock:
+        state = _refresh_log_tail_state(path)
+        if n and n <= LOG_TAIL_MAX_LINES:
+            raw = list(state['lines']) + ([state['pending']] if state['pending'] else [])
+            raw = raw[-n:]
+        else:
+            raw = None
+        info = {
+            'exists': True,
+            'size': state['size'],
+            'mtime': state['mtime'],
+            'offset': state['offset'],
+            'inode': state['inode'],
+            'line_offset': state['offset'] - len(state['pending']),
+        }
+    if raw is None:
+        if n:
+            lines, pending, _ = read_last_lines(path, n)
+        else:
+            with open(path, 'rb') as f:
+                lines = f.read().split(b'\n')
+            pending = lines.pop()
+        raw = lines + ([pending] if pending else [])
+        if n:
+            raw = raw[-n:]
+    info['lines'] = [line.decode('utf-8', errors='replace').rstrip('\r') for line in raw]
+    return info
+
+# Live-Stream der Log-Datei (SSE): ein gemeinsamer Follower-Thread je Prozess liest
+# nur angehängte Bytes und verteilt sie an begrenzte Subscriber-Queues.
+LOG_STREAM_POLL_SECONDS = 1.0
+LOG_STREAM_QUEUE_MAX = 200  # Batches; läuft eine Queue voll, wird der Client getrennt
+LOG_STREAM_TOKEN_TTL = 3600
+
+class LogStreamHub:
+    """Gemeinsamer Tailer für eine Datei; Events sind (inode, end_offset, lines)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._inode = None
+        self._offset = 0
+        self._pending = b''
+
+    def _position(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_ino, st.st_size
+        except OSError:
+            return None, 0
+
+    def subscribe(self):
+        """Returns (queue, inode, offset): Events in der Queue beginnen nach offset."""
+        q = queue.Queue(maxsize=LOG_STREAM_QUEUE_MAX)
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._inode, self._offset = self._position()
+                self._pending = b''
+                self._thread = threading.Thread(target=self._run, name='log-stream-follower', daemon=True)
+                self._thread.start()
+            self._subscribers.add(q)
+            return q, self._inode, self._offset - len(self._pending)
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def _publish(self, event, subscribers=None):
+        if subscribers is None:
+            with self._lock:
+                subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # Backpressure: langsamen Client trennen, er setzt per Offset wieder auf
+                self.unsubscribe(q)
+                try:
+                    q.get_nowait()
+                    q.put_nowait(None)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def _run(self):
+        # Nur dieser Thread schreibt _inode/_offset/_pending; Änderungen und der
+        # Subscriber-Schnappschuss passieren unter _lock, damit subscribe() einen
+        # Offset sieht, der genau zu den danach zugestellten Events passt.
+        while True:
+            time.sleep(LOG_STREAM_POLL_SECONDS)
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                inode, size = self._position()
+                if inode is None:
+                    continue
+                if inode != self._inode or size < self._offset:
+                    # Rotation: neue Datei von vorne lesen
+                    with self._lock:
+                        self._inode, self._offset, self._pending = inode, 0, b''
+                        subscribers = list(self._subscribers)
+                    self._publish((inode, 0, None), subscribers)
+                if size <= self._offset:
+                    continue
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    chunk = f.read(size - self._offset)
+                parts = (self._pending + chunk).split(b'\n')
+                with self._lock:
+                    self._offset += len(chunk)
+                    self._pending = parts.pop()
+                    end_offset = self._offset - len(self._pending)
+                    subscribers = list(self._subscribers)
+                if parts:
+                    lines = [p.decode('utf-8', errors='replace').rstrip('\r') for p in parts]
+                    self._publish((inode, end_offset, lines), subscribers)
+            except Exception as e:
+                print(f"Log stream follower error: {e}")
+
+_log_stream_hubs = {}
+
+def get_log_stream_hub(path=None):
+    path = path or CRON_LOG_FILE
+    with _log_tail_lock:
+        hub = _log_stream_hubs.get(path)
+        if hub is None:
+            hub = _log_stream_hubs[path] = LogStreamHub(path)
+        return hub
+
+def read_log_range(path, inode, start, end, max_bytes=256 * 1024, partial_start=False):
+    """Vollständige Zeilen zwischen zwei Offsets (Resume nach Verbindungsabbruch).
+
+    Returns None, wenn der Offset nicht mehr zur Datei passt (Rotation) oder die Lücke
+    größer als max_bytes ist; dann setzt der Client mit dem aktuellen Tail neu auf.
+    partial_start=True verwirft die erste (evtl. angeschnittene) Zeile.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_ino != inode or start > end or end > st.st_size or end - start > max_bytes:
+        return None
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    parts = data.split(b'\n')[:-1]
+    if partial_start and start > 0:
+        parts = parts[1:]
+    return [p.decode('utf-8', errors='replace').rstrip('\r') for p in parts]
+
+# Ohne ENCRYPTION_KEY nur prozesslokal gültig (mehrere Worker -> Token ggf. abgelehnt)
+_log_stream_fallback_secret = secrets.token_bytes(32)
+
+def _log_stream_secret():
+    secret = os.getenv('ENCRYPTION_KEY')
+    return secret.encode('utf-8') if secret else _log_stream_fallback_secret
+
+def issue_log_stream_token(email, ttl=LOG_STREAM_TOKEN_TTL):
+    """Kurzlebiges, HMAC-signiertes Token für den Log-Stream (EventSource kann keine Stores senden)."""
+    expires = int(time.time()) + int(ttl)
+    email_hex = (email or '').encode('utf-8').hex()
+    payload = f"{expires}.{email_hex}"
+    signature = hmac.new(_log_stream_secret(), payload.encode('ascii'), hashlib.sha256).hexdigest()
+    return f"{payload}.{signature}"
+
+def verify_log_stream_token(token):
+    """Returns die E-Mail, wenn Signatur und Ablauf gültig sind und der Nutzer Admin ist."""
+    try:
+        expires, email_hex, signature = str(token).split('.')
+        payload = f"{expires}.{email_hex}"
+        expected = hmac.new(_log_stream_secret(), payload.encode('ascii'), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, signature) or int(expires) < time.time():
+            return None
+        email = bytes.fromhex(email_hex).decode('utf-8')
+        return email if is_admin_user(email) else None
+    except Exception:
+        return None
+
 # ------------------------------
 # Message formatting helpers for Apprise channels
 # ------------------------------
@@ -1927,6 +3532,12 @@ def send_db_notifications():
     profiles_processed = 0
     
     try:
+        # Konfiguration einmal pro Lauf statt pro Profil lesen
+        core_config = load_core_config()
+        unsubscribe_base_url = core_config.get('unsubscribe_base_url', '')
+        detail_base = core_config.get('public_base_url') or core_config.get('home_url') or 'https://ti-stats.net'
+        otp_tpl = core_config.get('otp_apprise_url_template')
+
         # Get all notification profiles from the database
         with get_db_conn() as conn, conn.cursor() as cur:
             cur.execute("""
@@ -1990,9 +3601,6 @@ def send_db_notifications():
                         subject = f'TI-Stats: {str(number_of_relevant_changes)} Änderungen der Verfügbarkeit'
                         
                         # Prepare base unsubscribe token/link (profile-level)
-                        config = load_config()
-                        unsubscribe_base_url = config.get('core', {}).get('unsubscribe_base_url', '')
-                        
                         if unsubscribe_base_url:
                             # Get the unsubscribe token for this profile
                             cur.execute("""
@@ -2006,18 +3614,9 @@ def send_db_notifications():
                                 message_with_profile_unsub = str(message) + f'<p><a href="{profile_unsub_link}">Abmelden von diesem Benachrichtigungsprofil</a></p>'
                         
                         # Versand-Strategie: E-Mail (einfach) ist exklusiv; sonst benutzerdefinierte Apprise-URLs
-                        # Detail-URL für öffentliche Ansicht ermitteln
-                        try:
-                            cfg_links = load_config().get('core', {}) or {}
-                            detail_base = cfg_links.get('public_base_url') or cfg_links.get('home_url') or 'https://ti-stats.net'
-                        except Exception:
-                            detail_base = 'https://ti-stats.net'
-
                         if email_notifications:
                             # Senden über otp_apprise_url_template (ohne OTP, mit Empfänger-E-Mail)
                             try:
-                                cfg = load_config()
-                                otp_tpl = (cfg.get('core', {}) or {}).get('otp_apprise_url_template')
                                 # Empfänger aus verschlüsseltem Benutzerkonto entschlüsseln
                                 encryption_key = os.getenv('ENCRYPTION_KEY')
                                 if encryption_key:
@@ -1,8 +1,7 @@
 import dash
-from dash import html, dcc, Input, Output, State, callback, no_update
-from mylibrary import is_admin_user
+from dash import html, dcc, Input, Output, State, callback, clientside_callback, no_update
+from mylibrary import is_admin_user, get_log_tail, issue_log_stream_token
 from pages.components.admin_common import create_admin_header
-import yaml
 import os
 import time
 import json
@@ -10,41 +9,6 @@ import pandas as pd
 import pytz
 from datetime import datetime
 
-# Configuration cache for admin logs page
-_logs_config_cache = {}
-_logs_config_cache_timestamp = 0
-_logs_config_cache_ttl = 300  # 5 seconds cache TTL
-_logs_config_cache_max_size = 10  # Limit cache size
-
-def load_config():
-    """Load configuration from YAML file with caching"""
-    global _logs_config_cache, _logs_config_cache_timestamp
-
-    current_time = time.time()
-    if (not _logs_config_cache or
-        current_time - _logs_config_cache_timestamp > _logs_config_cache_ttl):
-
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                _logs_config_cache = yaml.safe_load(f) or {}
-            _logs_config_cache_timestamp = current_time
-
-            # Limit cache size
-            if len(_logs_config_cache) > _logs_config_cache_max_size:
-                # Keep only the most recent entries
-                keys = list(_logs_config_cache.keys())[:_logs_config_cache_max_size]
-                _logs_config_cache = {k: _logs_config_cache[k] for k in keys}
-        except (FileNotFoundError, Exception):
-            _logs_config_cache = {}
-            _logs_config_cache_timestamp = current_time
-
-    return _logs_config_cache
-
-def load_core_config():
-    """Load core configuration from cached config"""
-    config = load_config()
-    return config.get('core', {})
 
 def get_button_style(variant='primary'):
     base = {
@@ -143,7 +107,7 @@ def check_admin_and_load_logs(auth_data):
 
     # Admin verified - show logs interface
     return html.Div([
-        html.H4('Container-Logs'),
+        html.H4('Cron-Logs'),
         html.Div([
             html.Div([
                 html.Label('Anzahl Zeilen:', style={
@@ -185,6 +149,18 @@ def check_admin_and_load_logs(auth_data):
             'gap': '15px'
         }),
 
+        # Live-Stream (SSE): neue Zeilen werden clientseitig oberhalb des Tails eingefügt
+        dcc.Store(id='admin-log-stream-token', data=issue_log_stream_token(user_email)),
+        dcc.Store(id='admin-log-stream-offset'),
+        html.Div(id='admin-log-stream-status', style={'fontSize': '12px', 'color': '#7f8c8d', 'marginBottom': '6px'}),
+        html.Pre(id='admin-log-live', style={
+            'margin': '0',
+            'padding': '0 15px',
+            'fontFamily': 'monospace',
+            'fontSize': '12px',
+            'whiteSpace': 'pre-wrap'
+        }, className='admin-log-display'),
+
         html.Div(id='admin-log-content-display', style={
             'borderRadius': '4px',
             'padding': '15px',
@@ -199,7 +175,8 @@ def check_admin_and_load_logs(auth_data):
 # Callback: Update log content
 @callback(
     [Output('admin-log-content-display', 'children'),
-     Output('admin-log-lines-dropdown', 'value')],
+     Output('admin-log-lines-dropdown', 'value'),
+     Output('admin-log-stream-offset', 'data')],
     [Input('refresh-logs-btn', 'n_clicks'),
      Input('full-logs-btn', 'n_clicks'),
      Input('log-refresh-interval', 'n_intervals')],
@@ -211,10 +188,10 @@ def update_log_content(refresh_clicks, full_clicks, interval_clicks, selected_li
     """Update log content based on user actions"""
     # Check admin access first
     if not auth_data or not auth_data.get('authenticated'):
-        return 'Nicht authentifiziert', no_update
+        return 'Nicht authentifiziert', no_update, no_update
 
     if not is_admin_user(auth_data.get('email', '')):
-        return 'Keine Admin-Berechtigung', no_update
+        return 'Keine Admin-Berechtigung', no_update, no_update
 
     ctx = dash.callback_context
 
@@ -232,30 +209,74 @@ def update_log_content(refresh_clicks, full_clicks, interval_clicks, selected_li
             lines_to_show = selected_lines or 100
             dropdown_value = selected_lines
 
+    stream_offset = None
     try:
-        # Show application logs from within container
-        # For now, show a simple log placeholder - real logs would need external API
-        log_content = f'''Container-Logs (letzte {lines_to_show} Zeilen):
-
-=== TI-Monitoring Web Container ===
-Angeforderte Zeilen: {lines_to_show}
-Zeitstempel: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-
-Hinweis: Für vollständige Container-Logs verwenden Sie:
-docker compose -f docker-compose-dev.yml logs --tail {lines_to_show} ti-monitoring-web
-
-=== Aktuelle Session ===
-Admin-Zugriff: Aktiv
-Benutzer-Sessions: Werden geladen...
-Letzte Aktivität: {datetime.now().strftime("%H:%M:%S")}
-
-=== System-Status ===
-Web-Container: Läuft
-Cron-Container: Läuft
-Datenbank: Verbunden
-'''
+        # Reverse tail of data/cron.log; interval refreshes only read appended bytes
+        tail = get_log_tail(lines_to_show)
+        if not tail['exists']:
+            log_content = 'Log-Datei nicht gefunden: data/cron.log'
+        else:
+            modified = datetime.fromtimestamp(tail['mtime'], tz=pytz.timezone('Europe/Berlin'))
+            header = (
+                f"data/cron.log – {tail['size'] / 1024:,.1f} KB, "
+                f"letzte Änderung {modified.strftime('%d.%m.%Y %H:%M:%S')} "
+                f"(neueste zuerst, {len(tail['lines'])} Zeilen angezeigt)\n\n"
+            )
+            log_content = header + '\n'.join(reversed(tail['lines']))
+            # Live-Stream setzt genau hinter der letzten angezeigten vollständigen Zeile an
+            stream_offset = f"{tail['inode']}:{tail['line_offset']}"
 
     except Exception as e:
-        log_content = f'Fehler beim Generieren der Log-Anzeige: {str(e)}'
-
-    return log_content, dropdown_value
+        log_content = f'Fehler beim Lesen der Log-Datei: {str(e)}'
+
+    return log_content, dropdown_value, stream_offset
+
+# Clientside: EventSource auf /api/admin/logs/stream; ein neuer Offset (Aktualisieren)
+# ersetzt die laufende Verbindung, der Browser setzt nach Abbruch per Last-Event-ID fort.
+clientside_callback(
+    """
+    function(token, offset) {
+        if (window.__tiLogStream) {
+            window.__tiLogStream.close();
+            window.__tiLogStream = null;
+        }
+        const live = document.getElementById('admin-log-live');
+        if (live) { live.textContent = ''; }
+        if (!token || !offset || typeof EventSource === 'undefined') {
+            return 'Live-Aktualisierung nicht verfügbar';
+        }
+        const maxLines = 1000;
+        const url = '/api/admin/logs/stream?token=' + encodeURIComponent(token) +
+                    '&offset=' + encodeURIComponent(offset);
+        const es = new EventSource(url);
+        window.__tiLogStream = es;
+        function setStatus(text) {
+            const el = document.getElementById('admin-log-stream-status');
+            if (el) { el.textContent = text; }
+        }
+        function target() {
+            const el = document.getElementById('admin-log-live');
+            if (!el) { es.close(); window.__tiLogStream = null; }
+            return el;
+        }
+        function prepend(lines, reset) {
+            const el = target();
+            if (!el) { return; }
+            const incoming = lines.slice().reverse().join('\n');
+            let text = reset ? incoming : (incoming + (el.textContent ? '\n' + el.textContent : ''));
+            const parts = text.split('\n');
+            if (parts.length > maxLines) { text = parts.slice(0, maxLines).join('\n'); }
+            el.textContent = text;
+        }
+        es.addEventListener('lines', function(e) { prepend(JSON.parse(e.data), false); });
+        es.addEventListener('reset', function(e) { prepend(JSON.parse(e.data), true); });
+        es.addEventListener('rotate', function() { prepend(['--- Log-Datei rotiert ---'], false); });
+        es.onopen = function() { setStatus('● Live'); };
+        es.onerror = function() { if (target()) { setStatus('○ Verbindung unterbrochen – neuer Versuch …'); } };
+        return 'Verbinde …';
+    }
+    """,
+    Output('admin-log-stream-status', 'children'),
+    [Input('admin-log-stream-token', 'data'),
+     Input('admin-log-stream-offset', 'data')]
+)
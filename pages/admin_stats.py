@@ -430,5 +430,5 @@ def load_admin_visitor_stats(refresh_clicks, auth_data):
     except Exception as e:
         return html.Div([
             html.P(f'Fehler beim Laden der Besucher-Statistiken: {str(e)}', style={'color': '#e74c3c'}),
-            html.P('Stelle sicher, dass die page_views Tabelle existiert.', style={'fontSize': '12px'})
+            html.P('Stelle sicher, dass die Besucher-Rollups (page_view_rollups_daily) existieren.', style={'fontSize': '12px'})
         ])
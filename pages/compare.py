@@ -0,0 +1,203 @@
+import dash
+from dash import html, dcc, Input, Output, State, callback
+import plotly.graph_objects as go
+from mylibrary import *
+import time
+import json
+import numpy as np
+
+dash.register_page(__name__, path='/compare', title='Vergleich')
+
+# Dropdown options (ci, label) - from the home artifact if fresh, otherwise from TimescaleDB
+_ci_options_cache = None
+_ci_options_cache_key = None
+_ci_options_cache_timestamp = 0
+_ci_options_cache_ttl = 900
+
+HOURS_OPTIONS = [
+    {'label': '12 Stunden', 'value': 12},
+    {'label': '24 Stunden (1 Tag)', 'value': 24},
+    {'label': '48 Stunden (2 Tage)', 'value': 48},
+    {'label': '1 Woche', 'value': 168},
+    {'label': '1 Monat', 'value': 720},
+    {'label': '3 Monate', 'value': 2160}
+]
+
+def parse_ci_list(args):
+    """CIs from query args: ?ci=a,b,c and/or repeated ?ci=a&ci=b (order kept, duplicates dropped)."""
+    values = args.getlist('ci') if hasattr(args, 'getlist') else list(args.get('ci') or [])
+    cis = []
+    for value in values:
+        cis.extend(part.strip() for part in str(value).split(','))
+    return list(dict.fromkeys(c for c in cis if c))[:COMPARE_MAX_CIS]
+
+def load_ci_options():
+    """Dropdown options for all CIs, cached per home artifact generation."""
+    global _ci_options_cache, _ci_options_cache_key, _ci_options_cache_timestamp
+
+    artifact = load_home_artifact()
+    key = ('artifact', artifact[0]) if artifact is not None else ('db', get_cache_generation('ci_metadata'))
+    if (_ci_options_cache is not None and key == _ci_options_cache_key and
+        time.time() - _ci_options_cache_timestamp < cache_ttl(_ci_options_cache_ttl, 300)):
+        return _ci_options_cache
+
+    if artifact is not None and artifact[1].get('cis'):
+        records = list(artifact[1]['cis'])
+    else:
+        cis = get_data_of_all_cis_from_timescaledb()
+        records = cis.to_dict('records') if cis is not None and not cis.empty else []
+
+    options = []
+    for rec in records:
+        ci = str(rec.get('ci') or '')
+        if not ci:
+            continue
+        name = rec.get('name') or ''
+        organization = rec.get('organization') or ''
+        label = f"{ci} – {name}" if name else ci
+        if organization:
+            label += f" ({organization})"
+        options.append({'label': label, 'value': ci})
+    options.sort(key=lambda opt: opt['value'])
+
+    _ci_options_cache = options
+    _ci_options_cache_key = key
+    _ci_options_cache_timestamp = time.time()
+    return options
+
+def build_comparison_figure(series, labels=None):
+    """Stacked timelines: one row per CI, one cell per bucket (green up, red downtime, empty no data)."""
+    labels = labels or {}
+    cis = series['cis']
+    y = [labels.get(ci, ci) for ci in cis]
+    fig = go.Figure(go.Heatmap(
+        z=series['status'],
+        customdata=np.round(series['up_fraction'] * 100.0, 2),
+        x=series['times'],
+        y=y,
+        zmin=0,
+        zmax=1,
+        colorscale=[[0.0, '#ef4444'], [0.5, '#ef4444'], [0.5, '#10b981'], [1.0, '#10b981']],
+        showscale=False,
+        xgap=0,
+        ygap=3,
+        hoverongaps=False,
+        hovertemplate='%{y}<br>%{x}<br>Verfügbarkeit: %{customdata} %<extra></extra>'
+    ))
+    fig.update_layout(
+        height=120 + 36 * max(1, len(cis)),
+        margin=dict(l=10, r=10, t=20, b=40),
+        plot_bgcolor='#f8f9fa',
+        yaxis=dict(autorange='reversed', automargin=True),
+        xaxis=dict(title='Zeit'),
+    )
+    return fig
+
+def build_comparison_summary(series, labels=None):
+    """Availability per CI (time-weighted from the samples, not from the bucket colours)."""
+    labels = labels or {}
+    if not len(series['cis']):
+        return html.P('Keine Daten für die ausgewählten Komponenten.', className='help-text')
+    items = []
+    for ci, percent in zip(series['cis'], series['availability']):
+        has_data = not np.isnan(percent)
+        text = f"{percent:.2f}%" if has_data else 'keine Daten'
+        color = '#10b981' if has_data and percent >= 99 else '#ef4444'
+        items.append(html.Li([
+            html.A(labels.get(ci, ci), href=f"/plot?ci={ci}"),
+            ': ',
+            html.Span(text, style={'color': color})
+        ]))
+    return html.Ul(items)
+
+def serve_layout(**kwargs):
+    """Serve the comparison page layout"""
+    from flask import request
+    cis = parse_ci_list(request.args)
+    base = request.url_root.rstrip('/')
+    canonical = f"{base}/compare?ci={','.join(cis)}" if cis else f"{base}/compare"
+    jsonld = {
+        "@context": "https://schema.org",
+        "@type": "WebPage",
+        "url": canonical,
+        "name": "TI-Stats – Vergleich der Verfügbarkeit",
+        "inLanguage": "de",
+        "isPartOf": {"@type": "WebSite", "url": base, "name": "TI-Stats"}
+    }
+
+    try:
+        hours = int(request.args.get('hours') or 0)
+    except ValueError:
+        hours = 0
+    if hours <= 0:
+        hours = load_core_config().get('default_hours', 48)
+
+    return html.Div([
+        html.Link(rel='canonical', href=canonical),
+        html.Meta(name='og:url', content=canonical),
+        html.Script(type='application/ld+json', children=[json.dumps(jsonld)]),
+        html.Div(className='main-content', children=[
+            html.Div(className='page-header', children=[
+                html.H1('Verfügbarkeit im Vergleich'),
+                html.P(f"Bis zu {COMPARE_MAX_CIS} Komponenten als gestapelte Zeitleisten auf einem gemeinsamen Zeitraster."),
+                html.A("Zurück", href="/", className="btn btn-secondary")
+            ]),
+            html.Div(className='time-selection', children=[
+                html.Div(className='time-controls', children=[
+                    html.Label('Komponenten:'),
+                    dcc.Dropdown(
+                        id='compare-cis',
+                        options=[{'label': ci, 'value': ci} for ci in cis],
+                        value=cis,
+                        multi=True,
+                        placeholder='Komponenten auswählen …'
+                    ),
+                    html.Label('Darstellungszeitraum:'),
+                    dcc.Dropdown(
+                        id='compare-hours',
+                        options=HOURS_OPTIONS,
+                        value=hours,
+                        clearable=False,
+                        className='hours-dropdown'
+                    )
+                ])
+            ]),
+            html.Div(className='plot-container', children=[
+                dcc.Graph(id='compare-plot', config={'displayModeBar': True, 'displaylogo': False}),
+                html.Div(id='compare-summary', className='help-text')
+            ])
+        ]),
+        dcc.Location(id='compare-url', refresh=False)
+    ])
+
+layout = serve_layout
+
+@callback(
+    Output('compare-cis', 'options'),
+    Input('compare-url', 'pathname'),
+    State('compare-cis', 'value')
+)
+def update_ci_options(pathname, selected):
+    options = load_ci_options()
+    known = {opt['value'] for opt in options}
+    # Keep CIs from the URL selectable even if they are missing from the list
+    missing = [{'label': ci, 'value': ci} for ci in (selected or []) if ci not in known]
+    return missing + options if missing else options
+
+@callback(
+    [Output('compare-plot', 'figure'),
+     Output('compare-summary', 'children'),
+     Output('compare-url', 'search')],
+    [Input('compare-cis', 'value'),
+     Input('compare-hours', 'value')]
+)
+def update_comparison(cis, hours):
+    cis = list(cis or [])[:COMPARE_MAX_CIS]
+    hours = int(hours or 48)
+    search = f"?ci={','.join(cis)}&hours={hours}" if cis else ''
+    if not cis:
+        return go.Figure(), html.P('Bitte mindestens eine Komponente auswählen.', className='help-text'), search
+
+    series = get_availability_matrix(cis, hours)
+    labels = {opt['value']: opt['label'] for opt in load_ci_options() if opt['value'] in cis}
+    return build_comparison_figure(series, labels), build_comparison_summary(series, labels), search
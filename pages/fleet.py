@@ -0,0 +1,161 @@
+import dash
+from dash import html, dcc, Input, Output, callback
+import plotly.graph_objects as go
+from mylibrary import *
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+dash.register_page(__name__, path='/fleet', title='Flottenübersicht')
+
+# Built fleet matrices: (days, group_by) -> (timestamp, fleet dict)
+_fleet_cache = {}
+# One lock per key: a slow 30-day build must not block the 7-day view
+_fleet_build_locks = {}
+_fleet_build_locks_guard = threading.Lock()
+_fleet_cache_ttl = 300  # rollups are refreshed by cron every few minutes
+
+GROUP_LABELS = {'product': 'Produkt', 'organization': 'Organisation'}
+# Maximum number of group names shown as y-axis ticks
+MAX_GROUP_TICKS = 80
+
+def load_fleet_matrix(days, group_by):
+    """get_fleet_availability_matrix() with a short per-process cache.
+
+    Concurrent requests for the same key wait for one build instead of each
+    starting their own query (gunicorn gthread: several threads per worker).
+    """
+    key = (int(days), group_by)
+    with _fleet_build_locks_guard:
+        lock = _fleet_build_locks.setdefault(key, threading.Lock())
+    with lock:
+        cached = _fleet_cache.get(key)
+        if cached is not None and time.time() - cached[0] < _fleet_cache_ttl:
+            return cached[1]
+        fleet = get_fleet_availability_matrix(days=days, group_by=group_by)
+        if len(fleet['cis']):  # DB errors are not cached
+            _fleet_cache[key] = (time.time(), fleet)
+        return fleet
+
+def group_boundaries(groups):
+    """Start row and name of each contiguous group."""
+    groups = np.asarray(groups, dtype=object)
+    if groups.size == 0:
+        return np.array([], dtype=np.int64), []
+    starts = np.flatnonzero(np.concatenate(([True], groups[1:] != groups[:-1])))
+    return starts, [g or 'Unbekannt' for g in groups[starts]]
+
+def build_fleet_figure(fleet):
+    """One heatmap for the whole fleet; the uint8 matrix is sent as typed array."""
+    matrix = fleet['matrix']
+    rows = len(fleet['cis'])
+    labels = [f"{ci} – {name}" if name else ci for ci, name in zip(fleet['cis'], fleet['names'])]
+    fig = go.Figure(go.Heatmap(
+        z=matrix,
+        x0=fleet['start'].tz_convert('Europe/Berlin').isoformat(),
+        dx=fleet['bucket_minutes'] * 60 * 1000,
+        y=labels,
+        zmin=0,
+        zmax=255,
+        # 0 = keine Ausfälle, 1..100 = Ausfallanteil in %, 255 = keine Daten
+        colorscale=[
+            [0.0, '#10b981'],
+            [0.5 / 255.0, '#10b981'],
+            [1.0 / 255.0, '#fbbf24'],
+            [100.0 / 255.0, '#ef4444'],
+            [101.0 / 255.0, '#ef4444'],
+            [101.0 / 255.0, '#e5e7eb'],
+            [1.0, '#e5e7eb']
+        ],
+        showscale=False,
+        hovertemplate='%{y}<br>%{x}<br>Ausfallanteil: %{z} % (255 = keine Daten)<extra></extra>'
+    ))
+
+    starts, names = group_boundaries(fleet['groups'])
+    yaxis = dict(autorange='reversed', automargin=True, showticklabels=rows <= MAX_GROUP_TICKS)
+    if rows > MAX_GROUP_TICKS and len(starts) <= MAX_GROUP_TICKS:
+        yaxis.update(showticklabels=True, tickmode='array',
+                     tickvals=[labels[i] for i in starts], ticktext=names)
+    fig.update_layout(
+        height=200 + min(max(rows, 10) * 4, 3000),
+        margin=dict(l=10, r=10, t=20, b=40),
+        xaxis=dict(type='date', title='Zeit'),
+        yaxis=yaxis,
+    )
+    return fig
+
+def build_fleet_summary(fleet, group_by, top=10):
+    """Key figures and the groups with the highest downtime share."""
+    matrix = fleet['matrix']
+    if matrix.size == 0:
+        return html.P('Keine Daten vorhanden.', className='help-text')
+    has_data = matrix != FLEET_MATRIX_NO_DATA
+    downtime = np.where(has_data, matrix, 0).astype(np.int64)
+    affected = int(np.count_nonzero((downtime > 0).any(axis=1)))
+
+    starts, names = group_boundaries(fleet['groups'])
+    down_sum = np.add.reduceat(downtime.sum(axis=1), starts)
+    data_sum = np.add.reduceat(has_data.sum(axis=1), starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        share = np.where(data_sum > 0, down_sum / data_sum, 0.0)
+    ranking = pd.DataFrame({'group': names, 'share': share}).nlargest(top, 'share')
+    ranking = ranking[ranking['share'] > 0]
+
+    return html.Div([
+        html.P(f"{len(fleet['cis'])} Komponenten, {matrix.shape[1]} Zeitfenster à {fleet['bucket_minutes']} Minuten, "
+               f"{affected} Komponenten mit Ausfällen."),
+        html.H4(f"{GROUP_LABELS.get(group_by, group_by)} mit dem höchsten Ausfallanteil") if not ranking.empty else None,
+        html.Ul([html.Li(f"{row.group}: {row.share:.2f} %") for row in ranking.itertuples()]) if not ranking.empty else None
+    ])
+
+def serve_layout(**kwargs):
+    """Serve the fleet overview layout"""
+    return html.Div([
+        html.Div(className='main-content', children=[
+            html.Div(className='page-header', children=[
+                html.H1('Flottenübersicht'),
+                html.P('Ausfallanteil aller Komponenten je Zeitfenster: grün ohne Ausfall, gelb bis rot mit steigendem Ausfallanteil, grau ohne Daten.'),
+                html.A("Zurück", href="/", className="btn btn-secondary")
+            ]),
+            html.Div(className='time-selection', children=[
+                html.Div(className='time-controls', children=[
+                    html.Label('Zeitraum:'),
+                    dcc.Dropdown(
+                        id='fleet-days',
+                        options=[
+                            {'label': '7 Tage', 'value': 7},
+                            {'label': '14 Tage', 'value': 14},
+                            {'label': '30 Tage', 'value': 30}
+                        ],
+                        value=FLEET_MATRIX_DAYS,
+                        clearable=False,
+                        className='hours-dropdown'
+                    ),
+                    html.Label('Sortierung:'),
+                    dcc.RadioItems(
+                        id='fleet-group-by',
+                        options=[{'label': label, 'value': value} for value, label in GROUP_LABELS.items()],
+                        value='product',
+                        labelStyle={'display': 'inline-block', 'marginRight': '12px'}
+                    )
+                ])
+            ]),
+            html.Div(className='plot-container', children=[
+                dcc.Loading(dcc.Graph(id='fleet-plot', config={'displayModeBar': True, 'displaylogo': False})),
+                html.Div(id='fleet-summary', className='help-text')
+            ])
+        ])
+    ])
+
+layout = serve_layout
+
+@callback(
+    [Output('fleet-plot', 'figure'),
+     Output('fleet-summary', 'children')],
+    [Input('fleet-days', 'value'),
+     Input('fleet-group-by', 'value')]
+)
+def update_fleet(days, group_by):
+    fleet = load_fleet_matrix(days or FLEET_MATRIX_DAYS, group_by or 'product')
+    return build_fleet_figure(fleet), build_fleet_summary(fleet, group_by)
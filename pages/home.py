@@ -3,57 +3,31 @@ from dash import html, dcc, callback, Input, Output, State, clientside_callback,
 import plotly.express as px
 import plotly.graph_objects as go
 from mylibrary import *
-import yaml
 import os
 import functools
+import threading
 import time
-import gc
+import hashlib
 import pandas as pd
 import json
 
-# Configuration cache for home page with size limit
-_home_config_cache = {}
-_home_config_cache_timestamp = 0
-_home_config_cache_ttl = 300  # 5 seconds cache TTL
-_home_config_cache_max_size = 10  # Limit cache size
 
 # Lightweight layout cache to avoid recomputing heavy DOM trees frequently
 _home_layout_cache = None
 _home_layout_cache_ts = 0
-_home_layout_cache_ttl = 60  # seconds
+_home_layout_cache_key = None
+_home_layout_cache_ttl = 900  # seconds; Invalidierung über den Cache-Bus
+_home_layout_cache_fallback_ttl = 60  # seconds, solange der Cache-Bus getrennt ist
+_HOME_CACHE_TOPICS = ('availability', 'ci_metadata', 'statistics')
 
 # Limit how many items we render per product group to keep DOM small
 _max_items_per_group = 50
 
-def load_config():
-    """Load configuration from YAML file with caching"""
-    global _home_config_cache, _home_config_cache_timestamp
-
-    current_time = time.time()
-    if (not _home_config_cache or
-        current_time - _home_config_cache_timestamp > _home_config_cache_ttl):
-
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                _home_config_cache = yaml.safe_load(f) or {}
-            _home_config_cache_timestamp = current_time
-
-            # Limit cache size
-            if len(_home_config_cache) > _home_config_cache_max_size:
-                # Keep only the most recent entries
-                keys = list(_home_config_cache.keys())[:_home_config_cache_max_size]
-                _home_config_cache = {k: _home_config_cache[k] for k in keys}
-        except (FileNotFoundError, Exception):
-            _home_config_cache = {}
-            _home_config_cache_timestamp = current_time
-
-    return _home_config_cache
-
-def load_core_config():
-    """Load core configuration from cached config"""
-    config = load_config()
-    return config.get('core', {})
+# Accordion fragments per product: product -> (state hash, element). Only products
+# whose CI states changed since the last build are rendered again.
+_product_fragment_cache = {}
+_product_fragment_lock = threading.Lock()  # gunicorn gthread: mehrere Threads je Worker
+_PRODUCT_STATE_COLUMNS = ('ci', 'name', 'organization', 'current_availability', 'time')
 
 dash.register_page(__name__, path='/')
 
@@ -196,12 +170,68 @@ def create_accordion_element(group_name, group_data):
     ])
 
 
+# DataFrames built from the cron home artifact: name -> (generation, DataFrame)
+_home_artifact_frames = {}
+_home_artifact_frames_lock = threading.Lock()
+
+def _home_artifact_frame(name):
+    """DataFrame of one artifact table ('cis', 'ci_table'), or None if no fresh artifact exists.
+
+    Built once per artifact generation and shared; callers must not modify it in place.
+    """
+    artifact = load_home_artifact()
+    if artifact is None:
+        return None
+    generation, payload = artifact
+    with _home_artifact_frames_lock:
+        cached = _home_artifact_frames.get(name)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        records = payload.get(name)
+        if not records:
+            return None
+        df = pd.DataFrame(list(records))
+        if 'time' in df.columns:
+            df['time'] = pd.to_datetime(df['time'], utc=True, errors='coerce')
+        _home_artifact_frames[name] = (generation, df)
+        return df
+
+def product_state_hashes(cis):
+    """Hash of the CI states per product (one vectorized row hash for all CIs).
+
+    Returns {product: (state hash, row positions)}.
+    """
+    columns = [c for c in _PRODUCT_STATE_COLUMNS if c in cis.columns]
+    row_hashes = pd.util.hash_pandas_object(cis[columns], index=False).to_numpy()
+    return {
+        product: (hashlib.blake2b(row_hashes[positions].tobytes(), digest_size=16).hexdigest(), positions)
+        for product, positions in cis.groupby('product').indices.items()
+    }
+
+def build_product_accordions(cis):
+    """Accordion elements for all products; unchanged products reuse their cached fragment."""
+    states = product_state_hashes(cis)
+    elements = []
+    with _product_fragment_lock:
+        for product, (state, positions) in states.items():
+            cached = _product_fragment_cache.get(product)
+            if cached is None or cached[0] != state:
+                cached = (state, create_accordion_element(product, cis.iloc[positions]))
+                _product_fragment_cache[product] = cached
+            elements.append(cached[1])
+        # Products that disappeared
+        for product in [name for name in _product_fragment_cache if name not in states]:
+            del _product_fragment_cache[product]
+    return elements
 
 def serve_layout():
     # Return cached layout if fresh
-    global _home_layout_cache, _home_layout_cache_ts
+    global _home_layout_cache, _home_layout_cache_ts, _home_layout_cache_key
     now_ts = time.time()
-    if _home_layout_cache is not None and (now_ts - _home_layout_cache_ts) < _home_layout_cache_ttl:
+    artifact = load_home_artifact()
+    cache_key = (get_cache_key(*_HOME_CACHE_TOPICS), get_config(), artifact[0] if artifact else None)
+    if (_home_layout_cache is not None and cache_key == _home_layout_cache_key and
+            (now_ts - _home_layout_cache_ts) < cache_ttl(_home_layout_cache_ttl, _home_layout_cache_fallback_ttl)):
         return _home_layout_cache
     # Load core configurations (now cached)
     core_config = load_core_config()
@@ -210,24 +240,28 @@ def serve_layout():
     config_file_name = None
     config_url = core_config.get('url')
 
-    # Load incidents data from statistics.json
-    incidents_data = []
-    try:
-        statistics_file_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'statistics.json')
-        if os.path.exists(statistics_file_path):
-            with open(statistics_file_path, 'r', encoding='utf-8') as f:
-                stats = json.load(f)
-                incidents_data = stats.get('recent_incidents', [])
-    except Exception as e:
-        print(f"Error loading incidents data: {e}")
+    cis = _home_artifact_frame('cis')
+    if cis is not None:
+        # Prerendered by cron after the last ingest - no DB queries
+        incidents_data = list(artifact[1].get('recent_incidents') or [])
+    else:
+        # Fallback: artifact missing or stale -> live queries
+        # Load incidents data from the shared statistics snapshot (parsed once per cron update)
         incidents_data = []
-
-    # Try to get data from TimescaleDB
-    try:
-        cis = get_data_of_all_cis_from_timescaledb()
-    except Exception as e:
-        print(f"Error reading data from TimescaleDB: {e}")
-        cis = pd.DataFrame()  # Empty DataFrame
+        try:
+            snapshot = load_statistics_snapshot()
+            if snapshot is not None:
+                incidents_data = thaw(snapshot.get('recent_incidents', ()))
+        except Exception as e:
+            print(f"Error loading incidents data: {e}")
+            incidents_data = []
+
+        # Try to get data from TimescaleDB
+        try:
+            cis = get_data_of_all_cis_from_timescaledb()
+        except Exception as e:
+            print(f"Error reading data from TimescaleDB: {e}")
+            cis = pd.DataFrame()  # Empty DataFrame
 
     # Check if DataFrame is empty
     if cis.empty:
@@ -260,9 +294,9 @@ def serve_layout():
         ])
         return layout
 
-    # Optimize DataFrame operations
+    # Accordion elements per product, rebuilt only for changed products
     try:
-        grouped = cis.groupby('product')
+        accordion_elements = build_product_accordions(cis)
     except Exception as e:
         layout = html.Div([
             html.P('Fehler beim Gruppieren der Daten nach Produkt.'),
@@ -270,23 +304,7 @@ def serve_layout():
             html.P(f'Verfügbare Spalten: {", ".join(cis.columns.tolist()) if not cis.empty else "Keine"}')
         ])
         return layout
-
-
-
-    # Create accordion elements efficiently
-    accordion_elements = []
-    for group_name, group_data in grouped:
-        accordion_elements.append(create_accordion_element(group_name, group_data))
-
-    # Force garbage collection after processing large DataFrames
-    gc.collect()
-
-    # Clean up large DataFrames immediately after use
-    if 'cis' in locals():
-        del cis
-    if 'grouped' in locals():
-        del grouped
-    gc.collect()
+    del cis
 
     # Create incidents table (show first 5 by default)
     incidents_table = create_incidents_table(incidents_data, show_all=False)
@@ -400,6 +418,7 @@ def serve_layout():
     # Cache and return
     _home_layout_cache = layout
     _home_layout_cache_ts = time.time()
+    _home_layout_cache_key = cache_key
     return layout
 
 layout = serve_layout
@@ -426,8 +445,10 @@ def _format_minutes_to_human(minutes: float) -> str:
 )
 def render_ci_all_table(_, filter_text, sort_state):
     try:
-        # Daten inkl. Downtimes aus DB laden
-        df = get_all_cis_with_downtimes()
+        # Daten inkl. Downtimes: aus dem Cron-Artefakt, sonst live aus der DB
+        df = _home_artifact_frame('ci_table')
+        if df is None:
+            df = get_all_cis_with_downtimes()
         if df is None or df.empty:
             return html.Div('Keine CIs verfügbar.')
 
@@ -565,6 +586,13 @@ def toggle_ci_sort(_clicks, state):
 )
 def render_incident_heatmap(_tick, cache_data):
     try:
+        # Vorgerenderte Figur aus dem Cron-Artefakt (keine DB-Abfrage)
+        artifact = load_home_artifact()
+        if artifact is not None:
+            heatmap = artifact[1].get('heatmap') or {}
+            if heatmap.get('figure'):
+                return {'ts': time.time(), 'data': heatmap.get('data') or []}, heatmap['figure']
+
         import pandas as _pd
         # Cache-Struktur: { 'ts': epoch, 'data': [{weekday,hour,count,ci_list}, ...] }
         df = None
@@ -599,70 +627,9 @@ def render_incident_heatmap(_tick, cache_data):
                 pass
         if refresh_df:
             df = get_incident_heatmap_data(30)
-        # Achsen-Labels fest definieren
-        hours = list(range(0,24))
-        x_labels = [f"{h:02d}:00" for h in hours]
-        wdays = ['Mo','Di','Mi','Do','Fr','Sa','So']
-
-        # Zellen initialisieren (immer), damit Achsen korrekt sind
-        z = [[0 for _ in hours] for _ in wdays]
-        text = [["" for _ in hours] for _ in wdays]
         if df is None:
             df = _pd.DataFrame(columns=['weekday','hour','count','ci_list'])
-
-        # Datentypen erzwingen und Labels bilden
-        weekday_labels = {1:'Mo',2:'Di',3:'Mi',4:'Do',5:'Fr',6:'Sa',7:'So'}
-        try:
-            df['weekday'] = _pd.to_numeric(df.get('weekday'), errors='coerce').fillna(0).astype(int)
-            df['hour'] = _pd.to_numeric(df.get('hour'), errors='coerce').fillna(-1).astype(int)
-            df['count'] = _pd.to_numeric(df.get('count'), errors='coerce').fillna(0).astype(int)
-        except Exception:
-            pass
-        df['wlabel'] = df['weekday'].map(weekday_labels)
-
-        # Tooltip-Text: Anzahl + Beispiel-CIs
-        def tip(row):
-            cis = row.get('ci_list') or []
-            preview = ', '.join([str(c) for c in cis[:8]])
-            extra = '' if len(cis) <= 8 else f" …(+{len(cis)-8})"
-            return f"{row['wlabel']} {int(row['hour']):02d}:00\nIncidents: {int(row['count'])}\nCIs: {preview}{extra}"
-
-        if not df.empty:
-            try:
-                df['tooltip'] = df.apply(tip, axis=1)
-                # Pivot über Pandas (robust)
-                pv = df.pivot_table(index='wlabel', columns='hour', values='count', aggfunc='sum', fill_value=0)
-                pv = pv.reindex(index=wdays, columns=hours, fill_value=0)
-                z = pv.values.tolist()
-                tool = df.pivot_table(index='wlabel', columns='hour', values='tooltip', aggfunc='first')
-                tool = tool.reindex(index=wdays, columns=hours)
-                text = tool.fillna("").values.tolist()
-            except Exception:
-                pass
-
-        # Farbenbereich an reale Daten anpassen
-        # Maxwert aus Matrix berechnen (robuster)
-        max_count = max([max(row) if row else 0 for row in z]) if z else 0
-        fig = go.Figure(data=go.Heatmap(
-            z=z,
-            x=x_labels,  # 0-23
-            y=wdays,     # Mo-So
-            colorscale='YlOrRd',
-            hoverinfo='text',
-            text=text,
-            colorbar=dict(title='Incidents'),
-            zmin=0,
-            zmax=max_count if max_count > 0 else 1
-        ))
-        fig.update_layout(
-            height=360,
-            margin=dict(l=40,r=20,t=30,b=40),
-            xaxis=dict(title='Stunde', type='category', categoryorder='array', categoryarray=x_labels),
-            yaxis=dict(title='Wochentag', type='category', categoryorder='array', categoryarray=wdays),
-            # Make backgrounds transparent so CSS can provide proper light/dark contrast
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)'
-        )
+        fig = build_incident_heatmap_figure(df)
         # Neues Cache-Paket bauen
         try:
             import time as _time
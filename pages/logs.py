@@ -1,7 +1,6 @@
 import dash
 from dash import html, dcc, Input, Output, State, callback
 from mylibrary import *
-import yaml
 import os
 import time
 import json
@@ -9,41 +8,6 @@ import pandas as pd
 import pytz
 from datetime import datetime
 
-# Configuration cache for logs page
-_logs_config_cache = {}
-_logs_config_cache_timestamp = 0
-_logs_config_cache_ttl = 300  # 5 seconds cache TTL
-_logs_config_cache_max_size = 10  # Limit cache size
-
-def load_config():
-    """Load configuration from YAML file with caching"""
-    global _logs_config_cache, _logs_config_cache_timestamp
-
-    current_time = time.time()
-    if (not _logs_config_cache or
-        current_time - _logs_config_cache_timestamp > _logs_config_cache_ttl):
-
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                _logs_config_cache = yaml.safe_load(f) or {}
-            _logs_config_cache_timestamp = current_time
-
-            # Limit cache size
-            if len(_logs_config_cache) > _logs_config_cache_max_size:
-                # Keep only the most recent entries
-                keys = list(_logs_config_cache.keys())[:_logs_config_cache_max_size]
-                _logs_config_cache = {k: _logs_config_cache[k] for k in keys}
-        except (FileNotFoundError, Exception):
-            _logs_config_cache = {}
-            _logs_config_cache_timestamp = current_time
-
-    return _logs_config_cache
-
-def load_core_config():
-    """Load core configuration from cached config"""
-    config = load_config()
-    return config.get('core', {})
 
 def get_button_style(variant='primary'):
     base = {
@@ -65,43 +29,32 @@ def get_button_style(variant='primary'):
 
 def get_log_file_path():
     """Get the path to the cron log file"""
-    return os.path.join(os.path.dirname(__file__), '..', 'data', 'cron.log')
+    return CRON_LOG_FILE
 
 def get_log_file_info():
-    """Get information about the log file"""
-    log_file_path = get_log_file_path()
-
-    if not os.path.exists(log_file_path):
-        return {
-            'exists': False,
-            'size': 0,
-            'modified': None,
-            'lines': 0
-        }
-
+    """Get information about the log file (size and mtime from stat, no full read)"""
     try:
-        stat = os.stat(log_file_path)
-        size = stat.st_size
-
-        # Count lines
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            lines = sum(1 for _ in f)
+        tail = get_log_tail(1, get_log_file_path())
+        if not tail['exists']:
+            return {
+                'exists': False,
+                'size': 0,
+                'modified': None
+            }
 
         # Get modification time in Europe/Berlin timezone
-        modified_timestamp = datetime.fromtimestamp(stat.st_mtime, tz=pytz.timezone('Europe/Berlin'))
+        modified_timestamp = datetime.fromtimestamp(tail['mtime'], tz=pytz.timezone('Europe/Berlin'))
 
         return {
             'exists': True,
-            'size': size,
-            'modified': modified_timestamp,
-            'lines': lines
+            'size': tail['size'],
+            'modified': modified_timestamp
         }
     except Exception as e:
         return {
             'exists': False,
             'size': 0,
             'modified': None,
-            'lines': 0,
             'error': str(e)
         }
 
@@ -113,16 +66,13 @@ def read_log_tail(lines=100):
         return "Log-Datei nicht gefunden: data/cron.log"
 
     try:
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            all_lines = f.readlines()
-
-        # Get last N lines
-        tail_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+        # Seeks from the end; interval refreshes only read newly appended bytes
+        tail_lines = get_log_tail(lines, log_file_path)['lines']
 
         # Reverse the order so newest lines appear first
         tail_lines.reverse()
 
-        return ''.join(tail_lines)
+        return '\n'.join(tail_lines)
     except Exception as e:
         return f"Fehler beim Lesen der Log-Datei: {e}"
 
@@ -228,10 +178,6 @@ def create_log_info_display(log_info):
                 html.Strong('Größe: '),
                 html.Span(format_file_size(log_info['size']))
             ]),
-            html.Div(className='log-info-item', children=[
-                html.Strong('Zeilen: '),
-                html.Span(f"{log_info['lines']:,}")
-            ]),
             html.Div(className='log-info-item', children=[
                 html.Strong('Letzte Änderung: '),
                 html.Span(log_info['modified'].strftime('%d.%m.%Y %H:%M:%S %Z') if log_info['modified'] else 'Unbekannt')
@@ -2,9 +2,12 @@ import dash
 from dash import html, dcc, Input, Output, State, callback, no_update, callback_context, ALL, MATCH
 import json
 from mylibrary import *
-import yaml
+from auth_service import (
+    verify_otp_login,
+    OTP_OK, OTP_LOCKED, OTP_LOCKED_NOW, OTP_NOT_FOUND, OTP_RATE_LIMITED,
+)
+import flask
 import os
-import apprise
 import secrets
 from datetime import datetime
 
@@ -93,21 +96,6 @@ def get_error_style(visible=True):
     base_style['display'] = 'block' if visible else 'none'
     return base_style
 
-def load_config():
-    """Load configuration from YAML file"""
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        return config
-    except (FileNotFoundError, Exception):
-        return {}
-
-def load_core_config():
-    """Load core configuration from YAML file"""
-    config = load_config()
-    return config.get('core', {})
-
 def load_apprise_services():
     """Load Apprise services from JSON file"""
     services_file = os.path.join(os.path.dirname(__file__), '..', 'apprise_services.json')
@@ -571,16 +559,15 @@ def handle_otp_verification(n_clicks, email, otp_code):
         return [no_update, no_update, no_update, no_update]
 
     try:
-        user = get_user_by_email(email)
-        if not user:
+        status, user_id = verify_otp_login(email, otp_code, flask.request.remote_addr)
+        if status == OTP_RATE_LIMITED:
+            return [no_update, no_update, 'Zu viele Versuche. Bitte warte einen Moment.', no_update]
+        if status == OTP_NOT_FOUND:
             return [no_update, no_update, 'Benutzer nicht gefunden.', no_update]
-
-        user_id = user[0]
-
-        if is_account_locked(user_id):
+        if status in (OTP_LOCKED, OTP_LOCKED_NOW):
             return [no_update, no_update, 'Konto ist gesperrt.', no_update]
 
-        if validate_otp(user_id, otp_code):
+        if status == OTP_OK:
             # Success - set auth states; UI will switch to settings via bridge
             auth_state = {'authenticated': True, 'user_id': user_id, 'email': email}
             print(f"DEBUG: OTP verification successful, setting auth_state: {auth_state}")
@@ -1,9 +1,8 @@
 import dash
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, Input, Output, State, callback, clientside_callback
 import plotly.express as px
 import plotly.graph_objects as go
 from mylibrary import *
-import yaml
 import os
 import pandas as pd
 import numpy as np
@@ -13,23 +12,6 @@ import json
 
 dash.register_page(__name__, path='/plot')
 
-def load_config():
-    """Load configuration from YAML file"""
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-        return config
-    except FileNotFoundError:
-        return {}
-    except Exception:
-        return {}
-
-def load_core_config():
-    """Load core configuration from YAML file"""
-    config = load_config()
-    return config.get('core', {})
-
 def generate_synthetic_availability(hours: int = 24, timezone: str = 'Europe/Berlin'):
     """Generate synthetic availability data with clear outage segments for demo/testing.
 
@@ -69,28 +51,51 @@ def format_duration(hours):
         return f"{days:.1f} Tage"
 
 def load_ci_mttr_mtbf(ci):
-    """Load MTTR and MTBF values for a specific CI from statistics.json"""
+    """Load overall MTTR (minutes), MTBF (hours) and incident count of a CI from the statistics snapshot"""
     try:
-        import json
-        import os
-
-        stats_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'statistics.json')
-        if not os.path.exists(stats_file):
-            return 0, 0, 0
-
-        with open(stats_file, 'r', encoding='utf-8') as f:
-            stats = json.load(f)
-
-        if ci in stats:
-            mttr = stats[ci].get('mttr', 0)
-            mtbf = stats[ci].get('mtbf', 0)
-            incidents = stats[ci].get('incidents', 0)
-            return mttr, mtbf, incidents
-        else:
+        snapshot = load_statistics_snapshot()
+        metrics = snapshot.ci(ci) if snapshot is not None else None
+        if not metrics:
             return 0, 0, 0
+        mttr = float(metrics.get('mttr_minutes') or 0)
+        mtbf = float(metrics.get('mtbf_minutes') or 0) / 60
+        incidents = int(metrics.get('incidents') or 0)
+        return mttr, mtbf, incidents
     except Exception:
         return 0, 0, 0
 
+def encode_availability_segments(data, ranged=False):
+    """Encode the loaded series as compact runs for clientside zoom/pan.
+
+    Times are UTC epoch milliseconds; the browser converts the naive Europe/Berlin
+    strings Plotly reports in relayoutData. Run i covers [t0 + o[i], t0 + o[i+1]) seconds
+    with availability v[i] (0..1); the last run ends at t1. `step` is the row
+    spacing in seconds, i.e. the resolution of the loaded data.
+    """
+    if data is None or data.empty:
+        return None
+    data = data.sort_values('times')
+    times = pd.DatetimeIndex(pd.to_datetime(data['times']))
+    if times.tz is None:
+        times = times.tz_localize('Europe/Berlin')
+    t_ms = np.asarray(times.tz_convert('UTC').tz_localize(None), dtype='datetime64[ms]').astype(np.int64)
+    if 'down_fraction' in data.columns:
+        vals = np.round(1.0 - data['down_fraction'].to_numpy(dtype=float), 3)
+    else:
+        vals = data['values'].to_numpy(dtype=float)
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(vals) != 0) + 1))
+    step_ms = int(np.median(np.diff(t_ms))) if len(t_ms) > 1 else 300000
+    t0 = int(t_ms[0])
+    return {
+        't0': t0,
+        't1': int(t_ms[-1]) + step_ms,
+        'step': step_ms // 1000,
+        'o': ((t_ms[starts] - t0) // 1000).astype(int).tolist(),
+        'v': vals[starts].tolist(),
+        'ranged': bool(ranged)
+    }
+
 def calculate_comprehensive_statistics(ci_data, selected_hours, config_file_name, ci):
     """Calculate comprehensive statistics for the selected time period"""
     if ci_data.empty:
@@ -126,71 +131,73 @@ def calculate_comprehensive_statistics(ci_data, selected_hours, config_file_name
             }
         }
 
-    # Convert times to datetime if needed
-    if not pd.api.types.is_datetime64_any_dtype(ci_data['times']):
-        ci_data['times'] = pd.to_datetime(ci_data['times'])
-
-    # Ensure timezone-aware
-    if ci_data['times'].dt.tz is None:
-        ci_data['times'] = ci_data['times'].dt.tz_localize('Europe/Berlin')
-    else:
-        ci_data['times'] = ci_data['times'].dt.tz_convert('Europe/Berlin')
-
-    # Calculate cutoff time for selected period
+    # Work on NumPy arrays (UTC nanoseconds) instead of DataFrame copies
+    times = pd.DatetimeIndex(pd.to_datetime(ci_data['times']))
+    if times.tz is None:
+        times = times.tz_localize('Europe/Berlin')
+    t_ns = np.asarray(times.tz_convert('UTC').tz_localize(None), dtype='datetime64[ns]').astype(np.int64)
+    values = ci_data['values'].to_numpy(dtype=float)
+    # Pyramid rows: downtime share, sample and incident counts per bucket
+    rollup = {col: ci_data[col].to_numpy(dtype=float) if col in ci_data.columns else None
+              for col in ('down_fraction', 'samples', 'incidents')}
+    if t_ns.size > 1 and np.any(np.diff(t_ns) < 0):
+        order = np.argsort(t_ns, kind='stable')
+        t_ns, values = t_ns[order], values[order]
+        rollup = {col: arr[order] if arr is not None else None for col, arr in rollup.items()}
+
+    def fmt_ts(ns):
+        return pd.Timestamp(int(ns), tz='UTC').tz_convert('Europe/Berlin').strftime('%d.%m.%Y %H:%M:%S Uhr')
+
+    # Selected period = rows from cutoff onwards (binary search on sorted times)
     cutoff = pd.Timestamp.now(tz=pytz.timezone('Europe/Berlin')) - pd.Timedelta(hours=selected_hours)
-
-    # Filter data for selected period
-    selected_data = ci_data[ci_data['times'] >= cutoff].copy()
+    i0 = int(np.searchsorted(t_ns, cutoff.value, side='left'))
+    selected = summarize_availability_runs(
+        t_ns[i0:], values[i0:],
+        **{col: arr[i0:] if arr is not None else None for col, arr in rollup.items()}
+    )
 
     # Selected period statistics
     selected_duration_hours = selected_hours
-    selected_data_points = len(selected_data)
-    selected_availability = (selected_data['values'].sum() / selected_data_points * 100) if selected_data_points > 0 else 0.0
-    selected_start_time = selected_data['times'].min().strftime('%d.%m.%Y %H:%M:%S Uhr') if not selected_data.empty else 'N/A'
-    selected_end_time = selected_data['times'].max().strftime('%d.%m.%Y %H:%M:%S Uhr') if not selected_data.empty else 'N/A'
-
-    # Overall record statistics
-    overall_start_time = ci_data['times'].min().strftime('%d.%m.%Y %H:%M:%S Uhr')
-    overall_end_time = ci_data['times'].max().strftime('%d.%m.%Y %H:%M:%S Uhr')
-    overall_duration = (ci_data['times'].max() - ci_data['times'].min()).total_seconds() / 3600 / 24  # days
-    overall_data_points = len(ci_data)
-    data_completeness = (overall_data_points / (overall_duration * 24 * 12)) * 100  # Assuming 5-minute intervals
-
-    # Downtime statistics for selected period
-    downtime_data = selected_data[selected_data['values'] == 0]
-    uptime_data = selected_data[selected_data['values'] == 1]
-
-    downtime_points = len(downtime_data)
-    downtime_percent = (downtime_points / selected_data_points * 100) if selected_data_points > 0 else 0.0
-    downtime_duration_minutes = downtime_points * 5  # Assuming 5-minute intervals
-
-    uptime_points = len(uptime_data)
-    uptime_percent = (uptime_points / selected_data_points * 100) if selected_data_points > 0 else 0.0
-    uptime_duration_minutes = uptime_points * 5  # Assuming 5-minute intervals
-
-    # Calculate longest downtime and uptime periods
-    longest_downtime_points = 0
-    longest_uptime_points = 0
-
-    if not selected_data.empty:
-        # Group consecutive values
-        selected_data_sorted = selected_data.sort_values('times')
-        selected_data_sorted['group'] = (selected_data_sorted['values'] != selected_data_sorted['values'].shift()).cumsum()
-
-        for group_id, group in selected_data_sorted.groupby('group'):
-            if group['values'].iloc[0] == 0:  # Downtime group
-                longest_downtime_points = max(longest_downtime_points, len(group))
-            else:  # Uptime group
-                longest_uptime_points = max(longest_uptime_points, len(group))
-
-    longest_downtime_minutes = longest_downtime_points * 5
-    longest_uptime_minutes = longest_uptime_points * 5
-
-    # Load MTTR and MTBF from statistics file
-    mttr, mtbf, incidents = load_ci_mttr_mtbf(ci)
+    selected_data_points = selected['points']
+    total_s = selected['total_seconds']
+    selected_availability = (selected['up_seconds'] / total_s * 100) if total_s > 0 else 0.0
+    selected_start_time = fmt_ts(t_ns[i0]) if selected_data_points else 'N/A'
+    selected_end_time = fmt_ts(t_ns[-1]) if selected_data_points else 'N/A'
+
+    # Overall record statistics (completeness relative to the real sample spacing)
+    overall_start_time = fmt_ts(t_ns[0])
+    overall_end_time = fmt_ts(t_ns[-1])
+    overall_seconds = float(t_ns[-1] - t_ns[0]) / 1e9
+    overall_duration = overall_seconds / 3600 / 24  # days
+    overall_data_points = int(t_ns.size)
+    step_s = float(np.median(np.diff(t_ns))) / 1e9 if t_ns.size > 1 else 300.0
+    expected_points = overall_seconds / step_s + 1 if step_s > 0 else overall_data_points
+    data_completeness = (overall_data_points / expected_points) * 100 if expected_points > 0 else 0.0
+
+    # Downtime statistics for selected period (durations from real timestamps)
+    downtime_points = selected['down_points']
+    downtime_percent = (selected['down_seconds'] / total_s * 100) if total_s > 0 else 0.0
+    downtime_duration_minutes = selected['down_seconds'] / 60
+
+    uptime_points = selected['up_points']
+    uptime_percent = (selected['up_seconds'] / total_s * 100) if total_s > 0 else 0.0
+    uptime_duration_minutes = selected['up_seconds'] / 60
+
+    longest_downtime_points = selected['longest_down_points']
+    longest_uptime_points = selected['longest_up_points']
+    longest_downtime_minutes = selected['longest_down_seconds'] / 60
+    longest_uptime_minutes = selected['longest_up_seconds'] / 60
+
+    # MTTR/MTBF of the selected period
+    incidents = selected['down_runs']
+    mttr = selected['mttr_seconds'] / 60
+    mtbf = selected['mtbf_seconds'] / 3600
     mttr_display = f"{mttr:.1f} Min" if mttr > 0 else "N/A"
     mtbf_display = f"{mtbf:.1f} Std" if mtbf > 0 else "N/A"
 
+    # Whole record MTTR/MTBF from the precomputed per-CI statistics (hourly by cron)
+    total_mttr, total_mtbf, total_incidents = load_ci_mttr_mtbf(ci)
+
     return {
         'selected_period': {
             'duration_hours': selected_duration_hours,
@@ -204,7 +211,10 @@ def calculate_comprehensive_statistics(ci_data, selected_hours, config_file_name
             'end_time': overall_end_time,
             'total_duration_days': overall_duration,
             'total_data_points': overall_data_points,
-            'data_completeness_percent': data_completeness
+            'data_completeness_percent': data_completeness,
+            'incidents_total': total_incidents,
+            'mttr_total': f"{total_mttr:.1f} Min" if total_mttr > 0 else "N/A",
+            'mtbf_total': f"{total_mtbf:.1f} Std" if total_mtbf > 0 else "N/A"
         },
         'downtime_stats': {
             'downtime_points': downtime_points,
@@ -219,7 +229,9 @@ def calculate_comprehensive_statistics(ci_data, selected_hours, config_file_name
             'longest_uptime_minutes': longest_uptime_minutes,
             'incidents': incidents,
             'mttr': mttr_display,
-            'mtbf': mtbf_display
+            'mtbf': mtbf_display,
+            # Längste Läufe aus Rollup-Buckets: benachbarte Ausfälle verschmelzen
+            'run_resolution_minutes': selected['step_seconds'] / 60 if selected['bucket_resolution'] else 0
         }
     }
 
@@ -228,6 +240,8 @@ def create_comprehensive_statistics_display(stats, ci):
     selected_period = stats['selected_period']
     overall_record = stats['overall_record']
     downtime_stats = stats['downtime_stats']
+    resolution = downtime_stats.get('run_resolution_minutes') or 0
+    run_resolution_note = f" (Auflösung {format_duration(resolution / 60)})" if resolution else ''
 
     return html.Div([
         html.H3('Detaillierte Statistiken', style={'color': '#2c3e50', 'marginBottom': '20px'}),
@@ -274,7 +288,8 @@ def create_comprehensive_statistics_display(stats, ci):
                 ], style={'marginBottom': '8px'}),
                 html.Div([
                     html.Strong('Längster Ausfall: '),
-                    html.Span(f"{format_duration(downtime_stats['longest_downtime_minutes'] / 60)}", style={'color': '#ef4444'})
+                    html.Span(f"{format_duration(downtime_stats['longest_downtime_minutes'] / 60)}", style={'color': '#ef4444'}),
+                    html.Span(run_resolution_note, className='help-text') if run_resolution_note else None
                 ], style={'marginBottom': '8px'}),
                 html.Div([
                     html.Strong('Verfügbarkeitspunkte: '),
@@ -286,7 +301,8 @@ def create_comprehensive_statistics_display(stats, ci):
                 ], style={'marginBottom': '8px'}),
                 html.Div([
                     html.Strong('Längste Verfügbarkeit: '),
-                    html.Span(f"{format_duration(downtime_stats['longest_uptime_minutes'] / 60)}", style={'color': '#10b981'})
+                    html.Span(f"{format_duration(downtime_stats['longest_uptime_minutes'] / 60)}", style={'color': '#10b981'}),
+                    html.Span(run_resolution_note, className='help-text') if run_resolution_note else None
                 ], style={'marginBottom': '8px'})
             ], style={'paddingLeft': '20px'})
         ], style={'backgroundColor': '#f8f9fa', 'padding': '15px', 'borderRadius': '8px', 'marginBottom': '20px'}),
@@ -326,6 +342,14 @@ def create_comprehensive_statistics_display(stats, ci):
                     html.Strong('Datenvollständigkeit: '),
                     html.Span(f"{overall_record['data_completeness_percent']:.2f}%")
                 ], style={'marginBottom': '8px'}),
+                html.Div([
+                    html.Strong('Störungen gesamt: '),
+                    html.Span(f"{overall_record.get('incidents_total', 0)}")
+                ], style={'marginBottom': '8px'}),
+                html.Div([
+                    html.Strong('MTTR / MTBF gesamt: '),
+                    html.Span(f"{overall_record.get('mttr_total', 'N/A')} / {overall_record.get('mtbf_total', 'N/A')}")
+                ], style={'marginBottom': '8px'}),
                 html.Div([
                     html.Strong('Zeitraum: '),
                     html.Span(f"{overall_record['start_time']} - {overall_record['end_time']}")
@@ -389,7 +413,9 @@ def serve_layout(**kwargs):
             html.Div(className='page-header', children=[
                 html.H1(f"Verfügbarkeit der Komponente {ci}"),
                 html.P(id='ci-meta', children=f"{ci_name}, {ci_organization}, {ci_product}"),
-                html.A("Zurück", href="/", className="btn btn-secondary")
+                html.A("Zurück", href="/", className="btn btn-secondary"),
+                html.A("Vergleichen", href=f"/compare?ci={ci}" if ci else "/compare", className="btn btn-secondary",
+                       title='Mehrere Komponenten als gestapelte Zeitleisten vergleichen', style={'marginLeft': '8px'})
             ]),
 
             # Plot container
@@ -397,7 +423,8 @@ def serve_layout(**kwargs):
                 dcc.Graph(
                     id='availability-plot',
                     config={'displayModeBar': True, 'displaylogo': False}
-                )
+                ),
+                html.Div(id='plot-visible-availability', className='help-text')
             ]),
 
             # Time selection controls
@@ -462,6 +489,11 @@ def serve_layout(**kwargs):
         dcc.Store(id='ci-store', data=ci),
         dcc.Store(id='hours-store', data=default_hours),
 
+        # Loaded segments for clientside zoom/pan and range requests to the server
+        dcc.Store(id='plot-segments'),
+        dcc.Store(id='plot-range-request'),
+        dcc.Store(id='plot-client-zoom', data=bool(core_config.get('plot_client_zoom', True))),
+
         # Location component for URL updates
         dcc.Location(id='url', refresh=False)
     ])
@@ -475,17 +507,18 @@ layout = serve_layout
 @callback(
     [Output('availability-plot', 'figure'),
      Output('comprehensive-statistics', 'children'),
-     Output('ci-meta', 'children')],
+     Output('ci-meta', 'children'),
+     Output('plot-segments', 'data')],
     [Input('url', 'pathname'),
      Input('update-button', 'n_clicks'),
      Input('hours-input', 'value'),
      Input('trend-options', 'value'),
-     Input('availability-plot', 'relayoutData')],
+     Input('plot-range-request', 'data')],
     [dash.State('url', 'search'),
      dash.State('ci-store', 'data')],
     prevent_initial_call=False
 )
-def handle_plot_updates(pathname, n_clicks, hours, trend_options, relayout_data, url_search, ci):
+def handle_plot_updates(pathname, n_clicks, hours, trend_options, range_request, url_search, ci):
     """Handle both initial load and UI interactions for plot updates"""
     # Resolve CI: prefer store, then URL, then request args
     if not ci:
@@ -505,12 +538,12 @@ def handle_plot_updates(pathname, n_clicks, hours, trend_options, relayout_data,
     selected_hours = 48  # fallback
     selected_range = None  # (start_ts, end_ts) if user zoomed/panned
 
-    # Priority 1: react to explicit plot range (zoom/pan)
+    # Priority 1: explicit plot range (zoom/pan outside the loaded segments)
     try:
-        if relayout_data and isinstance(relayout_data, dict):
-            # Handle explicit x range from Plotly
-            x0 = relayout_data.get('xaxis.range[0]')
-            x1 = relayout_data.get('xaxis.range[1]')
+        if range_request and isinstance(range_request, dict):
+            # Range forwarded by the clientside zoom handler
+            x0 = range_request.get('x0')
+            x1 = range_request.get('x1')
             if x0 and x1:
                 start_ts = pd.to_datetime(x0)
                 end_ts = pd.to_datetime(x1)
@@ -574,33 +607,35 @@ def handle_plot_updates(pathname, n_clicks, hours, trend_options, relayout_data,
             demo_mode = False
 
         # If demo mode is requested, generate synthetic data regardless of DB
+        bucket_minutes = None
         if demo_mode:
             ci_data = generate_synthetic_availability(hours=selected_hours)
         else:
-            # Choose bucket size for large windows to reduce rows serverseitig
-            bucket_minutes = None
+            # Choose pyramid level so that the window is rendered with ~PLOT_TARGET_POINTS rows
             try:
                 if selected_range is not None:
-                    window_hours = max(1, int((selected_range[1] - selected_range[0]).total_seconds() // 3600))
+                    window_hours = max(1.0, (selected_range[1] - selected_range[0]).total_seconds() / 3600)
                 else:
-                    window_hours = int(selected_hours)
+                    window_hours = float(selected_hours)
             except Exception:
-                window_hours = 48
-
-            # Heuristic: > 168h (7d) -> 15min, > 720h (30d) -> 60min
-            if window_hours > 720:
-                bucket_minutes = 60
-            elif window_hours > 168:
-                bucket_minutes = 15
+                window_hours = 48.0
+            bucket_minutes = choose_rollup_level(window_hours)
 
             # Query only the needed window from DB to avoid full scans
             if selected_range is not None:
                 # Convert window to UTC for DB filter
                 start_ts_utc = selected_range[0].tz_convert('UTC').to_pydatetime()
                 end_ts_utc = selected_range[1].tz_convert('UTC').to_pydatetime()
-                ci_data = get_availability_data_of_ci(None, ci, start_ts=start_ts_utc, end_ts=end_ts_utc, bucket_minutes=bucket_minutes)
+                window_kwargs = {'start_ts': start_ts_utc, 'end_ts': end_ts_utc}
             else:
-                ci_data = get_availability_data_of_ci(None, ci, hours=selected_hours, bucket_minutes=bucket_minutes)
+                window_kwargs = {'hours': selected_hours}
+
+            ci_data = pd.DataFrame()
+            if bucket_minutes:
+                ci_data = get_availability_rollup_of_ci(ci, bucket_minutes, **window_kwargs)
+            if ci_data.empty:
+                # Pyramid not (yet) built -> aggregate on the fly
+                ci_data = get_availability_data_of_ci(None, ci, bucket_minutes=bucket_minutes, **window_kwargs)
 
         if ci_data.empty:
             # Fallback auf synthetische Testdaten, wenn gewünscht (per URL-Flag demo=1)
@@ -636,7 +671,7 @@ def handle_plot_updates(pathname, n_clicks, hours, trend_options, relayout_data,
                 html.P('Tipp: Fügen Sie der URL "&demo=1" hinzu, um Testdaten mit Ausfällen anzuzeigen.')
             ])
 
-            return fig, stats_display, ci_meta_text
+            return fig, stats_display, ci_meta_text, None
 
         # Convert times to datetime if needed
         if not pd.api.types.is_datetime64_any_dtype(ci_data['times']):
@@ -693,7 +728,7 @@ def handle_plot_updates(pathname, n_clicks, hours, trend_options, relayout_data,
                 html.P('Tipp: Fügen Sie der URL "&demo=1" hinzu, um Testdaten mit Ausfällen anzuzeigen.')
             ])
 
-            return fig, stats_display, ci_meta_text
+            return fig, stats_display, ci_meta_text, None
 
         # Create plot with color coding: Red for availability 0, Green for availability 1
         # IMPORTANT: Do not connect green line across downtime. We achieve this by
@@ -775,8 +810,10 @@ def handle_plot_updates(pathname, n_clicks, hours, trend_options, relayout_data,
             # Ensure numeric values
             selected_data_sorted['values'] = selected_data_sorted['values'].astype(float)
 
-            # EMA helper (window points based on 5-min cadence)
+            # EMA helper (window points based on the cadence of the chosen level)
             points_per_hour = 12
+            if bucket_minutes:
+                points_per_hour = 60.0 / bucket_minutes
             if 'ema24' in trend_options:
                 span_24h = int(24 * points_per_hour)
                 if span_24h > 1:
@@ -947,8 +984,15 @@ def handle_plot_updates(pathname, n_clicks, hours, trend_options, relayout_data,
         # Compose final statistics display
         stats_display = html.Div([base_stats_display, *extra_blocks])
 
+        # Compact runs of the loaded window for clientside zoom/pan
+        try:
+            segments = encode_availability_segments(selected_data, ranged=selected_range is not None)
+        except Exception:
+            segments = None
+
     except Exception as e:
         # Error handling
+        segments = None
         fig = go.Figure()
         fig.add_annotation(
             text=f"Fehler beim Laden der Daten: {str(e)}",
@@ -969,6 +1013,112 @@ def handle_plot_updates(pathname, n_clicks, hours, trend_options, relayout_data,
             html.P('Bitte versuchen Sie es später erneut.')
         ])
 
-    return fig, stats_display, ci_meta_text
+    return fig, stats_display, ci_meta_text, segments
+
+# Zoom/pan is handled in the browser on the loaded segments. The server is only
+# asked again (via plot-range-request) when the visible range leaves the loaded
+# data or needs a finer resolution than loaded.
+clientside_callback(
+    """
+    function(relayout, seg, clientZoom) {
+        const noUpdate = window.dash_clientside.no_update;
+        const ctx = window.dash_clientside.callback_context;
+        // New segments from the server: replaces the "Lade Daten …" note, never requests again
+        const fromSegments = ctx.triggered.some(function(t) { return t.prop_id === 'plot-segments.data'; });
+        if (!relayout) {
+            return [fromSegments ? '' : noUpdate, noUpdate];
+        }
+        // Segments are UTC epoch ms; Plotly reports naive Europe/Berlin wall-clock strings
+        const berlinParts = new Intl.DateTimeFormat('en-US', {
+            timeZone: 'Europe/Berlin', hourCycle: 'h23', year: 'numeric', month: '2-digit',
+            day: '2-digit', hour: '2-digit', minute: '2-digit', second: '2-digit'
+        });
+        function berlinOffset(t) {
+            const p = {};
+            berlinParts.formatToParts(new Date(t)).forEach(function(x) { p[x.type] = x.value; });
+            const wall = Date.UTC(+p.year, +p.month - 1, +p.day, +p.hour, +p.minute, +p.second);
+            return wall - Math.floor(t / 1000) * 1000;
+        }
+        function parseTs(value) {
+            if (value === undefined || value === null) { return null; }
+            let s = String(value).trim().replace(' ', 'T');
+            if (s.length === 10) { s += 'T00:00'; }
+            const wall = Date.parse(s + 'Z');
+            if (isNaN(wall)) { return null; }
+            // Second pass picks the right offset around DST changes
+            return wall - berlinOffset(wall - berlinOffset(wall));
+        }
+        let x0 = relayout['xaxis.range[0]'];
+        let x1 = relayout['xaxis.range[1]'];
+        if (Array.isArray(relayout['xaxis.range'])) {
+            x0 = relayout['xaxis.range'][0];
+            x1 = relayout['xaxis.range'][1];
+        }
+        const autorange = relayout['xaxis.autorange'] === true;
+        const hasRange = x0 !== undefined && x1 !== undefined;
+
+        if (fromSegments && !(seg && seg.ranged && hasRange)) {
+            return ['', noUpdate];
+        }
+        if (!clientZoom) {
+            if (fromSegments) { return ['', noUpdate]; }
+            if (hasRange) { return [noUpdate, {x0: x0, x1: x1, ts: Date.now()}]; }
+            if (autorange) { return [noUpdate, {reset: true, ts: Date.now()}]; }
+            return [noUpdate, noUpdate];
+        }
+        if (!seg || !seg.o || !seg.o.length) {
+            return [noUpdate, hasRange ? {x0: x0, x1: x1, ts: Date.now()} : noUpdate];
+        }
+
+        let a = seg.t0;
+        let b = seg.t1;
+        if (autorange) {
+            // Back to the default window if a zoomed range was loaded from the server
+            if (seg.ranged) { return ['', {reset: true, ts: Date.now()}]; }
+        } else if (hasRange) {
+            a = parseTs(x0);
+            b = parseTs(x1);
+            if (a === null || b === null || b <= a) { return [fromSegments ? '' : noUpdate, noUpdate]; }
+            const tolerance = (b - a) * 0.01;
+            const outside = a < seg.t0 - tolerance || b > seg.t1 + tolerance;
+            const tooCoarse = seg.step > 300 && (b - a) / (seg.step * 1000) < 50;
+            if (!fromSegments && (outside || tooCoarse)) {
+                return ['Lade Daten für den gewählten Zeitraum …', {x0: x0, x1: x1, ts: Date.now()}];
+            }
+        } else {
+            return [noUpdate, noUpdate];
+        }
+
+        let up = 0;
+        let total = 0;
+        const n = seg.o.length;
+        for (let i = 0; i < n; i++) {
+            const start = seg.t0 + seg.o[i] * 1000;
+            const end = (i + 1 < n) ? seg.t0 + seg.o[i + 1] * 1000 : seg.t1;
+            const overlap = Math.min(end, b) - Math.max(start, a);
+            if (overlap > 0) {
+                total += overlap;
+                up += overlap * seg.v[i];
+            }
+        }
+        if (total <= 0) {
+            return ['Keine Daten im sichtbaren Bereich', noUpdate];
+        }
+        const berlinFormat = new Intl.DateTimeFormat('de-DE', {
+            timeZone: 'Europe/Berlin', day: '2-digit', month: '2-digit', year: 'numeric',
+            hour: '2-digit', minute: '2-digit'
+        });
+        const fmt = function(t) { return berlinFormat.format(new Date(t)).replace(', ', ' '); };
+        const percent = (up / total * 100).toFixed(3);
+        return ['Sichtbarer Bereich (' + fmt(Math.max(a, seg.t0)) + ' – ' + fmt(Math.min(b, seg.t1)) + '): ' + percent + '% verfügbar', noUpdate];
+    }
+    """,
+    [Output('plot-visible-availability', 'children'),
+     Output('plot-range-request', 'data')],
+    [Input('availability-plot', 'relayoutData'),
+     Input('plot-segments', 'data')],
+    [State('plot-client-zoom', 'data')],
+    prevent_initial_call=True
+)
 
 # Page registration is handled in app.py
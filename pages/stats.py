@@ -3,64 +3,36 @@ from dash import html, dcc
 from dash import dash_table
 from dash import Input, Output, callback, no_update, State
 from mylibrary import *
-import yaml
 import os
 import time
-import gc
 import json
 import pandas as pd
 import pytz
 
-# Configuration cache for stats page with size limit
-_stats_config_cache = {}
-_stats_config_cache_timestamp = 0
-_stats_config_cache_ttl = 300  # 5 seconds cache TTL
-_stats_config_cache_max_size = 10  # Limit cache size
+# Prepared (pandas-converted) statistics per snapshot generation
+_stats_prepared = None
+_stats_prepared_generation = None
 
-
-
-def load_config():
-    """Load configuration from YAML file with caching"""
-    global _stats_config_cache, _stats_config_cache_timestamp
-
-    current_time = time.time()
-    if (not _stats_config_cache or
-        current_time - _stats_config_cache_timestamp > _stats_config_cache_ttl):
-
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                _stats_config_cache = yaml.safe_load(f) or {}
-            _stats_config_cache_timestamp = current_time
-
-            # Limit cache size
-            if len(_stats_config_cache) > _stats_config_cache_max_size:
-                # Keep only the most recent entries
-                keys = list(_stats_config_cache.keys())[:_stats_config_cache_max_size]
-                _stats_config_cache = {k: _stats_config_cache[k] for k in keys}
-        except (FileNotFoundError, Exception):
-            _stats_config_cache = {}
-            _stats_config_cache_timestamp = current_time
-
-    return _stats_config_cache
-
-def load_core_config():
-    """Load core configuration from cached config"""
-    config = load_config()
-    return config.get('core', {})
-
-# Cache for CI metadata loaded from TimescaleDB
+# Cache for CI metadata loaded from TimescaleDB (invalidated via cache bus topic 'ci_metadata')
 _ci_meta_cache = None
 _ci_meta_cache_timestamp = 0
-_ci_meta_cache_ttl = 300  # 5 minutes cache TTL
+_ci_meta_cache_generation = None
+_ci_meta_cache_ttl = 3600  # 1 hour safety net
+_ci_meta_cache_fallback_ttl = 300  # 5 minutes while the cache bus is disconnected
+
+# Availability per product/organization from the group rollups: dimension -> (timestamp, rows)
+_group_stats_cache = {}
+_group_stats_cache_ttl = 600
+GROUP_STATS_HOURS = 720  # 30 Tage
 
 def load_ci_metadata_map():
     """Load CI -> {name, organization, product} map from TimescaleDB with caching."""
-    global _ci_meta_cache, _ci_meta_cache_timestamp
+    global _ci_meta_cache, _ci_meta_cache_timestamp, _ci_meta_cache_generation
 
     current_time = time.time()
-    if (_ci_meta_cache is not None and
-        current_time - _ci_meta_cache_timestamp < _ci_meta_cache_ttl):
+    generation = get_cache_generation('ci_metadata')
+    if (_ci_meta_cache is not None and generation == _ci_meta_cache_generation and
+        current_time - _ci_meta_cache_timestamp < cache_ttl(_ci_meta_cache_ttl, _ci_meta_cache_fallback_ttl)):
         return _ci_meta_cache
 
     try:
@@ -87,6 +59,7 @@ def load_ci_metadata_map():
 
         _ci_meta_cache = mapping
         _ci_meta_cache_timestamp = current_time
+        _ci_meta_cache_generation = generation
         return mapping
 
     except Exception as e:
@@ -95,19 +68,14 @@ def load_ci_metadata_map():
 
 def get_cached_statistics(config_file_name, cis):
     """Get statistics from JSON file (generated by cron.py) or calculate them if file doesn't exist"""
+    global _stats_prepared, _stats_prepared_generation
 
-    # Try to load statistics from JSON file first
-    statistics_file_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'statistics.json')
-
+    # Shared snapshot: statistics.json is parsed once per cron update
     try:
-        if os.path.exists(statistics_file_path):
-            with open(statistics_file_path, 'r', encoding='utf-8') as f:
-                file_stats = json.load(f)
-
-            # Check if the file has valid statistics
-            if file_stats and 'calculated_at' in file_stats:
-                file_age = time.time() - file_stats['calculated_at']
-                print(f"Using statistics from file (age: {file_age:.1f}s)")
+        snapshot = load_statistics_snapshot()
+        if snapshot is not None and snapshot.get('calculated_at'):
+            if _stats_prepared is None or _stats_prepared_generation != snapshot.generation:
+                file_stats = thaw(snapshot.data)
 
                 # Convert timestamp strings back to datetime objects for display
                 if file_stats.get('latest_timestamp'):
@@ -125,21 +93,23 @@ def get_cached_statistics(config_file_name, cis):
                 if 'overall_availability_percentage_total' not in file_stats:
                     file_stats['overall_availability_percentage_total'] = file_stats.get('overall_availability_percentage', 0)
 
-                # Recalculate data age dynamically based on current time
-                if file_stats.get('latest_timestamp'):
-                    current_time = pd.Timestamp.now(tz=pytz.timezone('Europe/Berlin'))
-                    data_age_hours = (current_time - file_stats['latest_timestamp']).total_seconds() / 3600
-                    file_stats['data_age_formatted'] = format_duration(data_age_hours)
-
                 # Ensure top_unstable_cis_by_incidents exists (map from top_unstable_cis)
                 if 'top_unstable_cis_by_incidents' not in file_stats and 'top_unstable_cis' in file_stats:
                     file_stats['top_unstable_cis_by_incidents'] = file_stats['top_unstable_cis']
 
-                # Debug: Print key statistics to verify they are loaded correctly
-                print(f"DEBUG: Loaded statistics - uptime: {file_stats.get('overall_uptime_minutes', 'NOT_FOUND')}, downtime: {file_stats.get('overall_downtime_minutes', 'NOT_FOUND')}, mttr: {file_stats.get('mttr_minutes_mean', 'NOT_FOUND')}")
-                print(f"DEBUG: Loaded CI data - count: {len(file_stats.get('top_unstable_cis_by_incidents', []))}")
+                # Per-CI metrics are only needed for lookups via the snapshot index
+                file_stats.pop('per_ci_metrics', None)
 
-                return file_stats
+                _stats_prepared = file_stats
+                _stats_prepared_generation = snapshot.generation
+
+            # Shallow copy per request; only the data age is recalculated
+            file_stats = dict(_stats_prepared)
+            if file_stats.get('latest_timestamp') is not None:
+                current_time = pd.Timestamp.now(tz=pytz.timezone('Europe/Berlin'))
+                data_age_hours = (current_time - file_stats['latest_timestamp']).total_seconds() / 3600
+                file_stats['data_age_formatted'] = format_duration(data_age_hours)
+            return file_stats
     except Exception as e:
         print(f"Error loading statistics from file: {e}")
 
@@ -162,6 +132,8 @@ def get_cached_statistics(config_file_name, cis):
             print(f"Error calculating TimescaleDB statistics: {e}")
 
     # Final fallback: use HDF5-based calculation
+    if cis is None:
+        cis = get_data_of_all_cis_from_timescaledb()
     new_stats = calculate_overall_statistics(config_file_name, cis)
     return new_stats
 
@@ -396,14 +368,8 @@ def create_overall_statistics_display(stats):
 
     return html.Div(className='overall-statistics box', children=children)
 
-def serve_layout():
-    # Load core configurations (now cached)
-    core_config = load_core_config()
-
-    # TimescaleDB mode - no file_name needed
-    config_file_name = None
-    config_url = core_config.get('url')
-
+def _load_cis_for_statistics(config_file_name, config_url):
+    """All CIs for the statistics fallback; returns (cis, error_layout)."""
     # Try to get data from TimescaleDB
     try:
         cis = get_data_of_all_cis_from_timescaledb()
@@ -432,7 +398,7 @@ def serve_layout():
                 html.P(f'API URL: {config_url or "Nicht konfiguriert"}'),
                 html.P(f'Daten-Datei: {config_file_name}')
             ])
-            return layout
+            return cis, layout
 
     # Check if 'product' column exists
     if 'product' not in cis.columns:
@@ -441,27 +407,87 @@ def serve_layout():
             html.P('Verfügbare Spalten: ' + ', '.join(cis.columns.tolist())),
             html.P(f'Anzahl Datensätze: {len(cis)}')
         ])
-        return layout
+        return cis, layout
+    return cis, None
+
+def load_group_statistics(dimension):
+    """Rows for the per-product/per-organization table (cached, see _group_stats_cache_ttl)."""
+    cached = _group_stats_cache.get(dimension)
+    if cached is not None and time.time() - cached[0] < _group_stats_cache_ttl:
+        return cached[1]
+    df = get_group_availability(dimension, hours=GROUP_STATS_HOURS)
+    rows = [
+        {
+            'key': row.key or 'Ohne Zuordnung',
+            'cis': int(row.cis),
+            'availability_percentage': round(float(row.availability_percentage), 2) if pd.notna(row.availability_percentage) else None,
+            'incidents': int(row.incidents),
+            'downtime_ci_minutes': round(float(row.downtime_ci_minutes)),
+        }
+        for row in df.itertuples()
+    ]
+    if rows:
+        _group_stats_cache[dimension] = (time.time(), rows)
+    return rows
+
+def create_group_statistics_display():
+    """Availability per product and per organization over the last 30 days."""
+    cards = []
+    for dimension, label in (('product', 'Produkt'), ('organization', 'Organisation')):
+        rows = load_group_statistics(dimension)
+        if not rows:
+            continue
+        cards.append(html.Div(className='stat-card', children=[
+            html.H4(f'📦 Verfügbarkeit je {label} (30 Tage)'),
+            dash_table.DataTable(
+                id=f'group-stats-{dimension}',
+                data=rows,
+                columns=[
+                    {"name": label, "id": "key"},
+                    {"name": "CIs", "id": "cis", "type": "numeric"},
+                    {"name": "Verfügbarkeit (%)", "id": "availability_percentage", "type": "numeric", "format": {"specifier": ".2f"}},
+                    {"name": "Incidents", "id": "incidents", "type": "numeric"},
+                    {"name": "Downtime (CI-Minuten)", "id": "downtime_ci_minutes", "type": "numeric", "format": {"specifier": ".0f"}},
+                ],
+                sort_action='native',
+                page_size=15,
+                style_table={'overflowX': 'auto', 'minWidth': '100%', 'backgroundColor': 'var(--bg-color)', 'color': 'var(--text-color)'},
+                style_cell={'padding': '8px', 'fontSize': '0.95rem', 'backgroundColor': 'var(--bg-color)', 'color': 'var(--text-color)', 'border': '1px solid var(--border-color)'},
+                style_cell_conditional=[
+                    {"if": {"column_id": "key"}, "textAlign": "left", "maxWidth": "240px", "overflow": "hidden", "textOverflow": "ellipsis"},
+                ],
+                style_header={'backgroundColor': 'var(--card-bg-color)', 'color': 'var(--text-color)', 'fontWeight': 'bold', 'border': '1px solid var(--border-color)'},
+            )
+        ]))
+    if not cards:
+        return None
+    return html.Div(className='overall-statistics box', children=cards)
+
+def serve_layout():
+    # Load core configurations (now cached)
+    core_config = load_core_config()
+
+    # TimescaleDB mode - no file_name needed
+    config_file_name = None
+    config_url = core_config.get('url')
+
+    # With a statistics snapshot from cron the CI list is not needed at all
+    cis = None
+    snapshot = load_statistics_snapshot()
+    if snapshot is None or not snapshot.get('calculated_at'):
+        cis, error_layout = _load_cis_for_statistics(config_file_name, config_url)
+        if error_layout is not None:
+            return error_layout
 
     # Get statistics from cache or calculate them
     overall_stats = get_cached_statistics(config_file_name, cis)
-    # Fallback: wenn Liste leer ist, aus statistics.json nachladen
+    # Fallback: wenn Liste leer ist, aus dem Statistik-Snapshot übernehmen
     try:
-        statistics_file_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'statistics.json')
-        if not overall_stats.get('top_unstable_cis_by_incidents') and os.path.exists(statistics_file_path):
-            with open(statistics_file_path, 'r', encoding='utf-8') as f:
-                file_stats = json.load(f)
-            overall_stats['top_unstable_cis_by_incidents'] = file_stats.get('top_unstable_cis', [])
+        if not overall_stats.get('top_unstable_cis_by_incidents') and snapshot is not None:
+            overall_stats['top_unstable_cis_by_incidents'] = thaw(snapshot.get('top_unstable_cis', ()))
     except Exception as e:
-        print(f"Warning loading statistics.json fallback: {e}")
+        print(f"Warning loading statistics snapshot fallback: {e}")
 
-    # Force garbage collection after loading large datasets
-    gc.collect()
-
-    # Additional cleanup for large DataFrames
-    if 'cis' in locals():
-        del cis
-        gc.collect()
 
     layout = html.Div([
         html.P('Hier finden Sie eine umfassende Gesamtstatistik aller Configuration Items. Neue Daten werden stündlich neu berechnet. Laden Sie die Seite ggfs. neu, um die Ansicht zu aktualisieren.'),
@@ -475,6 +501,9 @@ def serve_layout():
         # Overall statistics section
         create_overall_statistics_display(overall_stats),
 
+        # Availability per product / organization (group rollups)
+        create_group_statistics_display(),
+
         # Location component for navigation
         dcc.Location(id='stats-location', refresh=False),
 
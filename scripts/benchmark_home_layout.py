@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark für die Produkt-Akkordeons der Startseite.
+
+Vergleicht den Neuaufbau aller Akkordeons inkl. zweier gc.collect() (früheres
+serve_layout) mit dem Fragment-Cache je Produkt, bei dem zwischen zwei Aufrufen
+nur wenige Produkte ihren Status ändern. Ausgegeben werden p50 und p95.
+
+Verwendung:
+    python scripts/benchmark_home_layout.py [--products 60] [--cis 20] [--changed 3] [--repeat 200]
+"""
+
+import os
+import sys
+import gc
+import time
+import argparse
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def load_home_page():
+    """pages/home.py ohne laufende App laden (register_page braucht eine Dash-Instanz)."""
+    import dash
+    dash.Dash(__name__, use_pages=True, pages_folder='')
+    spec = importlib.util.spec_from_file_location('pages.home', os.path.join(ROOT, 'pages', 'home.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_cis(products: int, cis_per_product: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = products * cis_per_product
+    now = pd.Timestamp.now(tz='UTC').floor('5min')
+    return pd.DataFrame({
+        'ci': [f'CI-{i:07d}' for i in range(n)],
+        'name': [f'Dienst {i}' for i in range(n)],
+        'organization': [f'Organisation {i % 37}' for i in range(n)],
+        'product': [f'Produkt {i // cis_per_product:03d}' for i in range(n)],
+        'current_availability': (rng.random(n) > 0.05).astype(int),
+        'time': now - pd.to_timedelta(rng.integers(0, 10_000, n), unit='min'),
+    })
+
+
+def simulate_ingest(cis: pd.DataFrame, rng, changed_products: int, cis_per_product: int):
+    """Kippt den Status je eines CIs in ``changed_products`` zufälligen Produkten."""
+    products = cis['product'].nunique()
+    for p in rng.choice(products, size=min(changed_products, products), replace=False):
+        row = int(p) * cis_per_product + int(rng.integers(0, cis_per_product))
+        cis.iat[row, cis.columns.get_loc('current_availability')] ^= 1
+        cis.iat[row, cis.columns.get_loc('time')] = pd.Timestamp.now(tz='UTC')
+
+
+def legacy_build(home, cis):
+    elements = [home.create_accordion_element(name, data) for name, data in cis.groupby('product')]
+    gc.collect()
+    gc.collect()
+    return elements
+
+
+def cached_build(home, cis):
+    return home.build_product_accordions(cis)
+
+
+def measure(fn, home, cis, rng, args):
+    samples = []
+    fn(home, cis)  # warm-up (fills the fragment cache)
+    for _ in range(args.repeat):
+        simulate_ingest(cis, rng, args.changed, args.cis)
+        start = time.perf_counter()
+        fn(home, cis)
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark der Startseiten-Akkordeons')
+    parser.add_argument('--products', type=int, default=60, help='Anzahl Produkte')
+    parser.add_argument('--cis', type=int, default=20, help='CIs je Produkt')
+    parser.add_argument('--changed', type=int, default=3, help='Produkte mit Statusänderung je Aufruf')
+    parser.add_argument('--repeat', type=int, default=200, help='Aufrufe je Variante')
+    args = parser.parse_args()
+
+    home = load_home_page()
+    print(f"{args.products} Produkte x {args.cis} CIs, {args.changed} geänderte Produkte je Aufruf")
+    print(f"{'Variante':<32} {'p50 ms':>9} {'p95 ms':>9}")
+    for label, fn in (('Neuaufbau + gc.collect() (alt)', legacy_build), ('Fragment-Cache je Produkt', cached_build)):
+        cis = synthetic_cis(args.products, args.cis)
+        p50, p95 = measure(fn, home, cis, np.random.default_rng(7), args)
+        print(f"{label:<32} {p50:>9.2f} {p95:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark für die Statistik-Berechnung der Plot-Seite.
+
+Misst die Laufzeit von summarize_availability_runs() (NumPy-Run-Length-Encoding)
+für Zeitfenster von 1 Tag bis 6 Monaten im 5-Minuten-Takt und vergleicht sie mit
+der früheren pandas-groupby-Variante zur Ermittlung der längsten Läufe.
+
+Verwendung:
+    python scripts/benchmark_plot_statistics.py [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mylibrary import summarize_availability_runs
+
+
+WINDOWS = [
+    ('1 Tag', 24),
+    ('1 Woche', 168),
+    ('1 Monat', 720),
+    ('3 Monate', 2160),
+    ('6 Monate', 4392),
+]
+
+
+def synthetic_series(hours: int, seed: int = 42):
+    """5-Minuten-Reihe mit zufälligen Ausfällen (~0,5 % Ausfallbeginn je Punkt)."""
+    rng = np.random.default_rng(seed)
+    n = hours * 12
+    times = pd.date_range(end=pd.Timestamp.now(tz='UTC').floor('5min'), periods=n, freq='5min')
+    values = np.ones(n, dtype=int)
+    for start in np.flatnonzero(rng.random(n) < 0.005):
+        values[start:start + rng.integers(1, 12)] = 0
+    return pd.DataFrame({'times': times, 'values': values})
+
+
+def legacy_longest_runs(df: pd.DataFrame):
+    """Frühere Variante: Kopie + groupby-Schleife über alle Läufe."""
+    data = df.sort_values('times').copy()
+    data['group'] = (data['values'] != data['values'].shift()).cumsum()
+    longest_down = longest_up = 0
+    for _, group in data.groupby('group'):
+        if group['values'].iloc[0] == 0:
+            longest_down = max(longest_down, len(group))
+        else:
+            longest_up = max(longest_up, len(group))
+    return longest_down, longest_up
+
+
+def vectorized(df: pd.DataFrame):
+    t_ns = np.asarray(df['times'].dt.tz_localize(None), dtype='datetime64[ns]').astype(np.int64)
+    return summarize_availability_runs(t_ns, df['values'].to_numpy(dtype=float))
+
+
+def measure(fn, arg, repeat: int) -> float:
+    """Median-Laufzeit in Millisekunden."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark der Plot-Statistiken')
+    parser.add_argument('--repeat', type=int, default=20, help='Wiederholungen je Fenster (Median)')
+    args = parser.parse_args()
+
+    print(f"{'Zeitfenster':<12} {'Punkte':>8} {'NumPy RLE':>12} {'groupby (alt)':>15} {'Faktor':>8}")
+    for label, hours in WINDOWS:
+        df = synthetic_series(hours)
+        new_ms = measure(vectorized, df, args.repeat)
+        old_ms = measure(legacy_longest_runs, df, max(1, args.repeat // 4))
+        factor = old_ms / new_ms if new_ms > 0 else float('inf')
+        print(f"{label:<12} {len(df):>8} {new_ms:>10.2f}ms {old_ms:>13.2f}ms {factor:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
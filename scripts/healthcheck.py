@@ -1,30 +1,34 @@
 import os
 import sys
+import json
 import urllib.request
 import urllib.error
 
 
 def main() -> int:
-    ci = os.getenv("SMOKE_TEST_CI", "SO-0000063")
-    url = f"http://localhost:8050/plot?ci={ci}"
+    # Liveness-Probe: /health/live macht keinerlei I/O und blockiert keinen Worker.
+    # HEALTHCHECK_URL erlaubt z. B. /health/ready für strengere Prüfungen.
+    url = os.getenv("HEALTHCHECK_URL", "http://localhost:8050/health/live")
     try:
-        with urllib.request.urlopen(url, timeout=10) as resp:
+        with urllib.request.urlopen(url, timeout=5) as resp:
             status = resp.getcode()
             body = resp.read(4096).decode("utf-8", errors="ignore")
             if status != 200:
                 print(f"healthcheck: non-200 status {status}")
                 return 1
-            # Simple content checks for server errors
-            error_markers = [
-                "Internal Server Error",
-                "Komponente nicht gefunden",
-                "Callback error",
-            ]
-            if any(marker in body for marker in error_markers):
-                print("healthcheck: error marker found in response body")
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                print("healthcheck: response is not JSON")
+                return 1
+            if payload.get("status") not in ("alive", "healthy", "warning"):
+                print(f"healthcheck: unexpected status {payload.get('status')}")
                 return 1
             print("healthcheck: ok")
             return 0
+    except urllib.error.HTTPError as e:
+        print(f"healthcheck: non-200 status {e.code}")
+        return 1
     except urllib.error.URLError as e:
         print(f"healthcheck: request failed: {e}")
         return 1
@@ -35,5 +39,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     sys.exit(main())
-
-
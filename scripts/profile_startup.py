@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Startzeit-Profil für mylibrary, cron und app.
+
+Importiert jedes Ziel in einem frischen Interpreter mit ``-X importtime`` und
+zeigt die teuersten direkt importierten Pakete. Mit ``--check`` endet das Skript
+mit Exit-Code 1, wenn ein Ziel sein Zeitbudget überschreitet oder ein nur bei
+Bedarf benötigtes Modul (apprise, cryptography, psutil, …) schon beim Start lädt.
+
+Verwendung:
+    python scripts/profile_startup.py [mylibrary cron app] [--top 15] [--check]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Kaltstart-Budget je Ziel in Sekunden (inkl. Interpreter-Start)
+STARTUP_BUDGETS = {
+    'mylibrary': 3.0,
+    'cron': 3.5,
+    'app': 10.0,
+}
+
+# Module, die erst im jeweiligen Teilsystem geladen werden sollen
+LAZY_MODULES = {
+    'mylibrary': ('apprise', 'cryptography', 'PIL', 'psutil', 'smtplib'),
+    'cron': ('apprise', 'cryptography', 'PIL', 'psutil', 'smtplib'),
+    # PIL wird bereits von Dash/Plotly importiert
+    'app': ('apprise', 'cryptography', 'psutil', 'smtplib'),
+}
+
+_PROBE = (
+    "import sys, time\n"
+    "t = time.perf_counter()\n"
+    "import {target}\n"
+    "print('elapsed', time.perf_counter() - t)\n"
+    "print('loaded', ','.join(m for m in {lazy!r} if m in sys.modules))\n"
+)
+
+
+def profile(target: str):
+    """Returns (wall_seconds, import_seconds, loaded_lazy_modules, [(package, seconds)])."""
+    code = _PROBE.format(target=target, lazy=LAZY_MODULES.get(target, ()))
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, timeout=300,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+
+    elapsed, loaded = None, []
+    for line in proc.stdout.splitlines():
+        if line.startswith('elapsed '):
+            elapsed = float(line.split()[1])
+        elif line.startswith('loaded '):
+            loaded = [m for m in line[len('loaded '):].split(',') if m]
+
+    # Eigenzeit (self) aller Module nach Wurzelpaket summieren
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or line.count('|') != 2:
+            continue
+        self_us, _cumulative, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue
+        root = name.strip().split('.')[0]
+        packages[root] = packages.get(root, 0.0) + int(self_us) / 1e6
+    top = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return wall, elapsed, loaded, top
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startzeit-Profil (Import-Zeiten je Modul)')
+    parser.add_argument('targets', nargs='*', default=list(STARTUP_BUDGETS), help='Module (Standard: alle)')
+    parser.add_argument('--top', type=int, default=15, help='Anzahl der teuersten Pakete je Ziel')
+    parser.add_argument('--check', action='store_true', help='Exit-Code 1 bei Budget- oder Lazy-Verstoß')
+    args = parser.parse_args()
+
+    failures = []
+    for target in args.targets:
+        wall, elapsed, loaded, top = profile(target)
+        budget = STARTUP_BUDGETS.get(target)
+        print(f"== {target}: import {elapsed:.2f}s, Kaltstart {wall:.2f}s"
+              + (f" (Budget {budget:.1f}s)" if budget else ''))
+        for package, seconds in top[:args.top]:
+            print(f"   {package:<28} {seconds * 1000:>9.1f} ms")
+        if budget and wall > budget:
+            failures.append(f"{target}: Kaltstart {wall:.2f}s > Budget {budget:.1f}s")
+        if loaded:
+            failures.append(f"{target}: beim Start geladen: {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"FEHLER: {failure}")
+    return 1 if (args.check and failures) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,6 +19,10 @@ REQUIRED_TABLES = {
     'users': ['id', 'email', 'email_hash', 'email_salt', 'created_at'],
     'otp_codes': ['id', 'user_id', 'otp_hash', 'salt', 'expires_at'],
     'notification_profiles': ['id', 'user_id', 'name', 'type', 'ci_list', 'apprise_urls', 'apprise_urls_hash', 'apprise_urls_salt', 'email_notifications', 'email_address', 'unsubscribe_token'],
+    'schema_migrations': ['version', 'name', 'applied_at', 'duration_ms'],
+    'app_settings': ['name', 'value', 'updated_at'],
+    'incident_heatmap_hourly': ['bucket_start', 'weekday', 'hour', 'incidents', 'ci_list'],
+    'availability_group_rollups_hourly': ['dimension', 'key', 'bucket_start', 'cis', 'incidents', 'downtime_ci_minutes'],
 }
 
 
@@ -0,0 +1,61 @@
+from auth_service import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(burst=3, per_minute=6, clock=clock)
+
+    assert [limiter.acquire('1.2.3.4')[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = limiter.acquire('1.2.3.4')
+    assert not allowed
+    assert retry_after == 10.0
+
+    # Other keys are independent
+    assert limiter.acquire('5.6.7.8')[0]
+
+    clock.now += 10
+    assert limiter.acquire('1.2.3.4')[0]
+    assert not limiter.acquire('1.2.3.4')[0]
+
+    limiter.reset('1.2.3.4')
+    assert limiter.acquire('1.2.3.4')[0]
+
+
+def test_bucket_key_set_is_bounded():
+    limiter = TokenBucketLimiter(burst=1, per_minute=1, max_keys=2, clock=FakeClock())
+    for key in ('a', 'b', 'c'):
+        assert limiter.acquire(key)[0]
+    # 'a' was evicted (LRU) and starts with a full bucket again
+    assert limiter.acquire('a')[0]
+    assert not limiter.acquire('c')[0]
+    assert limiter.acquire(None) == (True, 0.0)
+
+
+def test_forwarded_client_ips_get_separate_buckets():
+    from flask import Flask, request
+    from auth_service import trust_proxy_headers
+
+    limiter = TokenBucketLimiter(burst=1, per_minute=1, clock=FakeClock())
+    app = trust_proxy_headers(Flask(__name__), hops=1)
+
+    @app.route('/login')
+    def login():
+        return 'ok' if limiter.acquire(request.remote_addr)[0] else 'limited'
+
+    client = app.test_client()
+
+    def attempt(ip):
+        # nginx appends the client address ($proxy_add_x_forwarded_for)
+        return client.get('/login', headers={'X-Forwarded-For': ip}, environ_base={'REMOTE_ADDR': '172.18.0.2'}).data
+
+    assert attempt('203.0.113.1') == b'ok'
+    assert attempt('203.0.113.1') == b'limited'
+    assert attempt('198.51.100.7') == b'ok'
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from mylibrary import align_series_on_grid
+
+
+def test_align_series_on_grid_scatters_and_keeps_gaps():
+    step = 300 * 10**9
+    start = 1_700_000_100 * 10**9 // step * step
+    rows = [0, 0, 1, 1, 1, 2]
+    buckets = [start, start + 2 * step, start + step, start + step, start + 5 * step, start - step]
+    values = [1, 0, 1, 0, 1, 1]
+    matrix = align_series_on_grid(rows, buckets, values, 3, start, step, 4)
+
+    assert matrix.shape == (3, 4)
+    assert matrix[0, 0] == 1 and matrix[0, 2] == 0
+    assert np.isnan(matrix[0, 1])
+    assert matrix[1, 1] == 0  # Ausfall gewinnt innerhalb eines Buckets
+    assert np.isnan(matrix[2]).all()  # außerhalb des Rasters verworfen
+
+
+def test_align_series_on_grid_empty():
+    matrix = align_series_on_grid([], [], [], 2, 0, 1, 3)
+    assert matrix.shape == (2, 3) and np.isnan(matrix).all()
+
+
+def test_fleet_matrix_uint8_encoding():
+    from mylibrary import FLEET_MATRIX_NO_DATA, encode_downtime_percent, fill_fleet_matrix
+
+    cells = encode_downtime_percent([0, 9, 100, 140, np.nan])
+    assert cells.dtype == np.uint8
+    assert cells.tolist() == [0, 9, 100, 100, FLEET_MATRIX_NO_DATA]
+
+    matrix = fill_fleet_matrix([0, 1, 1, -1, 0], [0, 2, 9, 1, 1], cells, 2, 3)
+    assert matrix.dtype == np.uint8 and matrix.shape == (2, 3)
+    assert matrix[0].tolist() == [0, FLEET_MATRIX_NO_DATA, FLEET_MATRIX_NO_DATA]
+    assert matrix[1].tolist() == [FLEET_MATRIX_NO_DATA, FLEET_MATRIX_NO_DATA, 9]
+
+
+def test_availability_by_row_weights_samples_not_buckets():
+    from mylibrary import availability_by_row
+
+    # 1-day buckets with one 5-minute outage each: not 0 %, but 1 - 1/288
+    rows = [0, 0, 0, 1, -1]
+    samples = [288, 288, 288, 288, 288]
+    down = [1, 1, 1, 0, 288]
+    percent = availability_by_row(rows, samples, down, 3)
+    assert round(percent[0], 2) == 99.65
+    assert percent[1] == 100.0
+    assert np.isnan(percent[2])
+
+
+class _StubCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+
+class _StubConn(_StubCursor):
+    def cursor(self):
+        return _StubCursor(self.rows)
+
+
+def test_get_availability_matrix_places_db_rows_on_grid(monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    import mylibrary
+
+    # Rohdaten-Pfad (48 h, 5-Minuten-Raster); Zeitstempel wie von psycopg2 geliefert
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    bucket = now.replace(minute=now.minute // 5 * 5) - timedelta(hours=1)
+    rows = [
+        ('ci-a', bucket, 1, 1.0, 1, 0),
+        ('ci-a', bucket + timedelta(minutes=5), 0, 0.0, 1, 1),
+        ('ci-b', bucket, 1, 1.0, 1, 0),
+    ]
+    monkeypatch.setattr(mylibrary, 'get_db_conn', lambda: _StubConn(rows))
+    series = mylibrary.get_availability_matrix(['ci-a', 'ci-b'], 48)
+
+    assert np.count_nonzero(~np.isnan(series['status'])) == 3
+    assert series['availability'].tolist() == [50.0, 100.0]
+    col = int(np.flatnonzero(~np.isnan(series['status'][1]))[0])
+    assert series['times'][col] == pd.Timestamp(bucket).tz_convert('Europe/Berlin')
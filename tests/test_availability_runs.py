@@ -0,0 +1,45 @@
+import numpy as np
+
+from mylibrary import run_length_encode, summarize_availability_runs
+
+
+def test_run_length_encode():
+    starts, lengths, values = run_length_encode([1, 1, 0, 0, 0, 1])
+    assert starts.tolist() == [0, 2, 5]
+    assert lengths.tolist() == [2, 3, 1]
+    assert values.tolist() == [1, 0, 1]
+
+
+def test_durations_from_real_timestamps():
+    # 10-Minuten-Takt: 3 Punkte Ausfall = 30 Minuten, nicht 15 (keine 5-Minuten-Annahme)
+    t_ns = np.arange(10, dtype=np.int64) * 600 * 10**9
+    values = [1, 1, 0, 0, 0, 1, 1, 1, 0, 1]
+    stats = summarize_availability_runs(t_ns, values)
+    assert stats['down_runs'] == 2
+    assert stats['longest_down_points'] == 3
+    assert stats['longest_down_seconds'] == 1800
+    assert stats['down_seconds'] == 2400
+    assert stats['mttr_seconds'] == 1200
+    assert stats['mtbf_seconds'] == (6000 - 2400) / 2
+
+
+def test_collection_gaps_are_capped():
+    # Lücke von 2 Stunden nach dem zweiten Punkt zählt nur mit 2x Taktabstand
+    t_ns = np.array([0, 300, 7500, 7800, 8100], dtype=np.int64) * 10**9
+    stats = summarize_availability_runs(t_ns, [1, 1, 1, 1, 1])
+    assert stats['total_seconds'] == 300 + 600 + 300 + 300 + 300
+
+
+def test_rollup_rows_use_fractions_samples_and_incidents():
+    # Zwei Tages-Buckets mit je einem 5-Minuten-Ausfall: zwei Störungen, kein 1440-Minuten-Ausfall
+    day = 86400
+    t_ns = np.array([0, day, 2 * day], dtype=np.int64) * 10**9
+    stats = summarize_availability_runs(
+        t_ns, [0, 0, 1], down_fraction=[1 / 288, 1 / 288, 0.0],
+        samples=[288, 288, 288], incidents=[1, 1, 0]
+    )
+    assert stats['down_runs'] == 2
+    assert stats['points'] == 864 and stats['down_points'] == 2
+    assert stats['longest_down_seconds'] == 600  # Bucket-Auflösung: benachbarte Ausfälle verschmelzen
+    assert stats['mttr_seconds'] == 300
+    assert stats['bucket_resolution'] is True
@@ -0,0 +1,16 @@
+import json
+
+import mylibrary
+
+
+def test_cache_event_bumps_only_its_topic(monkeypatch):
+    monkeypatch.setattr(mylibrary, '_cache_generations', {t: 0 for t in mylibrary.CACHE_TOPICS})
+
+    assert mylibrary._apply_cache_event(json.dumps({'topic': 'ci_metadata', 'rows': 3})) == ('ci_metadata',)
+    assert mylibrary._cache_generations['ci_metadata'] == 1
+    assert mylibrary._cache_generations['availability'] == 0
+
+    # Unknown topic or broken payload invalidates everything
+    mylibrary._apply_cache_event('not json')
+    assert all(v >= 1 for v in mylibrary._cache_generations.values())
+    assert mylibrary._cache_generations['ci_metadata'] == 2
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import mylibrary
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / 'config.yaml'
+    monkeypatch.setattr(mylibrary, 'CONFIG_FILE', str(path))
+    monkeypatch.setattr(mylibrary, 'CONFIG_CHECK_INTERVAL', 0.0)
+    monkeypatch.setattr(mylibrary, '_config_snapshot', None)
+    monkeypatch.setattr(mylibrary, '_config_file_key', None)
+    return path
+
+
+def _write(path, text, mtime):
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+def test_config_parsed_once_and_reloaded_on_change(config_file):
+    _write(config_file, "core:\n  url: https://a\n  header:\n    title: A\n", 1_000_000)
+    first = mylibrary.get_config()
+    assert mylibrary.load_core_config()['url'] == 'https://a'
+    assert mylibrary.load_header_config() == {'title': 'A'}
+    assert mylibrary.load_footer_config() == {}
+    # Unchanged file -> same snapshot object, no re-parse
+    assert mylibrary.get_config() is first
+
+    _write(config_file, "core:\n  url: https://b\n", 1_000_100)
+    assert mylibrary.load_core_config() == {'url': 'https://b'}
+    assert mylibrary.load_header_config() == {}
+
+
+def test_broken_or_missing_config(config_file):
+    _write(config_file, "core:\n  url: https://a\n", 1_000_000)
+    assert mylibrary.load_core_config()['url'] == 'https://a'
+
+    # Invalid YAML keeps the last good snapshot
+    _write(config_file, "core: [unclosed\n", 1_000_200)
+    assert mylibrary.load_core_config()['url'] == 'https://a'
+
+    config_file.unlink()
+    assert mylibrary.load_config() == {}
+    assert mylibrary.load_core_config() == {}
+
+    # Non-dict sections are normalized
+    _write(config_file, "core: null\nfooter: text\n", 1_000_300)
+    assert mylibrary.load_core_config() == {}
+    assert mylibrary.load_footer_config() == {}
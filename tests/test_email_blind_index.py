@@ -0,0 +1,28 @@
+from mylibrary import email_blind_index, normalize_email
+
+
+def test_blind_index_is_keyed_and_normalized(monkeypatch):
+    monkeypatch.delenv('EMAIL_INDEX_KEY', raising=False)
+    monkeypatch.setenv('ENCRYPTION_KEY', 'key-a')
+    a = email_blind_index(' User@Example.org ')
+    assert a == email_blind_index('user@example.org')
+    assert a != email_blind_index('other@example.org')
+
+    monkeypatch.setenv('ENCRYPTION_KEY', 'key-b')
+    assert email_blind_index('user@example.org') != a
+
+    monkeypatch.setenv('EMAIL_INDEX_KEY', 'index-key')
+    assert email_blind_index('user@example.org') not in (a, None)
+
+
+def test_blind_index_without_key(monkeypatch):
+    monkeypatch.delenv('EMAIL_INDEX_KEY', raising=False)
+    monkeypatch.delenv('ENCRYPTION_KEY', raising=False)
+    assert email_blind_index('user@example.org') is None
+    assert email_blind_index('') is None
+
+
+def test_lookup_and_index_share_one_normalization(monkeypatch):
+    monkeypatch.setenv('ENCRYPTION_KEY', 'key-a')
+    assert normalize_email(' User@Example.org\n') == 'user@example.org'
+    assert email_blind_index(normalize_email(' User@Example.org ')) == email_blind_index('user@example.org')
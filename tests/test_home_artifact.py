@@ -0,0 +1,38 @@
+import pandas as pd
+
+import mylibrary
+from mylibrary import build_incident_heatmap_figure, load_home_artifact, write_snapshot
+
+
+def test_heatmap_figure_matrix_and_tooltips():
+    df = pd.DataFrame([
+        {'weekday': 1, 'hour': 8, 'count': 3, 'ci_list': ['CI-1', 'CI-2']},
+        {'weekday': 7, 'hour': 23, 'count': 1, 'ci_list': None},
+        {'weekday': 9, 'hour': 3, 'count': 5, 'ci_list': []},  # ungültig -> ignoriert
+    ])
+    trace = build_incident_heatmap_figure(df)['data'][0]
+    assert len(trace['z']) == 7 and len(trace['z'][0]) == 24
+    assert trace['z'][0][8] == 3 and trace['z'][6][23] == 1
+    assert trace['zmax'] == 3
+    assert 'CI-1, CI-2' in trace['text'][0][8]
+
+    empty = build_incident_heatmap_figure(pd.DataFrame(columns=['weekday', 'hour', 'count', 'ci_list']))
+    assert empty['data'][0]['zmax'] == 1
+
+
+def test_home_artifact_fresh_and_stale(tmp_path, monkeypatch):
+    path = str(tmp_path / 'home.json')
+    monkeypatch.setattr(mylibrary, 'msgpack', None)
+    monkeypatch.setattr(mylibrary, 'HOME_ARTIFACT_JSON_FILE', path)
+    monkeypatch.setattr(mylibrary, '_home_artifact_key', None)
+
+    assert load_home_artifact() is None  # missing
+
+    generation = write_snapshot(path, {'cis': [{'ci': 'CI-1', 'product': 'P'}]}, 'home')
+    artifact = load_home_artifact()
+    assert artifact is not None
+    assert artifact[0] == generation
+    assert artifact[1]['cis'][0]['ci'] == 'CI-1'
+
+    # Older than max_age -> caller falls back to live queries
+    assert load_home_artifact(max_age=-1) is None
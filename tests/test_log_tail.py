@@ -0,0 +1,58 @@
+import mylibrary
+from mylibrary import (
+    get_log_tail,
+    issue_log_stream_token,
+    read_last_lines,
+    read_log_range,
+    verify_log_stream_token,
+)
+
+
+def _write(path, text, mode='w'):
+    with open(path, mode, encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_reverse_reader_crosses_block_boundaries(tmp_path):
+    log = tmp_path / 'cron.log'
+    _write(log, ''.join(f'line {i}\n' for i in range(1000)))
+    lines, pending, end = read_last_lines(str(log), 3, block_size=5)
+    assert lines == [b'line 997', b'line 998', b'line 999']
+    assert pending == b''
+    assert end == log.stat().st_size
+
+
+def test_tail_follows_appends_and_rotation(tmp_path):
+    log = tmp_path / 'cron.log'
+    _write(log, 'a\nb\n')
+    assert get_log_tail(5, str(log))['lines'] == ['a', 'b']
+
+    _write(log, 'c\npart', mode='a')
+    assert get_log_tail(2, str(log))['lines'] == ['c', 'part']
+
+    _write(log, 'ial\n', mode='a')
+    assert get_log_tail(1, str(log))['lines'] == ['partial']
+
+    # Rotation: Datei wird kleiner neu angelegt
+    log.unlink()
+    _write(log, 'x\n')
+    assert get_log_tail(5, str(log))['lines'] == ['x']
+
+
+def test_read_log_range_resumes_only_matching_file(tmp_path):
+    log = tmp_path / 'cron.log'
+    _write(log, 'one\ntwo\nthree\n')
+    inode = log.stat().st_ino
+    assert read_log_range(str(log), inode, 4, 14) == ['two', 'three']
+    assert read_log_range(str(log), inode, 2, 14, partial_start=True) == ['two', 'three']
+    assert read_log_range(str(log), inode + 1, 4, 14) is None
+    assert read_log_range(str(log), inode, 0, 14, max_bytes=5) is None
+
+
+def test_log_stream_token_is_signed(monkeypatch):
+    monkeypatch.setattr(mylibrary, 'is_admin_user', lambda email: email == 'admin@example.org')
+    token = issue_log_stream_token('admin@example.org')
+    assert verify_log_stream_token(token) == 'admin@example.org'
+    assert verify_log_stream_token(token[:-1] + ('0' if token[-1] != '0' else '1')) is None
+    assert verify_log_stream_token(issue_log_stream_token('admin@example.org', ttl=-1)) is None
+    assert verify_log_stream_token(issue_log_stream_token('user@example.org')) is None
@@ -0,0 +1,30 @@
+from mylibrary import AVAILABILITY_ROLLUP_LEVELS, PLOT_TARGET_POINTS, choose_rollup_level
+
+
+def test_short_windows_use_raw_measurements():
+    # 24h bei 5-Minuten-Takt = 288 Punkte -> keine Pyramide nötig
+    assert choose_rollup_level(24) is None
+    assert choose_rollup_level(0) is None
+    assert choose_rollup_level(None) is None
+
+
+def test_level_keeps_row_count_bounded():
+    # Von 1 Tag bis 6 Monate bleibt die Punktzahl in einem festen Faktor um das Ziel
+    for hours in (48, 168, 336, 720, 1440, 2160, 24 * 183):
+        level = choose_rollup_level(hours)
+        assert level in AVAILABILITY_ROLLUP_LEVELS
+        points = hours * 60 / level
+        assert PLOT_TARGET_POINTS / 4 <= points <= PLOT_TARGET_POINTS * 4
+
+
+def test_coarser_levels_for_longer_windows():
+    assert choose_rollup_level(48) == 5
+    assert choose_rollup_level(720) == 60
+    assert choose_rollup_level(24 * 183) == 360
+
+
+def test_fleet_matrix_never_uses_five_minute_buckets():
+    from mylibrary import FLEET_MATRIX_LEVELS, FLEET_MATRIX_TARGET_BUCKETS
+    # 7 Tage bei 5 Minuten wären 2016 Buckets je Zeile
+    assert choose_rollup_level(168, FLEET_MATRIX_TARGET_BUCKETS, FLEET_MATRIX_LEVELS) == 60
+    assert choose_rollup_level(720, FLEET_MATRIX_TARGET_BUCKETS, FLEET_MATRIX_LEVELS) == 60
@@ -0,0 +1,13 @@
+from migrations import LATEST_VERSION, MIGRATIONS, pending_migrations
+
+
+def test_versions_are_unique_and_ascending():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert LATEST_VERSION == versions[-1]
+
+
+def test_pending_migrations_skip_applied_steps():
+    assert pending_migrations({v for v, _, _ in MIGRATIONS}) == []
+    assert [v for v, _, _ in pending_migrations(None)] == [v for v, _, _ in MIGRATIONS]
+    assert [v for v, _, _ in pending_migrations({1, 2, 4})][:2] == [3, 5]
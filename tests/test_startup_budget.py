@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_mylibrary_cold_start_within_budget():
+    # Budget und Lazy-Module sind in scripts/profile_startup.py definiert
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'scripts', 'profile_startup.py'), 'mylibrary', '--top', '0', '--check'],
+        cwd=ROOT, capture_output=True, text=True, timeout=300,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
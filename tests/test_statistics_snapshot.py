@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from mylibrary import load_statistics_snapshot, thaw
+
+
+def _write(path, data, mtime):
+    path.write_text(json.dumps(data), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+def test_snapshot_parsed_once_per_file_version(tmp_path):
+    path = tmp_path / 'statistics.json'
+    _write(path, {'calculated_at': 1, 'top_unstable_cis': [{'ci': 'CI-1', 'incidents': 3}],
+                  'per_ci_metrics': {'CI-1': {'mttr_minutes': 12.5}}}, 1000)
+
+    first = load_statistics_snapshot(str(path))
+    assert load_statistics_snapshot(str(path)) is first
+    assert first.ci('CI-1')['incidents'] == 3
+    assert first.ci('CI-1')['mttr_minutes'] == 12.5
+    assert first.ci('CI-unknown') is None
+
+    _write(path, {'calculated_at': 2, 'recent_incidents': [{'ci': 'CI-2'}]}, 2000)
+    second = load_statistics_snapshot(str(path))
+    assert second is not first
+    assert second.generation != first.generation
+    assert thaw(second.get('recent_incidents')) == [{'ci': 'CI-2'}]
+
+
+def test_snapshot_is_read_only(tmp_path):
+    path = tmp_path / 'statistics.json'
+    _write(path, {'calculated_at': 1, 'recent_incidents': [{'ci': 'CI-1'}]}, 1000)
+    snapshot = load_statistics_snapshot(str(path))
+    with pytest.raises(TypeError):
+        snapshot.data['calculated_at'] = 2
+    with pytest.raises(TypeError):
+        snapshot.get('recent_incidents')[0]['ci'] = 'CI-2'
+    with pytest.raises(AttributeError):
+        snapshot.generation = 0
+
+
+def test_msgpack_snapshot_roundtrip_keeps_typed_timestamps(tmp_path):
+    pytest.importorskip('msgpack')
+    from datetime import datetime, timezone
+
+    import pandas as pd
+
+    from mylibrary import read_snapshot, write_snapshot
+
+    path = str(tmp_path / 'statistics.msgpack')
+    ts = pd.Timestamp('2025-03-01 12:00', tz='Europe/Berlin')
+    generation = write_snapshot(path, {'latest_timestamp': ts, 'calculated_at': 1.5}, 'statistics', generation=7)
+
+    header, data = read_snapshot(path)
+    assert generation == 7
+    assert header['generation'] == 7 and header['kind'] == 'statistics'
+    assert data['latest_timestamp'] == ts.to_pydatetime().astimezone(timezone.utc)
+    assert isinstance(data['latest_timestamp'], datetime)
+    assert not [p for p in tmp_path.iterdir() if '.tmp.' in p.name]
+
+    snapshot = load_statistics_snapshot(path)
+    assert snapshot.generation == 7
+
+
+def test_snapshot_writes_missing_timestamps_as_none(tmp_path):
+    import pandas as pd
+
+    from mylibrary import read_snapshot, write_snapshot
+
+    # CI mit Metadaten, aber ohne Messwerte: LEFT JOIN liefert time = NaT
+    df = pd.DataFrame({'ci': ['CI-1', 'CI-2'],
+                       'time': pd.to_datetime(['2025-01-01T10:00:00Z', None], utc=True)})
+    path = tmp_path / 'home.msgpack'
+    write_snapshot(str(path), {'cis': df.to_dict('records')}, 'home')
+    _, payload = read_snapshot(str(path))
+    assert payload['cis'][1]['time'] is None
+    assert payload['cis'][0]['time'].year == 2025
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+from mylibrary import (
+    aggregate_page_view_rows,
+    hll_count,
+    hll_decode,
+    hll_encode,
+    hll_merge,
+    hll_registers,
+)
+
+
+def test_hll_estimate_is_close():
+    for n in (10, 1000, 20000):
+        estimate = hll_count(hll_registers(f"session-{i}" for i in range(n)))
+        assert abs(estimate - n) <= max(2, 0.05 * n)
+
+
+def test_hll_merge_is_union_and_roundtrips():
+    a = hll_registers(f"s{i}" for i in range(0, 3000))
+    b = hll_registers(f"s{i}" for i in range(2000, 5000))
+    merged = hll_merge(a, b)
+    assert (merged == hll_registers(f"s{i}" for i in range(5000))).all()
+    assert (hll_decode(hll_encode(merged)) == merged).all()
+    assert hll_count(None) == 0
+
+
+def test_aggregate_page_view_rows_dimensions():
+    hour = datetime(2025, 1, 1, 10, tzinfo=timezone.utc)
+    rows = [
+        (hour, '/plot', 'ua1', 'a', 3),
+        (hour, '/plot', None, 'b', 1),
+        (hour, '/stats', 'ua1', 'a', 2),
+    ]
+    agg = aggregate_page_view_rows(rows)
+    views, sketch = agg[(hour, 'total', '')]
+    assert views == 6 and hll_count(sketch) == 2
+    assert agg[(hour, 'page', '/plot')][0] == 4
+    assert agg[(hour, 'browser', 'ua1')][0] == 5
+    assert (hour, 'browser', None) not in agg
+
+
+def test_page_view_days_follow_berlin_midnight():
+    from mylibrary import page_view_day_bounds
+    # 00:30 Uhr MEZ gehört zum lokalen Tag, nicht zum vorherigen UTC-Tag
+    start, end = page_view_day_bounds(datetime(2025, 1, 1, 23, 30, tzinfo=timezone.utc))
+    assert start == datetime(2025, 1, 1, 23, tzinfo=timezone.utc)
+    assert end == datetime(2025, 1, 2, 23, tzinfo=timezone.utc)
+    # Umstellung auf Sommerzeit: der Tag hat 23 Stunden
+    start, end = page_view_day_bounds(datetime(2025, 3, 30, 12, tzinfo=timezone.utc))
+    assert (end - start).total_seconds() == 23 * 3600